@@ -1,15 +1,12 @@
 import nest                                                          # import NEST module
 import matplotlib.pyplot as plt                                      # for plotting
-from pynestml.frontend.pynestml_frontend import generate_nest_target # NESTML
+from nestml_build_cache import install_nestml_module                 # NESTML (cached build)
 
-# compile nestml model (needs to be done only once)
-generate_nest_target(input_path="../nestml/iaf_psc_exp.nestml",
-                     target_path="./nestml_target",
-                     suffix="_nestml",                     
-                     logging_level='ERROR')    
-
-# install resulting NESTML module to make models available in NEST
-nest.Install('nestmlmodule') 
+# compile nestml model (reused from cache if unchanged) and install 
+# resulting NESTML module to make models available in NEST
+install_nestml_module(input_path="../nestml/iaf_psc_exp.nestml",
+                      suffix="_nestml",                     
+                      logging_level='ERROR')    
 
 nest.ResetKernel() # reset simulation kernel 
 
@@ -1,21 +1,19 @@
 import nest                                                          # import NEST module
 import matplotlib.pyplot as plt                                      # for plotting
-from pynestml.frontend.pynestml_frontend import generate_nest_target # NESTML
+from nestml_build_cache import install_nestml_module                 # NESTML (cached build)
 import numpy
 
-generate_nest_target(input_path=["../nestml/iaf_psc_exp.nestml",
-                                 "../nestml/stdp_pl_synapse.nestml"],
-                     target_path="./nestml_target",
-                     logging_level='ERROR',
-                     suffix="_nestml",
-                     codegen_opts = {"neuron_synapse_pairs": [{"neuron": "iaf_psc_exp",
-                                                               "synapse": "stdp_pl",
-                                                               "post_ports": ["post_spikes"]}]}
+# generate, compile and install NESTML module to make models available in NEST
+# (reused from cache if sources and options are unchanged)
+install_nestml_module(input_path=["../nestml/iaf_psc_exp.nestml",
+                                  "../nestml/stdp_pl_synapse.nestml"],
+                      logging_level='ERROR',
+                      suffix="_nestml",
+                      codegen_opts = {"neuron_synapse_pairs": [{"neuron": "iaf_psc_exp",
+                                                                "synapse": "stdp_pl",
+                                                                "post_ports": ["post_spikes"]}]}
 )    
 
-# install resulting NESTML module to make models available in NEST
-nest.Install('nestmlmodule') 
-
 # after this, the following two models are available in NEST
 neuron_model_name = 'iaf_psc_exp_nestml__with_stdp_pl_nestml'
 synapse_model_name = 'stdp_pl_nestml__with_iaf_psc_exp_nestml'
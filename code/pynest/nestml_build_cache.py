@@ -0,0 +1,183 @@
+'''
+Content-hash build cache for NESTML code generation.
+
+install_nestml_module() generates, compiles and installs a NEST extension module from
+NESTML sources only if no module for the same sources, code-generation options and suffix
+(and the same NEST and NESTML versions) exists in the cache directory. Otherwise, the cached
+module is installed directly. The NESTML version used for a build is stored with the build
+and compared to the version of the installed NESTML package, such that pynestml is only
+imported if a module needs to be built.
+
+Builds of the same module by concurrent processes (e.g. parallel sweeps) are serialized by
+a file lock ("<hash>.lock" in the cache directory); processes waiting for the lock use the
+module built by the first process.
+
+Each combination of models is compiled into a module with a distinct name
+("nestml_<hash>_module"), such that different modules can coexist in the cache.
+
+The cache directory is "~/.cache/nestml_modules" by default, and can be changed with the
+environment variable NESTML_BUILD_CACHE.
+
+'''
+
+import os
+import json
+import glob
+import shutil
+import fcntl
+import hashlib
+
+import nest
+
+#################################################
+def get_cache_path():
+    '''Return path of cache directory.'''
+
+    return os.environ.get('NESTML_BUILD_CACHE', os.path.expanduser('~/.cache/nestml_modules'))
+
+#################################################
+def get_nestml_files(input_path):
+    '''Return sorted list of NESTML files specified by input_path (file, directory, or list of files and directories).'''
+
+    if isinstance(input_path, str):
+        input_path = [input_path]
+
+    files = []
+    for path in input_path:
+        if os.path.isdir(path):
+            files += glob.glob(os.path.join(path, '*.nestml'))
+        else:
+            files += [path]
+
+    return sorted(files, key = os.path.basename)
+
+#################################################
+def get_nestml_version():
+    '''Return version of the installed NESTML package from its package metadata (without importing pynestml), or None.'''
+
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version('nestml')
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+#################################################
+def get_build_hash(input_path, codegen_opts = None, suffix = ''):
+    '''
+    Return hash (hex string) of NESTML sources, code-generation options, suffix, and NEST version.
+
+    The NESTML version is not part of the hash, but stored with the build (see install_nestml_module()).
+
+    Arguments
+    ---------
+    input_path:    str or list(str)
+                   NESTML file(s) or directory.
+
+    codegen_opts:  dict (optional)
+                   Code-generation options (e.g. neuron-synapse pairs).
+
+    suffix:        str (optional)
+                   Suffix of generated model names.
+
+    Returns
+    -------
+    hash:          str
+                   SHA-1 hash.
+
+    '''
+    h = hashlib.sha1()
+    for file_name in get_nestml_files(input_path):
+        h.update(os.path.basename(file_name).encode())
+        with open(file_name, 'rb') as f:
+            h.update(f.read())
+    h.update(json.dumps(codegen_opts, sort_keys = True).encode())
+    h.update(suffix.encode())
+    h.update(str(getattr(nest, '__version__', '')).encode())
+
+    return h.hexdigest()
+
+#################################################
+def is_complete_build(info_file):
+    '''
+    Return True if the build described by info_file is complete and was generated with the
+    installed NESTML version (builds without version stamp are accepted if the installed
+    version cannot be determined).
+    '''
+    if not os.path.exists(info_file):
+        return False
+    with open(info_file, 'r') as f:
+        build_info = json.load(f)
+    nestml_version = get_nestml_version()
+
+    return nestml_version is None or build_info.get('nestml_version') == nestml_version
+
+#################################################
+def install_nestml_module(input_path, codegen_opts = None, suffix = '', logging_level = 'ERROR'):
+    '''
+    Generate, compile and install NEST module from NESTML sources, or install module from cache.
+
+    Arguments
+    ---------
+    input_path:     str or list(str)
+                    NESTML file(s) or directory.
+
+    codegen_opts:   dict (optional)
+                    Code-generation options (e.g. neuron-synapse pairs).
+
+    suffix:         str (optional)
+                    Suffix of generated model names.
+
+    logging_level:  str (optional)
+                    NESTML logging level. Default: 'ERROR'.
+
+    Returns
+    -------
+    module_name:    str
+                    Name of installed module.
+
+    '''
+    build_hash = get_build_hash(input_path, codegen_opts, suffix)
+    module_name = 'nestml_%s_module' % build_hash[:16]
+
+    build_path = os.path.join(get_cache_path(), build_hash)
+    install_path = os.path.join(build_path, 'install')
+    info_file = os.path.join(build_path, 'build_info.json')
+
+    if is_complete_build(info_file):
+        print('Using cached NESTML module %s' % module_name)
+    else:
+        os.makedirs(get_cache_path(), exist_ok = True)
+        with open(build_path + '.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)     ## released when the lock file is closed
+            if is_complete_build(info_file):     ## built by another process while waiting for the lock
+                print('Using cached NESTML module %s' % module_name)
+            else:
+                print('Building NESTML module %s...' % module_name)
+                import pynestml
+                from pynestml.frontend.pynestml_frontend import generate_nest_target
+
+                shutil.rmtree(build_path, ignore_errors = True)  ## remove incomplete or outdated builds
+                os.makedirs(build_path)
+                generate_nest_target(input_path = input_path,
+                                     target_path = os.path.join(build_path, 'target'),
+                                     install_path = install_path,
+                                     module_name = module_name,
+                                     logging_level = logging_level,
+                                     suffix = suffix,
+                                     codegen_opts = codegen_opts if codegen_opts else {})
+
+                ## mark build as complete (written atomically)
+                with open(info_file + '.tmp', 'w') as f:
+                    json.dump({
+                        'module_name': module_name,
+                        'input_files': [os.path.abspath(file_name) for file_name in get_nestml_files(input_path)],
+                        'codegen_opts': codegen_opts,
+                        'suffix': suffix,
+                        'nestml_version': get_nestml_version() or str(pynestml.__version__),
+                    }, f, indent = 4)
+                os.replace(info_file + '.tmp', info_file)
+
+    nest.Install(os.path.join(install_path, module_name))
+
+    return module_name
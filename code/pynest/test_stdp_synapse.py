@@ -1,24 +1,22 @@
 import nest                                                          # import NEST module
 import matplotlib.pyplot as plt                                      # for plotting
-from pynestml.frontend.pynestml_frontend import generate_nest_target # NESTML
+from nestml_build_cache import install_nestml_module                 # NESTML (cached build)
 import numpy
 
 def compile_nestml_code():
-    generate_nest_target(input_path=["../nestml/iaf_psc_exp.nestml",
-                                     "../nestml/stdp_synapse.nestml"],
-                         target_path="./nestml_target",
-                         logging_level='ERROR',
-                         suffix="_nestml",
-                         codegen_opts = {"neuron_synapse_pairs": [{"neuron": "iaf_psc_exp",
-                                                                   "synapse": "stdp",
-                                                                   "post_ports": ["post_spikes"]}]}
-    )    
-
+    # generate, compile and install NESTML module (reused from cache if sources and options are unchanged)
+    install_nestml_module(input_path=["../nestml/iaf_psc_exp.nestml",
+                                      "../nestml/stdp_synapse.nestml"],
+                          logging_level='ERROR',
+                          suffix="_nestml",
+                          codegen_opts = {"neuron_synapse_pairs": [{"neuron": "iaf_psc_exp",
+                                                                    "synapse": "stdp",
+                                                                    "post_ports": ["post_spikes"]}]}
+    )
+
+# make NESTML models available in NEST
 compile_nestml_code()
 
-# install resulting NESTML module to make models available in NEST
-nest.Install('nestmlmodule') 
-
 # after this, the following two models are available in NEST
 neuron_model_name = 'iaf_psc_exp_nestml__with_stdp_nestml'
 synapse_model_name = 'stdp_nestml__with_iaf_psc_exp_nestml'
@@ -0,0 +1,64 @@
+'''
+Connect-phase benchmark: NEST's native fixed_indegree rule vs. thread-invariant connectivity.
+
+For each number of threads, the model is set up with pars['thread_invariant_connectivity'] = False
+(sources drawn by the NEST kernel) and True (sources drawn by a seeded numpy generator and connected
+with array-based nest.Connect(); see Model.connect()). The runs are carried out by benchmark_model.py;
+the wall-clock times of the connect phase (incl. nest.Prepare()) are compared.
+
+'''
+
+import benchmark_model
+
+#################################################
+sweep = {
+    'N': [12500],                                 # total number of neurons
+    'K': [1250],                                  # total number of inputs per neuron
+    'n_threads': [1, 2, 4],                       # number of threads
+    'neuron_model': ['iaf_psc_alpha_nest'],       # neuron model
+    'thread_invariant_connectivity': [False, True],
+}
+
+T_bench = 10.                                     # simulation time (ms; only the connect phase is evaluated)
+n_repetitions = 3                                 # number of repetitions of each sweep point
+benchmark_file = './data/benchmark_connect.json'  # output file
+
+#################################################
+def compare_connect_times(results):
+    '''
+    Print the average connect time of native and thread-invariant connectivity for each sweep point.
+
+    Arguments
+    ---------
+    results:   dict
+               Benchmark results (see benchmark_model.run_benchmark()).
+
+    Returns
+    -------
+    times:     dict
+               Dictionary {(N, K, n_threads, neuron_model): {False: native time (s), True: thread-invariant time (s)}}.
+
+    '''
+    times = {}
+    for run in results['runs']:
+        if 'error' in run:
+            continue
+        point = run['parameters']
+        key = (point['N'], point['K'], point['n_threads'], point['neuron_model'])
+        times.setdefault(key, {}).setdefault(point['thread_invariant_connectivity'], []).append(run['time_connect'])
+    times = {key: {mode: sum(values) / len(values) for mode, values in modes.items()} for key, modes in times.items()}
+
+    print('\n%8s %6s %10s   %12s %12s %8s' % ('N', 'K', 'n_threads', 'native (s)', 'invariant (s)', 'ratio'))
+    for key in sorted(times.keys()):
+        native, invariant = times[key].get(False), times[key].get(True)
+        if native is None or invariant is None:
+            continue
+        print('%8d %6d %10d   %12.3f %12.3f %8.2f' % (key[0], key[1], key[2], native, invariant, invariant / native))
+
+    return times
+
+#################################################
+
+if __name__ == '__main__':
+    results = benchmark_model.run_benchmark(sweep, T_bench, benchmark_file, n_repetitions)
+    compare_connect_times(results)
@@ -0,0 +1,79 @@
+'''
+Import-time benchmark for the TwoPopulationNetworkPlastic model module.
+
+Measures the wall-clock time of "import model" (and of typical analysis-only usage)
+in fresh Python processes, and reports which heavy dependencies are loaded. NEST is 
+imported only once a simulation is set up (see lazy imports in model.py), and scipy only
+by the functions requiring it.
+
+'''
+
+import os
+import sys
+import json
+import subprocess
+
+#################################################
+n_repetitions = 5   # number of repetitions (fresh interpreter each)
+
+## code snippets to be timed; each snippet is executed in a fresh interpreter
+snippets = {
+    'import_model': 'import model',
+    'default_parameters': 'import model; model.get_default_parameters()',
+    'derive_parameters': 'import model; model.derive_parameters(model.get_default_parameters())',
+}
+
+## heavy modules reported if loaded by the snippets
+heavy_modules = ['nest', 'scipy.special', 'scipy.sparse']
+
+#################################################
+def time_snippet(snippet):
+    '''
+    Execute code snippet in a fresh Python process and return its wall-clock time (s) 
+    and the list of heavy modules loaded.
+    '''
+    code = '\n'.join([
+        'import sys, time, json',
+        't0 = time.perf_counter()',
+        snippet,
+        't1 = time.perf_counter()',
+        'print(json.dumps({"time": t1 - t0, "loaded": [m for m in %r if m in sys.modules]}))' % heavy_modules,
+    ])
+    output = subprocess.run([sys.executable, '-c', code], capture_output = True, text = True, check = True,
+                            cwd = os.path.dirname(os.path.abspath(__file__)))
+
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+#################################################
+def benchmark_import(snippets, n_repetitions = 5):
+    '''
+    Time code snippets in fresh Python processes.
+
+    Arguments
+    ---------
+    snippets:       dict
+                    Dictionary of code snippets {name: code}.
+
+    n_repetitions:  int (optional)
+                    Number of repetitions of each snippet. Default: 5.
+
+    Returns
+    -------
+    results:        dict
+                    Dictionary {name: {'times': list of times (s), 'min': minimum time (s), 'loaded': heavy modules loaded}}.
+
+    '''
+    results = {}
+    for name, snippet in snippets.items():
+        runs = [time_snippet(snippet) for repetition in range(n_repetitions)]
+        times = [run['time'] for run in runs]
+        loaded = sorted(set(sum([run['loaded'] for run in runs], [])))
+        results[name] = {'times': times, 'min': min(times), 'loaded': loaded}
+        print('%-20s %8.3f s (min. of %d)   heavy modules loaded: %s' % (name, min(times), n_repetitions, ', '.join(loaded) if loaded else '-'))
+
+    return results
+
+#################################################
+
+if __name__ == '__main__':
+    benchmark_import(snippets, n_repetitions)
@@ -0,0 +1,320 @@
+'''
+Phase-resolved benchmarks for the TwoPopulationNetworkPlastic model.
+
+For each point of a parameter sweep (combinations of N, K, n_threads and neuron_model),
+the model is run in a separate process, and the following quantities are recorded:
+
+- wall-clock time of each model phase (__init__, create, connect [incl. nest.Prepare()], simulate),
+- real-time factor of the simulation phase,
+- peak resident set size (RSS) of the process, and
+- NEST kernel timers ("time_*" entries of the kernel status).
+
+Results are stored in a json file, such that performance regressions between
+NEST and NESTML versions can be identified with compare_benchmarks().
+
+'''
+
+import os
+import time
+import json
+import platform
+import itertools
+import multiprocessing
+
+#################################################
+## default benchmark sweep
+sweep = {
+    'N': [1250, 12500],                       # total number of neurons
+    'K': [1250],                              # total number of inputs per neuron
+    'n_threads': [1, 4],                      # number of threads
+    'neuron_model': ['iaf_psc_alpha_nest'],   # 'iaf_psc_alpha_nest', 'iaf_psc_alpha_nestml' and/or 'ignore_and_fire_nestml'
+}
+
+T_bench = 1000.                                   # simulation time (ms)
+n_repetitions = 1                                 # number of repetitions of each sweep point
+benchmark_file = './data/benchmark_results.json'  # output file
+
+#################################################
+def get_peak_rss():
+    '''Return peak resident set size (MB) of the current process.'''
+
+    import resource
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  ## kB on Linux, bytes on macOS
+    if platform.system() == 'Darwin':
+        peak_rss /= 1024.
+
+    return peak_rss / 1024.
+
+#################################################
+def get_versions():
+    '''Return dictionary of NEST and NESTML versions (None if not available).'''
+
+    import nest
+    versions = {'nest': getattr(nest, '__version__', None), 'nestml': None}
+    try:
+        import pynestml
+        versions['nestml'] = pynestml.__version__
+    except ImportError:
+        pass
+
+    return versions
+
+#################################################
+def run_benchmark_instance(parameters, T):
+    '''
+    Run a single model instance and measure wall-clock time of each phase.
+
+    Arguments
+    ---------
+    parameters:  dict
+                 Model parameters.
+
+    T:           float
+                 Simulation time (ms).
+
+    Returns
+    -------
+    result:      dict
+                 Benchmark results.
+
+    '''
+    import nest
+    import model
+
+    result = {}
+
+    model.install_nestml_module(parameters['neuron_model'])
+
+    t0 = time.perf_counter()
+    model_instance = model.Model(parameters)
+    t1 = time.perf_counter()
+    model_instance.create()
+    t2 = time.perf_counter()
+    model_instance.connect()
+    t3 = time.perf_counter()
+    model_instance.simulate(T)
+    t4 = time.perf_counter()
+
+    result['time_init'] = t1 - t0
+    result['time_create'] = t2 - t1
+    result['time_connect'] = t3 - t2
+    result['time_simulate'] = t4 - t3
+    result['real_time_factor'] = (t4 - t3) / (T / 1000.)   ## wall-clock time / model time
+    result['peak_rss_MB'] = get_peak_rss()
+
+    kernel_status = nest.GetKernelStatus()
+    result['num_connections'] = kernel_status['num_connections']
+    result['kernel_timers'] = {key: value for key, value in kernel_status.items() if key.startswith('time_')}
+    result['derived_parameters'] = {key: model_instance.pars[key] for key in ['N_E', 'N_I', 'K_E', 'K_I', 'nu_X']}
+
+    return result
+
+#################################################
+def process_worker(function, args, queue):
+    '''Call function(*args) in a worker process and return result (or error) through queue.'''
+
+    try:
+        queue.put(function(*args))
+    except Exception as error:
+        queue.put({'error': repr(error)})
+
+#################################################
+def run_in_process(function, args, timeout = None, poll_interval = 1.):
+    '''
+    Call function(*args) in a fresh (spawned) process and return its result.
+
+    The result queue is polled while the process is alive, such that a worker that dies without
+    returning a result (e.g., killed by the OS or crashed in the NEST kernel) or exceeds the timeout
+    does not block the caller. Failed runs are returned as {'error': ..., 'exitcode': ...}.
+
+    Arguments
+    ---------
+    function:       callable
+                    Top-level (picklable) function returning a dict.
+
+    args:           tuple
+                    Arguments of function.
+
+    timeout:        float (optional)
+                    Maximum wall-clock time (s) of the run; the process is terminated after this time.
+                    Default: None (no limit).
+
+    poll_interval:  float (optional)
+                    Interval (s) in which the process state is checked. Default: 1 s.
+
+    Returns
+    -------
+    result:         dict
+                    Return value of function, or error description.
+
+    '''
+    import queue as queue_module
+
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target = process_worker, args = (function, args, queue))
+    t_start = time.perf_counter()
+    process.start()
+
+    result = None
+    while result is None:
+        try:
+            result = queue.get(timeout = poll_interval)
+        except queue_module.Empty:
+            if not process.is_alive():
+                try:
+                    result = queue.get(timeout = poll_interval)   ## result put just before exit
+                except queue_module.Empty:
+                    process.join()
+                    result = {'error': 'worker process terminated without result'}
+            elif timeout is not None and time.perf_counter() - t_start > timeout:
+                process.terminate()
+                result = {'error': 'timeout after %g s' % timeout}
+
+    process.join(poll_interval if 'error' in result else None)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+    if process.exitcode != 0:
+        if 'error' not in result:
+            result = {'error': 'worker process exited with code %s' % process.exitcode}
+        result['exitcode'] = process.exitcode
+
+    return result
+
+#################################################
+def get_sweep_points(sweep):
+    '''Return list of parameter dictionaries for all combinations of the parameter values in "sweep".'''
+
+    keys = list(sweep.keys())
+
+    return [dict(zip(keys, values)) for values in itertools.product(*[sweep[key] for key in keys])]
+
+#################################################
+def run_benchmark(sweep, T, filename, n_repetitions = 1, timeout = None):
+    '''
+    Run benchmarks for all points of a parameter sweep, and store results in json file.
+
+    Each run is executed in a fresh process to obtain independent peak-RSS measurements
+    and a clean NEST kernel.
+
+    Arguments
+    ---------
+    sweep:          dict
+                    Dictionary of parameter lists {parameter name: list of values}.
+
+    T:              float
+                    Simulation time (ms).
+
+    filename:       str
+                    Name of output (json) file.
+
+    n_repetitions:  int (optional)
+                    Number of repetitions of each sweep point. Default: 1.
+
+    timeout:        float (optional)
+                    Maximum wall-clock time (s) of each run (see run_in_process()). Runs exceeding the
+                    timeout or terminating abnormally are recorded as failed. Default: None (no limit).
+
+    Returns
+    -------
+    results:        dict
+                    Benchmark results.
+
+    '''
+    import model
+
+    results = {
+        'metadata': {
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'host': platform.node(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'T': T,
+        },
+        'runs': [],
+    }
+
+    for point in get_sweep_points(sweep):
+        for repetition in range(n_repetitions):
+            print('\nBenchmark: %s (repetition %d/%d)' % (point, repetition + 1, n_repetitions))
+
+            parameters = model.get_default_parameters()
+            parameters.update(point)
+            parameters['record_spikes'] = False
+            parameters['print_simulation_progress'] = False
+            parameters['data_path'] = os.path.dirname(filename) + '/benchmark_' + parameters['neuron_model']
+
+            result = run_in_process(run_benchmark_instance, (parameters, T), timeout)
+
+            if 'error' in result:
+                print('Benchmark failed: %s' % result['error'])
+
+            run = {'parameters': point, 'repetition': repetition}
+            run.update(result)
+            results['runs'] += [run]
+
+    results['metadata']['versions'] = run_in_process(get_versions, (), timeout)
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok = True)
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent = 4)
+    print('\nBenchmark results written to %s' % filename)
+
+    return results
+
+#################################################
+def compare_benchmarks(filename_ref, filename, tolerance = 0.1):
+    '''
+    Compare phase timings and peak memory of two benchmark result files, and report regressions.
+
+    Arguments
+    ---------
+    filename_ref:   str
+                    Benchmark file of reference version.
+
+    filename:       str
+                    Benchmark file of new version.
+
+    tolerance:      float (optional)
+                    Relative increase of a measure above which a regression is reported. Default: 0.1.
+
+    Returns
+    -------
+    regressions:    list(tuple)
+                    List of (sweep point, measure, reference value, new value).
+
+    '''
+    measures = ['time_init', 'time_create', 'time_connect', 'time_simulate', 'peak_rss_MB']
+
+    def average_runs(filename):
+        with open(filename, 'r') as f:
+            runs = json.load(f)['runs']
+        averages = {}
+        for run in runs:
+            if 'error' in run:
+                continue
+            key = json.dumps(run['parameters'], sort_keys = True)
+            averages.setdefault(key, []).append([run[measure] for measure in measures])
+        return {key: dict(zip(measures, [sum(v) / len(v) for v in zip(*values)])) for key, values in averages.items()}
+
+    ref = average_runs(filename_ref)
+    new = average_runs(filename)
+
+    regressions = []
+    for key in sorted(set(ref.keys()) & set(new.keys())):
+        for measure in measures:
+            if new[key][measure] > (1. + tolerance) * ref[key][measure]:
+                regressions += [(key, measure, ref[key][measure], new[key][measure])]
+                print('Regression for %s: %s = %.3f (reference: %.3f)' % (key, measure, new[key][measure], ref[key][measure]))
+
+    if len(regressions) == 0:
+        print('No regressions found.')
+
+    return regressions
+
+#################################################
+
+if __name__ == '__main__':
+    run_benchmark(sweep, T_bench, benchmark_file, n_repetitions)
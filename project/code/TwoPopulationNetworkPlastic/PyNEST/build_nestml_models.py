@@ -1,10 +1,18 @@
-import nest
-from pynestml.frontend.pynestml_frontend import generate_nest_target
+import os
+import sys
+
+## shared NESTML build cache: installed module, or code/pynest/nestml_build_cache.py in the repository root
+repository_root = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, os.pardir, os.pardir))
+try:
+    import nestml_build_cache
+except ImportError:
+    sys.path.insert(0, os.path.join(repository_root, 'code', 'pynest'))
+    import nestml_build_cache
 
 #################################################
 ## create nest models from nestml
 
-path_to_nestml_models = '../nestml_models'
+path_to_nestml_models = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../nestml_models')
 
 # def install_nestml_module():
 #     input_path = [path_to_nestml_models + "/iaf_psc_alpha.nestml"
@@ -19,21 +27,35 @@ path_to_nestml_models = '../nestml_models'
 #     )    
 
 def install_nestml_module():
+    '''
+    Generate, compile and install the NESTML module, or install it from the build cache 
+    if the NESTML sources and code-generation options are unchanged.
+    '''
     input_path = [path_to_nestml_models + "/iaf_psc_alpha.nestml",
                   path_to_nestml_models + "/stdp_pl_synapse.nestml"
     ]
 
-    target_path = "./nestml_target"
-      
-    generate_nest_target(input_path=input_path,
-                         target_path=target_path,
+    return nestml_build_cache.install_nestml_module(input_path=input_path,
                          logging_level='ERROR',
                          suffix="_nestml",
                          codegen_opts = {"neuron_synapse_pairs": [{"neuron": "iaf_psc_alpha",
                                                                    "synapse": "stdp_pl",
                                                                    "post_ports": ["post_spikes"]}]}
     )    
+
+def install_ignore_and_fire_module():
+    '''
+    Generate, compile and install the NESTML module containing the ignore_and_fire neuron 
+    (calibration mode, see pars['neuron_model']), or install it from the build cache.
+    '''
+    input_path = [path_to_nestml_models + "/ignore_and_fire.nestml"]
+
+    return nestml_build_cache.install_nestml_module(input_path=input_path,
+                         logging_level='ERROR',
+                         suffix="_nestml",
+    )
     
 #################################################
 
-install_nestml_module()
+if __name__ == '__main__':
+    install_nestml_module()
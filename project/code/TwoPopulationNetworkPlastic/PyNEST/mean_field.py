@@ -0,0 +1,210 @@
+'''
+Mean-field (Siegert) rate predictions for the TwoPopulationNetworkPlastic model.
+
+Predicts stationary firing rates for many combinations of the parameters eta, g, J_E and K
+in one batched (vectorized) call, such that parameter sets resulting in silent or
+runaway activity can be identified before simulating them.
+
+The predictions are based on the diffusion approximation of the synaptic input of
+leaky integrate-and-fire neurons, the Siegert formula for the output rate, and the
+correction of threshold and reset for synaptic filtering by Fourcaud & Brunel (2002).
+Excitatory and inhibitory neurons receive statistically identical input and therefore
+fire at the same rate. Synaptic plasticity is neglected (initial weights).
+
+'''
+
+import numpy as np
+import model
+
+## correction factor for synaptic filtering, sqrt(2) |zeta(1/2)| (Fourcaud & Brunel, 2002)
+alpha_fb = np.sqrt(2.) * 1.4603545088095868
+
+#################################################
+def derive_rate_parameters(parameters, eta, g, J_E, K):
+    '''
+    Compute the parameters entering the mean-field equations (vectorized version of
+    model.derive_parameters()) for arrays of eta, g, J_E and K.
+
+    Arguments
+    ---------
+    parameters:   dict
+                  Base model parameters (see model.get_default_parameters()).
+
+    eta, g, J_E, K:
+                  float or numpy.ndarray
+                  Relative external rate, relative inhibitory strength, EPSP amplitude (mV),
+                  and total in-degree (broadcast against each other).
+
+    Returns
+    -------
+    pars:         dict
+                  Dictionary of (broadcast) arrays 'eta', 'g', 'J_E', 'K', 'K_E', 'K_I', 'J_unit',
+                  'I_E', 'I_I', 'I_X', 'nu_theta' and 'nu_X' (same definitions as in model.derive_parameters()).
+
+    '''
+    eta, g, J_E, K = np.broadcast_arrays(*[np.asarray(x, dtype = float) for x in [eta, g, J_E, K]])
+
+    pars = {'eta': eta, 'g': g, 'J_E': J_E, 'K': K}
+    pars['K_E'] = np.floor(parameters['beta'] * K)
+    pars['K_I'] = K - pars['K_E']
+    pars['J_unit'] = model.unit_psp_amplitude(parameters['tau_m'], parameters['C_m'], parameters['tau_s'])
+    pars['I_E'] = J_E / pars['J_unit']
+    pars['I_I'] = - g * pars['I_E']
+    pars['I_X'] = pars['I_E']
+    pars['nu_theta'] = 1000. * parameters['theta'] * parameters['C_m'] / (pars['I_X'] * np.exp(1.) * parameters['tau_m'] * parameters['tau_s'])
+    pars['nu_X'] = eta * pars['nu_theta']
+
+    return pars
+
+#################################################
+def get_input_moments(parameters, pars, nu):
+    '''
+    Return mean mu (mV) and standard deviation sigma (mV) of the free membrane potential for
+    the network rate nu (spikes/s), with pars as returned by derive_rate_parameters().
+
+    Each alpha-shaped PSC of amplitude I contributes the charge I e tau_s, i.e., a
+    potential jump J = I e tau_s / C_m in the diffusion approximation.
+    '''
+    tau_m = parameters['tau_m']
+    jump = np.exp(1.) * parameters['tau_s'] / parameters['C_m']   ## potential jump per unit PSC amplitude (mV/pA)
+    J_E = pars['I_E'] * jump
+    J_I = pars['I_I'] * jump
+    J_X = pars['I_X'] * jump
+    nu = nu / 1000.                      ## 1/ms
+    nu_X = pars['nu_X'] / 1000.
+
+    mu = parameters['E_L'] + parameters['I_DC'] * tau_m / parameters['C_m'] + \
+         tau_m * (pars['K_E'] * nu * J_E + pars['K_I'] * nu * J_I + nu_X * J_X)
+    sigma = np.sqrt(tau_m * (pars['K_E'] * nu * J_E**2 + pars['K_I'] * nu * J_I**2 + nu_X * J_X**2))
+
+    return mu, sigma
+
+#################################################
+def siegert_rate(parameters, mu, sigma, n_quad = 100, chunk_size = 100000):
+    '''
+    Return stationary firing rates (spikes/s) of LIF neurons with input mean mu (mV) and
+    standard deviation sigma (mV) (arrays of arbitrary, identical shape), according to the
+    Siegert formula with threshold and reset shifted for synaptic filtering.
+
+    The integral of exp(u^2) (1 + erf(u)) = erfcx(-u) is computed by Gauss-Legendre
+    quadrature with n_quad nodes for all elements at once (in chunks of chunk_size elements).
+    '''
+    import scipy.special
+
+    mu, sigma = np.broadcast_arrays(np.asarray(mu, dtype = float), np.asarray(sigma, dtype = float))
+    shape = mu.shape
+    mu = mu.ravel()
+    sigma = np.maximum(sigma.ravel(), 1e-12)
+
+    shift = sigma * alpha_fb / 2. * np.sqrt(parameters['tau_s'] / parameters['tau_m'])
+    y_th = (parameters['theta'] + shift - mu) / sigma
+    y_r = (parameters['V_reset'] + shift - mu) / sigma
+
+    nodes, weights = np.polynomial.legendre.leggauss(n_quad)
+    rate = np.zeros(len(mu))
+    firing = y_th < 20.             ## rates are numerically zero otherwise (erfcx(-20) ~ 10^174)
+    for start in range(0, len(mu), chunk_size):
+        index = np.arange(start, min(start + chunk_size, len(mu)))
+        index = index[firing[index]]
+        a = y_r[index, np.newaxis]
+        b = y_th[index, np.newaxis]
+        u = 0.5 * (b - a) * nodes + 0.5 * (b + a)
+        integral = 0.5 * (b[:,0] - a[:,0]) * (weights * scipy.special.erfcx(-u)).sum(axis = 1)
+        rate[index] = 1000. / (parameters['t_ref'] + parameters['tau_m'] * np.sqrt(np.pi) * integral)
+
+    return rate.reshape(shape)
+
+#################################################
+def get_stationary_rates(parameters, eta, g, J_E, K, nu_max = None, n_grid = 200, n_bisection = 50):
+    '''
+    Predict self-consistent stationary firing rates for arrays of eta, g, J_E and K.
+
+    For each parameter combination, the fixed-point equation nu = Phi(nu) (Phi: Siegert rate for
+    the input generated by network rate nu) is evaluated on a logarithmic rate grid in
+    [10^-3 spikes/s, nu_max]. The lowest stable fixed point (sign change of Phi(nu) - nu from
+    positive to negative) is refined by bisection. All steps are vectorized over parameter
+    combinations.
+
+    Arguments
+    ---------
+    parameters:   dict
+                  Base model parameters (see model.get_default_parameters()).
+
+    eta, g, J_E, K:
+                  float or numpy.ndarray
+                  Parameter values (broadcast against each other).
+
+    nu_max:       float (optional)
+                  Maximum rate (spikes/s) considered. Default: 1000 / t_ref.
+
+    n_grid:       int (optional)
+                  Number of grid points. Default: 200.
+
+    n_bisection:  int (optional)
+                  Number of bisection steps. Default: 50.
+
+    Returns
+    -------
+    rates:        numpy.ndarray
+                  Lowest stable stationary rates (spikes/s); NaN if no stable fixed point below nu_max exists.
+
+    n_fixed_points:
+                  numpy.ndarray
+                  Number of fixed points found on the grid (stable and unstable; > 1 indicates multistability).
+
+    '''
+    pars = derive_rate_parameters(parameters, eta, g, J_E, K)
+    shape = pars['eta'].shape
+    pars = {key: value.ravel()[:, np.newaxis] for key, value in pars.items()}
+
+    if nu_max is None:
+        nu_max = 1000. / parameters['t_ref']
+    grid = np.logspace(-3, np.log10(nu_max), n_grid)
+
+    def excess_rate(nu):
+        mu, sigma = get_input_moments(parameters, pars, nu)
+        return siegert_rate(parameters, mu, sigma) - nu
+
+    F = excess_rate(grid[np.newaxis, :])
+    sign = np.sign(F)
+    crossings = sign[:, 1:] != sign[:, :-1]
+    stable = crossings & (F[:, :-1] > 0)
+    n_fixed_points = crossings.sum(axis = 1) + (F[:, 0] < 0)   ## F < 0 at lowest grid point: fixed point at (almost) zero rate
+
+    ## bracket of lowest stable fixed point
+    has_stable = stable.any(axis = 1)
+    k = np.argmax(stable, axis = 1)
+    lower = grid[k].astype(float)
+    upper = grid[np.minimum(k + 1, n_grid - 1)].astype(float)
+    for step in range(n_bisection):
+        middle = np.sqrt(lower * upper)
+        positive = excess_rate(middle[:, np.newaxis])[:, 0] > 0
+        lower = np.where(positive, middle, lower)
+        upper = np.where(positive, upper, middle)
+
+    rates = np.where(has_stable, np.sqrt(lower * upper), np.nan)
+    rates = np.where(F[:, 0] < 0, 0., rates)     ## silent fixed point
+
+    return rates.reshape(shape), n_fixed_points.reshape(shape)
+
+#################################################
+def screen_parameters(parameters, eta, g, J_E, K, rate_silent = 0.1, rate_runaway = 100.):
+    '''
+    Classify parameter combinations according to their predicted stationary rates.
+
+    Returns
+    -------
+    rates:    numpy.ndarray
+              Predicted rates (spikes/s; see get_stationary_rates()).
+
+    labels:   numpy.ndarray
+              'silent' (rate < rate_silent), 'runaway' (rate > rate_runaway or no stable fixed point), or 'ok'.
+
+    '''
+    rates = get_stationary_rates(parameters, eta, g, J_E, K)[0]
+
+    labels = np.full(rates.shape, 'ok', dtype = object)
+    labels[rates < rate_silent] = 'silent'
+    labels[np.isnan(rates) | (rates > rate_runaway)] = 'runaway'
+
+    return rates, labels
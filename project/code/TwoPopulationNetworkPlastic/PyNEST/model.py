@@ -5,14 +5,33 @@ Model definition, PyNEST implementation, and associated helper functions.
 
 Default parameters are provided in "parameter_dicts.py".
 
+NEST and scipy are imported lazily, i.e., the data loaders, analysis functions and
+parameter derivation can be used without NEST (and without starting the NEST kernel).
+
 """
 
 import sys
 import os
 import numpy as np
 import copy
-import nest
-import scipy.special
+import importlib
+
+##############################################
+class LazyModule:
+    '''
+    Proxy for a module that is imported on first attribute access.
+    '''
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attribute)
+
+nest = LazyModule('nest')  ## NEST (and the kernel) is started by the first call of a nest function
+
 
 ##############################################
 class Model:
@@ -51,7 +70,7 @@ class Model:
 
         '''
         
-        print("\nInitialising model and simulation...")
+        rank_print("\nInitialising model and simulation...")
 
         # set parameters derived from base parameters
         self.__derived_parameters(parameters)
@@ -72,6 +91,16 @@ class Model:
             'overwrite_files': True, 
         })
         np.random.seed(self.pars['seed'])
+
+        ## MPI rank of the local process and total number of processes
+        self.rank = nest.Rank()
+        self.pars['n_processes'] = nest.NumProcesses()
+
+        self.__spike_data_written = False
+        self.__weight_data_written = False
+        self.__n_weight_events = 0
+        self.__connectivity_files = {}  ## {label: {'path': directory, 'format': file format}} of connectivity files written by get_connectivity()
+        self.online_statistics = None
         
         nest.set_verbosity(self.pars['nest_verbosity'])
 
@@ -105,6 +134,13 @@ class Model:
                 'tau_minus': self.pars['stdp_tau_minus'],
                 'V_m': self.pars['V_init_min'],                
             }
+
+        elif self.pars['neuron_model'] == 'ignore_and_fire_nestml':
+            ## calibration mode: neurons fire at a fixed rate irrespective of their inputs
+            self.__neuron_params = {
+                'firing_rate': self.pars['ignore_and_fire_rate'],
+                'tau_minus': self.pars['stdp_tau_minus'],
+            }
                         
     ##############################################        
     def __derived_parameters(self,parameters):
@@ -121,26 +157,7 @@ class Model:
 
         """
         
-        self.pars = copy.deepcopy(parameters)
-
-        self.pars['N_E'] = int(self.pars['beta'] * self.pars['N'])  # number of excitatory neurons
-        self.pars['N_I'] = self.pars['N']-self.pars['N_E']           # number of inhibitory neurons        
-        self.pars['K_E'] = int(self.pars['beta'] * self.pars['K'])  # number of excitatory inputs per neuron
-        self.pars['K_I'] = self.pars['K']-self.pars['K_E']           # number of inhibitory inputs per neuron
-
-        # conversion of PSP amplitudes to PSC amplitudes
-        self.pars['J_unit'] = unit_psp_amplitude(self.pars['tau_m'], self.pars['C_m'], self.pars['tau_s']) # unit PSP amplitude        
-        self.pars['I_E'] = self.pars['J_E'] / self.pars['J_unit']  # EPSC amplitude for local inputs (pA)
-        self.pars['I_I'] = - self.pars['g'] * self.pars['I_E']     # IPSC amplitude (pA)
-        self.pars['I_X'] = self.pars['I_E']                        # EPSC amplitude for external inputs (pA)
-        
-        # rate of external Poissonian sources
-        self.pars['nu_theta'] = 1000. * self.pars['theta'] * self.pars['C_m'] / (self.pars['I_X'] * np.exp(1.) * self.pars['tau_m'] * self.pars['tau_s'])
-        self.pars['nu_X'] = self.pars['eta'] * self.pars['nu_theta']
-
-        # number of neurons spikes are recorded from
-        if self.pars['N_rec_spikes'] == 'all':
-            self.pars['N_rec_spikes'] = self.pars['N']
+        self.pars = derive_parameters(parameters)
 
         return
 
@@ -152,22 +169,37 @@ class Model:
         A dictionary containing all node IDs is stored as model attribute self.nodes.
 
         '''
-        print("\nCreating and configuring nodes...")
+        rank_print("\nCreating and configuring nodes...")
         
         # create neuron populations
         if self.pars['neuron_model'] == 'iaf_psc_alpha_nest': 
             pop_all = nest.Create('iaf_psc_alpha', self.pars['N'], self.__neuron_params) # overall population
         elif self.pars['neuron_model'] ==  'iaf_psc_alpha_nestml':
             pop_all = nest.Create('iaf_psc_alpha_nestml__with_stdp_pl_nestml', self.pars['N'], self.__neuron_params) # overall population
+        elif self.pars['neuron_model'] ==  'ignore_and_fire_nestml':
+            pop_all = nest.Create('ignore_and_fire_nestml', self.pars['N'], self.__neuron_params) # overall population
 
         # set random initial membrane potentials
-        if self.pars['neuron_model'] == 'iaf_psc_alpha_nest':
+        if self.pars['thread_invariant_connectivity']:
+            # draws from a seeded numpy generator for all neurons (independent of the number of threads and processes)
+            rng = np.random.default_rng([self.pars['seed'], 0])
+            if self.pars['neuron_model'] == 'ignore_and_fire_nestml':
+                pop_all.phase = rng.uniform(low = 0., high = 1., size = self.pars['N'])
+            else:
+                pop_all.V_m = rng.uniform(low = self.pars['V_init_min'], high = self.pars['V_init_max'], size = self.pars['N'])
+
+        elif self.pars['neuron_model'] == 'iaf_psc_alpha_nest':
             random_vm = nest.random.uniform(self.pars['V_init_min'],self.pars['V_init_max'])                    
             nest.GetLocalNodeCollection(pop_all).V_m = random_vm                    
 
         elif self.pars['neuron_model'] == 'iaf_psc_alpha_nestml':             
             random_vm = np.random.uniform(low = self.pars['V_init_min'],high = self.pars['V_init_max'],size=self.pars['N'])
             pop_all.V_m = random_vm                                                                                                            
+
+        elif self.pars['neuron_model'] == 'ignore_and_fire_nestml':
+            # set random firing phases (asynchronous firing)
+            random_phase = np.random.uniform(low = 0., high = 1., size = self.pars['N'])
+            pop_all.phase = random_phase
         pop_E = pop_all[:self.pars['N_E']]    # population of exitatory neurons
         pop_I = pop_all[self.pars['N_E']:]    # population of inhibitory neurons
 
@@ -177,22 +209,50 @@ class Model:
         # create recording devices
         if self.pars['record_spikes']:
             # create, configure and connect spike detectors
-            spike_recorder = nest.Create('spike_recorder', {'record_to': 'ascii', 'label': 'spikes'})
+            if self.pars['spike_recording_format'] == 'ascii':
+                spike_recorder = nest.Create('spike_recorder', {'record_to': 'ascii', 'label': 'spikes'})
+            elif self.pars['spike_recording_format'] == 'binary':
+                ## spikes are buffered in memory and written to binary files after each call of simulate()
+                spike_recorder = nest.Create('spike_recorder', {
+                    'record_to': 'memory',
+                    'label': 'spikes',
+                    'time_in_steps': self.pars['spike_time_format'] == 'steps',
+                })
         else:
             spike_recorder = None
 
-        # if self.pars['record_weights']:
-        #     # create, configure and connect weight recorder
-        #     weight_recorder = nest.Create('weight_recorder', {
-        #         'start': self.pars['weight_recording_start_time'],
-        #         'record_to': 'ascii',
-        #         'label': 'weights'
-        #     })
-        # else:
-        #     weight_recorder = None
+        if self.pars['analysis_interval'] is not None:
+            # spike recorders for online statistics (only spike counts are evaluated)
+            online_recorders = nest.Create('spike_recorder', 2, {'record_to': 'memory', 'label': 'online'})
+        else:
+            online_recorders = None
+
+        if self.pars['record_weights']:
+            # create and configure weight recorder for synapses between randomly sampled 
+            # E senders and E targets; weight updates are buffered in memory and written 
+            # to binary files after each chunk of pars['flush_interval'] or pars['analysis_interval'] 
+            # ms (see simulate() and __write_weight_data())
+            weight_recorder = nest.Create('weight_recorder', {
+                'start': self.pars['weight_recording_start_time'],
+                'record_to': 'memory',
+                'label': 'weights'
+            })
+            pop_E_ids = np.array(pop_E.tolist())
+            weight_recording_nodes = {}
+            for key in ['senders', 'targets']:
+                n_sample = self.pars['weight_recording_n_%s' % key]
+                if n_sample is not None and n_sample < len(pop_E_ids):
+                    sample = np.sort(np.random.choice(pop_E_ids, n_sample, replace = False))
+                    weight_recording_nodes[key] = nest.NodeCollection(sample.tolist())
+                    weight_recorder.set({key: weight_recording_nodes[key]})
+                else:
+                    weight_recording_nodes[key] = pop_E
+        else:
+            weight_recorder = None
+            weight_recording_nodes = {'senders': None, 'targets': None}
 
         # configure connections
-        if self.pars['neuron_model'] == 'iaf_psc_alpha_nest': 
+        if self.pars['neuron_model'] in ['iaf_psc_alpha_nest', 'ignore_and_fire_nestml']: 
             nest.CopyModel("stdp_pl_synapse_hom_hpc", "excitatory_plastic", {
                 "weight": self.pars['I_E'],
                 "delay": self.pars['delay'],
@@ -204,7 +264,6 @@ class Model:
 
         elif self.pars['neuron_model'] == 'iaf_psc_alpha_nestml': 
             nest.CopyModel('stdp_pl_nestml__with_iaf_psc_alpha_nestml',"excitatory_plastic", {
-                #'weight_recorder': weight_recorder[0],
                 'weight': self.pars['I_E'],
                 'w_0': self.pars['stdp_w_0'],                
                 'lambda': self.pars['stdp_lambda'],
@@ -216,8 +275,11 @@ class Model:
                 'receptor_type': 0
             })
             
-        # if self.pars['record_weights']:
-        #     nest.SetDefaults('excitatory_plastic',{'weight_recorder': weight_recorder})
+        if self.pars['record_weights']:
+            # the weight recorder is a property of the synapse model: only the synapses between sampled 
+            # senders and targets are created with a copy of the plastic model carrying the recorder 
+            # (see __connect_plastic()), such that the other synapses do not emit weight-recorder events
+            nest.CopyModel('excitatory_plastic', 'excitatory_plastic_recorded', {'weight_recorder': weight_recorder})
             
         nest.CopyModel("static_synapse_hpc", "excitatory_static", {
             "weight": self.pars['I_E'],
@@ -239,7 +301,10 @@ class Model:
         self.nodes['pop_I'] = pop_I
         self.nodes['poisson'] = poisson
         self.nodes['spike_recorder'] = spike_recorder
-        #self.nodes['weight_recorder'] = weight_recorder        
+        self.nodes['online_recorders'] = online_recorders
+        self.nodes['weight_recorder'] = weight_recorder        
+        self.nodes['weight_recording_senders'] = weight_recording_nodes['senders']
+        self.nodes['weight_recording_targets'] = weight_recording_nodes['targets']
 
         return
     
@@ -250,7 +315,7 @@ class Model:
 
         '''
         
-        print("\nConnecting network and devices...")
+        rank_print("\nConnecting network and devices...")
         ## fetch neuron populations and device ids
         pop_all = self.nodes['pop_all']
         pop_E = self.nodes['pop_E']
@@ -259,13 +324,71 @@ class Model:
         spike_recorder = self.nodes['spike_recorder']
 
         # connect network
+        if self.pars['thread_invariant_connectivity']:
+            self.__connect_thread_invariant()
+        else:
+            self.__connect_native()
+
+        # connect external Poissonian sources (stimulus)
+        nest.Connect(poisson, pop_all, syn_spec ="external")
+        
+        # connect recording devices (to the first N_rec_spikes neurons)
+        if self.pars['record_spikes']:
+            nest.Connect(pop_all[:self.pars['N_rec_spikes']], spike_recorder)
+
+        # connect recording devices for online statistics (to all E and I neurons)
+        if self.pars['analysis_interval'] is not None:
+            nest.Connect(pop_E, self.nodes['online_recorders'][0])
+            nest.Connect(pop_I, self.nodes['online_recorders'][1])
+
+        '''
+        Since the introduction of the 5g kernel in NEST 2.16.0 
+        the full connection infrastructure, including presynaptic connectivity, 
+        is set up in the preparation phase of the simulation.
+        The preparation phase is usually induced by the first
+        "nest.Simulate()" call. For including this phase in measurements of the 
+        connection time, we induce it here explicitly by calling ``nest.Prepare()``.            
+        '''    
+        nest.Prepare()
+        nest.Cleanup()
+
+        return
+
+    ##############################################
+    def __connect_native(self):
+        '''
+        Connect neuron populations using NEST's fixed_indegree rule (random sources drawn by the kernel).
+        '''
+        pop_all = self.nodes['pop_all']
+        pop_E = self.nodes['pop_E']
+        pop_I = self.nodes['pop_I']
+
         ## EE connections (plastic)
-        nest.Connect(pop_E, pop_E, conn_spec = {
-            'rule': 'fixed_indegree',
-            'indegree': self.pars['K_E'],
-            'allow_autapses': self.pars['allow_autapses'],
-            'allow_multapses': self.pars['allow_multapses'],
-        }, syn_spec="excitatory_plastic")
+        if self.pars['record_weights']:
+            ## sources of the sampled targets of the weight recording are drawn outside the kernel (seeded numpy 
+            ## generator), such that the synapses with sampled senders can be created with the recorded 
+            ## synapse model (see __connect_plastic())
+            target_ids = np.array(pop_E.tolist())
+            recorded_target_ids = np.array(self.nodes['weight_recording_targets'].tolist())
+            other_target_ids = np.setdiff1d(target_ids, recorded_target_ids)
+            rng = np.random.default_rng([self.pars['seed'], 2])
+            chunk_size = max(self.pars['connectivity_chunk_size'] // max(self.pars['K_E'], 1), 1)   ## number of targets per chunk
+            for start in range(0, len(recorded_target_ids), chunk_size):
+                targets = recorded_target_ids[start:start + chunk_size]
+                sources = get_fixed_indegree_sources(rng, target_ids, targets, self.pars['K_E'], 
+                                                     self.pars['allow_autapses'], self.pars['allow_multapses'])
+                self.__connect_plastic(sources.ravel(), np.repeat(targets, self.pars['K_E']))
+            pop_E_targets = nest.NodeCollection(other_target_ids.tolist()) if len(other_target_ids) > 0 else None
+        else:
+            pop_E_targets = pop_E
+
+        if pop_E_targets is not None:
+            nest.Connect(pop_E, pop_E_targets, conn_spec = {
+                'rule': 'fixed_indegree',
+                'indegree': self.pars['K_E'],
+                'allow_autapses': self.pars['allow_autapses'],
+                'allow_multapses': self.pars['allow_multapses'],
+            }, syn_spec="excitatory_plastic")
 
         ## EI connections (static)
         nest.Connect(pop_E, pop_I, conn_spec = {
@@ -283,23 +406,66 @@ class Model:
             'allow_multapses': self.pars['allow_multapses'],
         }, syn_spec="inhibitory")
 
-        # connect external Poissonian sources (stimulus)
-        nest.Connect(poisson, pop_all, syn_spec ="external")
-        
-        # connect recording devices (to the first N_rec_spikes neurons)
-        if self.pars['record_spikes']:
-            nest.Connect(pop_all[:self.pars['N_rec_spikes']], spike_recorder)
+        return
 
+    ##############################################
+    def __connect_thread_invariant(self):
         '''
-        Since the introduction of the 5g kernel in NEST 2.16.0 
-        the full connection infrastructure, including presynaptic connectivity, 
-        is set up in the preparation phase of the simulation.
-        The preparation phase is usually induced by the first
-        "nest.Simulate()" call. For including this phase in measurements of the 
-        connection time, we induce it here explicitly by calling ``nest.Prepare()``.            
-        '''    
-        nest.Prepare()
-        nest.Cleanup()
+        Connect neuron populations with fixed in-degrees, using source lists drawn from a seeded 
+        numpy generator outside the NEST kernel (see get_fixed_indegree_sources()). 
+
+        Each MPI process draws the sources of all targets (in chunks of targets), and connects them 
+        with array-based nest.Connect() (one_to_one), which creates only the connections of local targets.
+        The network is therefore identical for any number of threads and MPI processes.
+        '''
+        pop_all = self.nodes['pop_all']
+        pop_E = self.nodes['pop_E']
+        pop_I = self.nodes['pop_I']
+
+        rng = np.random.default_rng([self.pars['seed'], 1])
+
+        projections = [
+            ## (sources, targets, in-degree, allow_autapses, allow_multapses, synapse model)
+            (pop_E, pop_E, self.pars['K_E'], self.pars['allow_autapses'], self.pars['allow_multapses'], 'excitatory_plastic'),
+            (pop_E, pop_I, self.pars['K_E'], False, True, 'excitatory_static'),
+            (pop_I, pop_all, self.pars['K_I'], self.pars['allow_autapses'], self.pars['allow_multapses'], 'inhibitory'),
+        ]
+
+        for pop_pre, pop_post, indegree, allow_autapses, allow_multapses, synapse_model in projections:
+            source_ids = np.array(pop_pre.tolist())
+            target_ids = np.array(pop_post.tolist())
+            chunk_size = max(self.pars['connectivity_chunk_size'] // max(indegree, 1), 1)   ## number of targets per chunk
+            for start in range(0, len(target_ids), chunk_size):
+                targets = target_ids[start:start + chunk_size]
+                sources = get_fixed_indegree_sources(rng, source_ids, targets, indegree, allow_autapses, allow_multapses)
+                if synapse_model == 'excitatory_plastic':
+                    self.__connect_plastic(sources.ravel(), np.repeat(targets, indegree))
+                else:
+                    nest.Connect(sources.ravel(), np.repeat(targets, indegree), conn_spec = 'one_to_one', 
+                                 syn_spec = {'synapse_model': synapse_model})
+
+        return
+
+    ##############################################
+    def __connect_plastic(self, sources, targets):
+        '''
+        Create plastic E->E connections between the node ids in the arrays "sources" and "targets" (one_to_one).
+
+        With weight recording, connections between sampled senders and sampled targets (see create()) 
+        are created with the synapse model 'excitatory_plastic_recorded', which carries the weight 
+        recorder, and all other connections with 'excitatory_plastic'. Both models have identical
+        parameters and dynamics.
+        '''
+        if self.pars['record_weights']:
+            recorded = np.isin(sources, self.nodes['weight_recording_senders'].tolist()) & \
+                np.isin(targets, self.nodes['weight_recording_targets'].tolist())
+            if recorded.any():
+                nest.Connect(sources[recorded], targets[recorded], conn_spec = 'one_to_one', 
+                             syn_spec = {'synapse_model': 'excitatory_plastic_recorded'})
+            sources, targets = sources[~recorded], targets[~recorded]
+
+        if len(sources) > 0:
+            nest.Connect(sources, targets, conn_spec = 'one_to_one', syn_spec = {'synapse_model': 'excitatory_plastic'})
 
         return
 
@@ -308,6 +474,17 @@ class Model:
         '''
         Run simulation.
 
+        If pars['analysis_interval'] is not None, the simulation is carried out in chunks of 
+        pars['analysis_interval'] ms (using nest.Prepare(), nest.Run() and nest.Cleanup()). After each chunk, 
+        the E and I spike counts and the histogram of E->E weights (bins defined by pars['weight_bins']) 
+        are computed and stored in self.online_statistics. At the end of the simulation, the statistics 
+        are saved to the data path (see save_online_statistics()).
+
+        Data buffered in memory by the recording devices (spikes in binary format, weights) are written to file 
+        after each chunk. Without online statistics, the simulation is therefore split into chunks of 
+        pars['flush_interval'] ms if such data are recorded, such that the buffers do not grow with 
+        the simulation time.
+
         Arguments
         ---------
         t_sim: float
@@ -315,16 +492,190 @@ class Model:
     
         '''
     
-        print("\nSimulating...")
-    
-        nest.Simulate(t_sim)
+        rank_print("\nSimulating...")
+
+        if self.pars['analysis_interval'] is not None:
+            self.__simulate_chunked(t_sim, self.pars['analysis_interval'], online_statistics = True)
+        elif self.__has_memory_buffers() and self.pars['flush_interval'] is not None:
+            self.__simulate_chunked(t_sim, self.pars['flush_interval'], online_statistics = False)
+        else:
+            nest.Simulate(t_sim)
+
+            self.__write_recorded_data()
+
+        return
+
+    ##############################################
+    def __has_memory_buffers(self):
+        '''Return True if recording devices buffer data in memory that are written to file by __write_recorded_data().'''
+
+        return (self.pars['record_spikes'] and self.pars['spike_recording_format'] == 'binary') or self.pars['record_weights']
+
+    ##############################################
+    def __simulate_chunked(self, t_sim, interval, online_statistics = True):
+        '''
+        Run simulation in chunks of "interval" ms, write recorded data buffered in memory to file, 
+        and (optionally) update online statistics after each chunk.
+
+        Arguments
+        ---------
+        t_sim:              float
+                            Simulation time (ms).
+
+        interval:           float
+                            Duration of chunks (ms).
+
+        online_statistics:  bool (optional)
+                            If True (default), online statistics are updated after each chunk and saved 
+                            at the end of the simulation.
+
+        '''
+        if online_statistics:
+            online_recorders = self.nodes['online_recorders']
+            conns = nest.GetConnections(source = self.nodes['pop_E'], target = self.nodes['pop_E'])   ## plastic (incl. recorded) synapses
+            bins = get_weight_bins(self.pars)
+
+            if self.online_statistics is None:
+                t_start = nest.GetKernelStatus('biological_time')
+                self.online_statistics = {
+                    'times': [t_start],           ## end times of intervals (ms), incl. start time
+                    'spike_counts_E': [],         ## number of E spikes in each interval
+                    'spike_counts_I': [],         ## number of I spikes in each interval
+                    'weight_bins': bins,
+                    'weight_histograms': [get_weight_histogram(conns, bins, self.pars['connectivity_chunk_size'])],
+                    'N_E': self.pars['N_E'],
+                    'N_I': self.pars['N_I'],
+                }
+            stats = self.online_statistics
+
+        ## split simulation time into chunks (in simulation steps)
+        n_steps = int(round(t_sim / self.pars['dt']))
+        n_steps_interval = max(int(round(interval / self.pars['dt'])), 1)
+
+        nest.Prepare()
+        steps = 0
+        while steps < n_steps:
+            n_steps_run = min(n_steps_interval, n_steps - steps)
+            nest.Run(n_steps_run * self.pars['dt'])
+            steps += n_steps_run
+
+            if online_statistics:
+                stats['times'] += [nest.GetKernelStatus('biological_time')]
+                stats['spike_counts_E'] += [online_recorders[0].get('n_events')]
+                stats['spike_counts_I'] += [online_recorders[1].get('n_events')]
+                online_recorders.n_events = 0  ## clear recorder buffers
+                stats['weight_histograms'] += [get_weight_histogram(conns, bins, self.pars['connectivity_chunk_size'])]
+
+            self.__write_recorded_data()
+        nest.Cleanup()
+
+        if online_statistics:
+            self.save_online_statistics()
+
+        return
+
+    ##############################################
+    def save_online_statistics(self):
+        '''
+        Save online statistics (see simulate()) to file "online_statistics.npz" in the data path
+        ("online_statistics-<rank>.npz" for simulations with several MPI processes).
+
+        '''
+        write_online_statistics(self.pars['data_path'], self.online_statistics, self.rank if self.pars['n_processes'] > 1 else None)
+
+        return
+
+    ##############################################
+    def __write_recorded_data(self):
+        '''
+        Write spike and weight data buffered in memory to binary files.
+        '''
+        if self.pars['record_spikes'] and self.pars['spike_recording_format'] == 'binary':
+            self.__write_spike_data()
+
+        if self.pars['record_weights']:
+            self.__write_weight_data()
+
+        return
+
+    ##############################################
+    def __write_weight_data(self):
+        '''
+        Append weight updates buffered by the weight recorder to the binary weight files 
+        of the local MPI process, and clear the recorder buffer.
+
+        Only every pars['weight_recording_every_k']-th update is stored. If pars['weight_recording_bin'] 
+        is not None, only the last update of each synapse in each time bin is stored.
+
+        The subsampling is applied to the buffered events; it reduces the file size, but not the 
+        recorder buffer. The buffer is bounded by flushing after each simulation chunk (see simulate()): 
+        in the worst case, it holds all updates of the recorded synapses during one chunk, i.e., 
+        about n_senders * n_targets * K_E / N_E * (rate of pre- and postsynaptic spikes) * chunk duration 
+        events (48 bytes each) per MPI process. Only the synapses between sampled senders and targets 
+        use the synapse model carrying the weight recorder (see __connect_plastic()), such that the 
+        other plastic E->E synapses do not emit weight-recorder events.
+
+        '''
+        weight_recorder = self.nodes['weight_recorder']
+        events = weight_recorder.get('events')
+
+        senders = np.asarray(events['senders'])
+        targets = np.asarray(events['targets'])
+        times = np.asarray(events['times'])
+        weights = np.asarray(events['weights'])
+
+        ## subsampling of weight updates (every k-th update, counted across calls)
+        k = self.pars['weight_recording_every_k']
+        if k > 1:
+            ind = np.flatnonzero((self.__n_weight_events + np.arange(len(times))) % k == 0)
+            self.__n_weight_events += len(times)
+            senders, targets, times, weights = senders[ind], targets[ind], times[ind], weights[ind]
+
+        ## aggregation in time bins (last update of each synapse in each bin)
+        if self.pars['weight_recording_bin'] is not None:
+            ind = get_last_update_indices(senders, targets, times, self.pars['weight_recording_bin'])
+            senders, targets, times, weights = senders[ind], targets[ind], times[ind], weights[ind]
+
+        label = '%s-%d-%d' % (weight_recorder.get('label'), weight_recorder.get('global_id'), nest.Rank())
+        columns = {
+            'senders': (senders, '<i4'),
+            'targets': (targets, '<i4'),
+            'times': (times, '<f8'),
+            'weights': (weights, '<f8'),
+        }
+        write_binary_data(self.pars['data_path'], label, 'weights_binary_columns', columns,
+                          attributes = {'time_bin': self.pars['weight_recording_bin']}, append = self.__weight_data_written)
+        self.__weight_data_written = True
+
+        weight_recorder.n_events = 0  ## clear recorder buffer
+
+        return
+
+    ##############################################
+    def __write_spike_data(self):
+        '''
+        Append spikes buffered by the spike recorder (record_to='memory') to the binary spike files 
+        of the local MPI process, and clear the recorder buffer.
+
+        '''
+        spike_recorder = self.nodes['spike_recorder']
+        events = spike_recorder.get('events')
+
+        label = '%s-%d-%d' % (spike_recorder.get('label'), spike_recorder.get('global_id'), nest.Rank())
+
+        write_binary_spike_data(self.pars['data_path'], label, events['senders'], events['times'],
+                                time_unit = self.pars['spike_time_format'], dt = self.pars['dt'],
+                                append = self.__spike_data_written)
+        self.__spike_data_written = True
+
+        spike_recorder.n_events = 0  ## clear recorder buffer
 
         return
 
     ##############################################
     def save_parameters(self,filename_root,path):
         '''
-        Save model-instance parameters to file.
+        Save model-instance parameters to file (on MPI rank 0 only).
 
         Arguments
         ---------
@@ -338,15 +689,24 @@ class Model:
 
         
         import json    
-        json.dump(self.pars, open('%s/%s.json' % (path,filename_root), 'w' ), indent=4)
+        if self.rank == 0:
+            json.dump(self.pars, open('%s/%s.json' % (path,filename_root), 'w' ), indent=4)
         
         return        
 
     ##############################################
-    def get_connectivity(self,pop_pre, pop_post, filename=None):
+    def get_connectivity(self,pop_pre, pop_post, filename=None, return_data=True):
         '''
         Extract connectivity for subpopulations pop_pre and pop_post and store in file filename (unless filename=None [default]).
 
+        Connection properties are fetched from the kernel with a single bulk call per chunk of 
+        pars['connectivity_chunk_size'] connections. Each chunk is directly written to file, 
+        such that the memory consumption is bounded if return_data=False.
+
+        In simulations with several MPI processes, each process extracts only the connections 
+        stored locally (i.e., the connections to its local targets), and writes them to a separate file 
+        with the rank appended to the file name (e.g. "connectivity-<rank>.dat"). See merge_data().
+
         Arguments
         ---------
         pop_pre:        NodeCollection
@@ -356,14 +716,22 @@ class Model:
                         Postsynaptic neuron population.
 
         filename:       str
-                        Name of file to store connectivity data. If filename ends in ".gz", 
-                        the file will be compressed in gzip format. Set filename=None (default) 
-                        to prevent storage on disk.
+                        Name of file to store connectivity data. The file format is defined by 
+                        pars['connectivity_file_format']:
+
+                           'ascii':  ASCII file. If filename ends in ".gz", the file will be compressed in gzip format. 
+                           'binary': binary columns and json manifest (see write_binary_connectivity_data()),
+                                     with the file label given by filename without extension.
+
+                        Set filename=None (default) to prevent storage on disk.
+
+        return_data:    bool
+                        If False, no data is returned (only written to file). Default: True.
 
         Returns
         -------
-        C:        numpy.ndarray
-                  Lx4 array containing connectivity information:
+        C:        numpy.ndarray (or None if return_data=False)
+                  Lx4 array containing (local) connectivity information:
 
                      C[:,0]: source id
                      C[:,1]: target id
@@ -373,161 +741,1480 @@ class Model:
                   (L = len(pop_pre)*len(pop_post) = number of connections.
 
         '''
-        print('Extracting connectivity...')
+        rank_print('Extracting connectivity...')
         
         conns = nest.GetConnections(source=pop_pre,target=pop_post)
-        
-        C = np.zeros((len(conns),4))
-        C[:,0] = conns.get()['source']
-        C[:,1] = conns.get()['target']
-        C[:,2] = conns.get()['weight']
-        C[:,3] = conns.get()['delay']
+        n_conns = len(conns)
+        chunk_size = self.pars['connectivity_chunk_size']
+        keys = ['source', 'target', 'weight', 'delay']
+
+        if return_data:
+            C = np.zeros((n_conns,4))
+        else:
+            C = None
 
+        file_format = self.pars['connectivity_file_format'] if filename else None
         if filename:
-            np.savetxt(filename,C,fmt='%d\t%d\t%.3e\t%.3e',header=' source \t target \t weight \tdelay (ms)')
+            root, extension = os.path.splitext(filename[:-3] if filename.endswith('.gz') else filename)
+            self.__connectivity_files[os.path.basename(root)] = {'path': os.path.dirname(root) or '.', 'format': file_format}
+        if filename and self.pars['n_processes'] > 1:
+            filename = '%s-%d%s%s' % (root, self.rank, extension, '.gz' if filename.endswith('.gz') else '')
+        if file_format == 'ascii':
+            import gzip
+            f = gzip.open(filename, 'wb') if filename.endswith('.gz') else open(filename, 'wb')
+            np.savetxt(f, np.zeros((0,4)), header=' source \t target \t weight \tdelay (ms)')
+        elif file_format == 'binary':
+            path, label = os.path.split(os.path.splitext(filename)[0])
+            path = path if path else '.'
+        
+        for start in range(0, max(n_conns, 1), chunk_size):
+            stop = min(start + chunk_size, n_conns)
+            if stop > start:
+                chunk = conns[start:stop] if n_conns > chunk_size else conns
+                ## single bulk call for all connection properties
+                chunk_data = {key: np.atleast_1d(value) for key, value in chunk.get(keys).items()}
+            else:
+                chunk_data = {key: np.zeros(0) for key in keys}
+            
+            if return_data:
+                for k, key in enumerate(keys):
+                    C[start:stop,k] = chunk_data[key]
 
-        return C
-    
-##############################################        
-##############################################
-def install_nestml_module(neuron_model):
-    '''Install NESML module depending on neuron model.'''
+            if file_format == 'ascii':
+                np.savetxt(f, np.column_stack([chunk_data[key] for key in keys]), fmt='%d\t%d\t%.3e\t%.3e')
+            elif file_format == 'binary':
+                write_binary_connectivity_data(path, label, chunk_data, append = start > 0)
 
-    if neuron_model == 'iaf_psc_alpha_nest':
-        pass
-    elif neuron_model == 'iaf_psc_alpha_nestml':
-        nest.Install('nestmlmodule') ## include nestml models
-    return
+        if file_format == 'ascii':
+            f.close()
 
-##############################################
-def get_default_parameters():
-    '''    
-    Import default model-parameter file.
+        return C
 
-    Returns
-    -------
-    pars: dict
-          Parameter dictionary.
+    ##############################################
+    def get_local_counts(self):
+        '''
+        Return the numbers of neurons and connections (per synapse model) stored by this MPI process.
 
-    '''
+        Returns
+        -------
+        counts:   dict
+                  Dictionary with entries 'n_local_neurons' and 'num_connections' ({synapse model: number of connections}).
 
-    import parameter_dicts
-    pars = parameter_dicts.pars
-    
-    return pars
+        '''
+        synapse_models = ['excitatory_plastic', 'excitatory_static', 'inhibitory', 'external', 'static_synapse']
+        if self.pars['record_weights']:
+            synapse_models += ['excitatory_plastic_recorded']
 
+        counts = {
+            'n_local_neurons': len(nest.GetLocalNodeCollection(self.nodes['pop_all'])),
+            'num_connections': {synapse_model: nest.GetDefaults(synapse_model, 'num_connections') for synapse_model in synapse_models},
+        }
 
-##############################################
-def get_data_file_list(path, label):
-    '''
-    Searches for files with extension "*.dat" in directory "path" with names starting with "label", 
-    and returns list of file names.
+        return counts
 
-    Arguments
-    ---------
-    path:           str
-                    Path containing spike files.
+    ##############################################
+    def merge_data(self):
+        '''
+        Merge binary spike and connectivity files written by the individual MPI processes 
+        into one set of files per label (see merge_binary_data()).
 
-    label:          str
-                    Spike file label (file name root).
+        The merge is carried out by rank 0 after all processes have finished writing. Spike and
+        weight files are merged in the data path, connectivity files in the directories of the 
+        file names passed to get_connectivity(). ASCII files, which are written per virtual process by NEST, are not merged 
+        (the loaders read all files with a given label).
 
-    Returns
-    -------
-    files:          list(str)
-                    List of file names
+        '''
+        if self.pars['n_processes'] == 1:
+            return
+
+        nest.SyncProcesses()
+
+        if self.rank == 0:
+            print('\nMerging data files of %d MPI processes...' % self.pars['n_processes'])
+            if self.pars['record_spikes'] and self.pars['spike_recording_format'] == 'binary':
+                spike_recorder = self.nodes['spike_recorder']
+                label = '%s-%d' % (spike_recorder.get('label'), spike_recorder.get('global_id'))
+                merge_binary_data(self.pars['data_path'], label, 'spikes_binary_columns')
+            if self.pars['record_weights']:
+                weight_recorder = self.nodes['weight_recorder']
+                label = '%s-%d' % (weight_recorder.get('label'), weight_recorder.get('global_id'))
+                merge_binary_data(self.pars['data_path'], label, 'weights_binary_columns')
+            for label, files in sorted(self.__connectivity_files.items()):
+                if files['format'] == 'binary':
+                    merge_binary_data(files['path'], label, 'connectivity_binary_columns')
+
+        nest.SyncProcesses()
 
+        return
 
-    '''
- 
-    ## get list of files names
-    files = []
-    for file_name in os.listdir(path):
-        if file_name.endswith('.dat') and file_name.startswith(label):
-            files += [file_name]
-    files.sort()
-    
-    assert len(files)>0 ,'No files of type "%s*.dat" found in path "%s".' % (label,path)
+    ##############################################
+    def save_manifest(self, filename = 'run_manifest.json'):
+        '''
+        Save run manifest to the data path (on MPI rank 0 only).
 
-    return files
+        The manifest describes the recorded data such that it can be analysed without 
+        creating the network (see load_run_manifest()). It contains
 
-##############################################
-#def load_spike_data(path, label, skip_rows = 3):
-def load_spike_data(path, label, time_interval = None, pop = None, skip_rows = 3):        
-    '''
-    Load spike data from files.
+           'nodes':       node-id ranges [first, last] of all populations and device ids,
+           'files':       labels and formats of spike, weight, connectivity and online-statistics files,
+           'parameters':  all (base and derived) model parameters.
 
-    Arguments
-    ---------
-    path:           str
-                    Path containing spike files.
+        Arguments
+        ---------
+        filename:   str (optional)
+                    Name of manifest file. Default: "run_manifest.json".
 
-    label:          str
-                    Spike file label (file name root).
+        '''
+        import json
 
-    time_interval:  None (default) or tuple (optional)
-                    Start and stop of observation interval (ms). All spikes outside this interva are discarded.
-                    If None, all recorded spikes are loaded.
+        if self.rank != 0:
+            return
 
-    pop:            None (default) or nest.NodeCollection (optional)
-                    Oberserved neuron population. All spike sendes that are not part of this population are discarded.
-                    If None, all recorded spikes are loaded.
+        nodes = {}
+        for key, nc in self.nodes.items():
+            if nc is None:
+                nodes[key] = None
+            else:
+                ids = nc.tolist()
+                nodes[key] = [ids[0], ids[-1]]
 
-    skip_rows:      int (optional)
-                    Number of rows to be skipped while reading spike files (to remove file headers). The default is 3.
+        files = {'spikes': None, 'weights': None, 'connectivity': {}, 'online_statistics': None}
+        if self.pars['record_spikes']:
+            spike_recorder = self.nodes['spike_recorder']
+            files['spikes'] = {
+                'label': '%s-%d' % (spike_recorder.get('label'), spike_recorder.get('global_id')),
+                'format': self.pars['spike_recording_format'],
+            }
+        if self.pars['record_weights']:
+            weight_recorder = self.nodes['weight_recorder']
+            files['weights'] = {
+                'label': '%s-%d' % (weight_recorder.get('label'), weight_recorder.get('global_id')),
+                'format': 'binary',
+            }
+        for label, connectivity_files in sorted(self.__connectivity_files.items()):
+            files['connectivity'][label] = {'label': label, 'path': connectivity_files['path'], 'format': connectivity_files['format']}
+        if self.online_statistics is not None:
+            files['online_statistics'] = {'label': 'online_statistics', 'format': 'npz'}
+
+        manifest = {
+            'format': 'run_manifest',
+            'version': 1,
+            'nodes': nodes,
+            'files': files,
+            'parameters': self.pars,
+        }
+        with open('%s/%s' % (self.pars['data_path'], filename), 'w') as f:
+            json.dump(manifest, f, indent = 4)
 
-    Returns
-    -------
-    spikes:   numpy.ndarray
-              Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (L = number of spikes).
+        return
 
-    '''
+    ##############################################
+    def save_warm_start(self, path):
+        '''
+        Save an approximate network state (e.g. after a warm-up phase) to files in directory "path", 
+        such that other simulations can start from it (see load_warm_start()).
 
-    if type(time_interval) == tuple:
-        print('Loading spike data in interval (%.1f ms, %.1f ms] ...' % (time_interval[0], time_interval[1]) )
-    else:
-        print('Loading spike data...')        
+        The warm-start state contains the weights and presynaptic traces of all plastic (E->E) synapses, 
+        the neuron state variables that can be set in NEST (see warm_start_state_variables), and the 
+        simulation time. It is not a complete checkpoint: the times of the last presynaptic spikes of the 
+        synapses, the postsynaptic traces (spike histories of the neurons), the synaptic currents and 
+        refractory states of NEST neurons, the spikes in transit and the kernel time are not stored, 
+        as they cannot be set in NEST. The dynamics after a restore are therefore not reproducible, 
+        i.e., they differ from those of a continued simulation.
 
-    files = get_data_file_list(path, label)
-    
-    ## open spike files and read data
-    spikes = []
-    for file_name in files:
-        try:
-            spikes += [np.loadtxt('%s/%s' % (path,file_name),skiprows=skip_rows)] ## load spike file while skipping the header 
-        except:
-            print('Error: %s' % sys.exc_info()[1])
-            print('Remove non-numeric entries from file %s (e.g. in file header) by specifying (optional) parameter "skip_rows".\n' % (file_name))
-            
-    spikes = np.concatenate(spikes)
+        Data is stored in binary columnar format (see write_binary_data()), with one set of files per 
+        MPI process. Synapse data is fetched and written in chunks of pars['connectivity_chunk_size'] connections.
 
-    ## extract spikes in specified time interval
-    if time_interval != None:
+        Arguments
+        ---------
+        path:    str
+                 Directory of warm-start files.
+
+        '''
+        rank_print('\nSaving warm-start state...')
+
+        os.makedirs(path, exist_ok = True)
+
+        state_variables = warm_start_state_variables[self.pars['neuron_model']]
+        attributes = {
+            'biological_time': nest.GetKernelStatus('biological_time'),
+            'n_processes': self.pars['n_processes'],
+            'neuron_model': self.pars['neuron_model'],
+        }
+
+        ## neuron states
+        local_nodes = nest.GetLocalNodeCollection(self.nodes['pop_all'])
+        neuron_data = local_nodes.get(['global_id'] + state_variables['neuron'])
+        columns = {'global_id': (np.atleast_1d(neuron_data['global_id']), '<i4')}
+        for key in state_variables['neuron']:
+            columns[key] = (np.atleast_1d(neuron_data[key]), '<f8')
+        write_binary_data(path, 'warm_start_neurons-%d' % self.rank, 'warm_start_neurons', columns, attributes = attributes)
+
+        ## states of plastic synapses
+        conns = nest.GetConnections(source = self.nodes['pop_E'], target = self.nodes['pop_E'])   ## plastic (incl. recorded) synapses
+        n_conns = len(conns)
+        chunk_size = self.pars['connectivity_chunk_size']
+        keys = ['source', 'target'] + state_variables['synapse']
+        for start in range(0, max(n_conns, 1), chunk_size):
+            stop = min(start + chunk_size, n_conns)
+            if stop > start:
+                chunk = conns[start:stop] if n_conns > chunk_size else conns
+                chunk_data = chunk.get(keys)
+            else:
+                chunk_data = {key: [] for key in keys}
+            columns = {key: (np.atleast_1d(chunk_data[key]), '<i4' if key in ['source', 'target'] else '<f8') for key in keys}
+            write_binary_data(path, 'warm_start_synapses-%d' % self.rank, 'warm_start_synapses', columns, 
+                              attributes = attributes, append = start > 0)
+
+        return
+
+    ##############################################
+    def load_warm_start(self, path):
+        '''
+        Set the network state to the approximate state stored in directory "path" (see save_warm_start()).
+
+        Must be called after connect() for a network created with the same parameters (incl. seed, 
+        number of threads and number of MPI processes) as the saved network, such that the 
+        connectivity is identical. Synapse data is read (memory mapped) and set in chunks.
+
+        This is a warm start, not a restore of a checkpoint: state variables that cannot be set in NEST 
+        (see save_warm_start()) start from their initial values, such that the subsequent dynamics 
+        are not reproducible. The simulation time of the NEST kernel cannot be set either; the time 
+        of the saved state is stored in the attribute self.t_warm_start, and spike and weight times 
+        recorded after the warm start are relative to the start of the new simulation (not shifted by 
+        self.t_warm_start).
+
+        Arguments
+        ---------
+        path:    str
+                 Directory of warm-start files.
+
+        '''
+        rank_print('\nLoading warm-start state...')
+
+        state_variables = warm_start_state_variables[self.pars['neuron_model']]
+
+        ## neuron states
+        manifest, columns = read_binary_data(path, 'warm_start_neurons-%d.json' % self.rank)
+        assert manifest['n_processes'] == self.pars['n_processes'], \
+            'Warm-start state was written by %d MPI processes (current: %d).' % (manifest['n_processes'], self.pars['n_processes'])
+        assert manifest['neuron_model'] == self.pars['neuron_model'], \
+            'Warm-start state was written for neuron model %s.' % (manifest['neuron_model'])
+        local_nodes = nest.GetLocalNodeCollection(self.nodes['pop_all'])
+        assert np.array_equal(np.atleast_1d(local_nodes.get('global_id')), columns['global_id']), \
+            'Neurons in warm-start state do not match the current network.'
+        local_nodes.set({key: np.array(columns[key]).tolist() for key in state_variables['neuron']})
+
+        self.t_warm_start = manifest['biological_time']
+
+        ## states of plastic synapses
+        manifest, columns = read_binary_data(path, 'warm_start_synapses-%d.json' % self.rank)
+        conns = nest.GetConnections(source = self.nodes['pop_E'], target = self.nodes['pop_E'])   ## plastic (incl. recorded) synapses
+        n_conns = len(conns)
+        assert n_conns == manifest['n_rows'], \
+            'Number of plastic synapses in warm-start state (%d) does not match the current network (%d).' % (manifest['n_rows'], n_conns)
+        chunk_size = self.pars['connectivity_chunk_size']
+        for start in range(0, n_conns, chunk_size):
+            stop = min(start + chunk_size, n_conns)
+            chunk = conns[start:stop] if n_conns > chunk_size else conns
+            chunk_data = chunk.get(['source', 'target'])
+            assert np.array_equal(np.atleast_1d(chunk_data['source']), columns['source'][start:stop]) and \
+                np.array_equal(np.atleast_1d(chunk_data['target']), columns['target'][start:stop]), \
+                'Synapses in warm-start state do not match the current network.'
+            chunk.set({key: np.array(columns[key][start:stop]).tolist() for key in state_variables['synapse']})
+
+        return
+
+    ##############################################
+    def save_checkpoint(self, path):
+        '''
+        Save a partial checkpoint of the network to files in directory "path" (see load_checkpoint()).
+
+        Same as save_warm_start(): only the state that can be set in NEST is stored. Neuron states are 
+        only partly stored (membrane potentials and, for NESTML neurons, traces; not the synaptic 
+        currents, refractory states and spike histories of NEST neurons), and spikes in transit, the 
+        times of the last presynaptic spikes and the kernel time are not stored at all. A simulation 
+        continued from a checkpoint therefore differs from an uninterrupted simulation.
+
+        Arguments
+        ---------
+        path:    str
+                 Directory of checkpoint files.
+
+        '''
+        self.save_warm_start(path)
+
+        return
+
+    ##############################################
+    def load_checkpoint(self, path):
+        '''
+        Load a partial checkpoint written by save_checkpoint() from directory "path".
+
+        Same as load_warm_start(): must be called after connect() for a network created with the same 
+        parameters (incl. seed, number of threads and number of MPI processes). Neuron states are only 
+        partly restored, and spikes in transit are lost (see save_checkpoint()); the remaining state 
+        variables start from their initial values, and the kernel time starts at 0 (the time of the 
+        checkpoint is stored in self.t_warm_start).
+
+        Arguments
+        ---------
+        path:    str
+                 Directory of checkpoint files.
+
+        '''
+        self.load_warm_start(path)
+
+        return
+    
+##############################################        
+##############################################
+## state variables stored for warm starts (see Model.save_warm_start())
+## note: the postsynaptic traces of the NEST synapse model are part of the neuron's spike history and cannot be set;
+## the same holds for the times of the last presynaptic spikes, the synaptic currents and the refractory counters
+warm_start_state_variables = {
+    'iaf_psc_alpha_nest': {
+        'neuron': ['V_m'],
+        'synapse': ['weight', 'Kplus'],
+    },
+    'iaf_psc_alpha_nestml': {
+        'neuron': ['V_m', 'r', 'post_trace__for_stdp_pl_nestml'],
+        'synapse': ['weight', 'pre_trace'],
+    },
+    'ignore_and_fire_nestml': {
+        'neuron': ['phase'],
+        'synapse': ['weight', 'Kplus'],
+    },
+}
+
+##############################################
+def get_weight_bins(pars):
+    '''Return bin edges (pA) of weight histograms, as defined by pars['weight_bins'] = [start, stop, step].'''
+
+    return np.arange(*pars['weight_bins'])
+
+##############################################
+def get_weight_histogram(conns, bins, chunk_size = 1000000):
+    '''
+    Compute histogram of synaptic weights of a SynapseCollection, fetching weights in chunks.
+
+    Arguments
+    ---------
+    conns:       nest.SynapseCollection
+                 Connections.
+
+    bins:        numpy.ndarray
+                 Bin edges (pA).
+
+    chunk_size:  int (optional)
+                 Number of weights fetched from the kernel at once. Default: 10^6.
+
+    Returns
+    -------
+    counts:      numpy.ndarray
+                 Number of synapses in each bin.
+
+    '''
+    counts = np.zeros(len(bins) - 1, dtype = np.int64)
+    n_conns = len(conns)
+    for start in range(0, n_conns, chunk_size):
+        chunk = conns[start:start + chunk_size] if n_conns > chunk_size else conns
+        counts += np.histogram(np.atleast_1d(chunk.get('weight')), bins)[0]
+
+    return counts
+
+##############################################
+def write_online_statistics(path, online_statistics, rank = None):
+    '''
+    Write online statistics (see Model.simulate()) to file "online_statistics.npz" in directory "path"
+    ("online_statistics-<rank>.npz" if rank is not None).
+
+    Arguments
+    ---------
+    path:               str
+                        Data path.
+
+    online_statistics:  dict
+                        Online statistics (lists or arrays; see Model.online_statistics).
+
+    rank:               int (optional)
+                        MPI rank. Default: None (single process).
+
+    '''
+    if rank is not None:
+        file_name = '%s/online_statistics-%d.npz' % (path, rank)
+    else:
+        file_name = '%s/online_statistics.npz' % (path)
+
+    np.savez(file_name, **{key: np.array(value) for key, value in online_statistics.items()})
+
+    return
+
+##############################################
+def load_online_statistics(path):
+    '''
+    Load online statistics (see Model.simulate()) and compute population rates and weight distributions.
+
+    Files of different MPI processes are combined.
+
+    Arguments
+    ---------
+    path:        str
+                 Data path.
+
+    Returns
+    -------
+    stats:       dict
+                 Dictionary with entries
+
+                    'times':             end times of intervals (ms), incl. start time
+                    'rate_E', 'rate_I':  time-resolved population-averaged firing rates (spikes/s) in each interval
+                    'weight_bins':       bin edges of weight histograms (pA)
+                    'weight_histograms': weight counts at each time in 'times' (shape len(times) x len(weight_bins)-1)
+                    'weight_distributions': normalized weight histograms (density)
+
+    '''
+    files = sorted([file_name for file_name in os.listdir(path) if file_name.startswith('online_statistics') and file_name.endswith('.npz')])
+    assert len(files)>0 ,'No online statistics found in path "%s".' % (path)
+
+    stats = {}
+    for file_name in files:
+        data = np.load('%s/%s' % (path, file_name))
+        if len(stats) == 0:
+            stats = {key: data[key] for key in data.files}
+        else:
+            for key in ['spike_counts_E', 'spike_counts_I', 'weight_histograms']:
+                stats[key] = stats[key] + data[key]
+
+    intervals = np.diff(stats['times']) / 1000.
+    stats['rate_E'] = stats['spike_counts_E'] / intervals / stats['N_E']
+    stats['rate_I'] = stats['spike_counts_I'] / intervals / stats['N_I']
+    bin_widths = np.diff(stats['weight_bins'])
+    totals = np.maximum(stats['weight_histograms'].sum(axis = 1, keepdims = True), 1)
+    stats['weight_distributions'] = stats['weight_histograms'] / totals / bin_widths
+
+    return stats
+
+##############################################
+def load_run_manifest(path, filename = 'run_manifest.json'):
+    '''
+    Load run manifest written by Model.save_manifest().
+
+    Arguments
+    ---------
+    path:       str
+                Data path.
+
+    filename:   str (optional)
+                Name of manifest file. Default: "run_manifest.json".
+
+    Returns
+    -------
+    manifest:   dict
+                Run manifest. The node-id ranges in manifest['nodes'] are converted 
+                to arrays of node ids (None for nodes that were not created).
+
+    '''
+    import json
+
+    with open('%s/%s' % (path, filename), 'r') as f:
+        manifest = json.load(f)
+
+    manifest['node_ranges'] = manifest['nodes']
+    manifest['nodes'] = {key: None if ids is None else np.arange(ids[0], ids[1] + 1) 
+                         for key, ids in manifest['node_ranges'].items()}
+
+    return manifest
+
+##############################################
+def rank_print(*args, **kwargs):
+    '''Print message on MPI rank 0 only.'''
+
+    if nest.Rank() == 0:
+        print(*args, **kwargs)
+
+##############################################
+def install_nestml_module(neuron_model):
+    '''Install NESML module depending on neuron model.'''
+
+    if neuron_model == 'iaf_psc_alpha_nest':
+        pass
+    elif neuron_model == 'iaf_psc_alpha_nestml':
+        import build_nestml_models
+        build_nestml_models.install_nestml_module() ## include nestml models (built only if not in build cache)
+    elif neuron_model == 'ignore_and_fire_nestml':
+        import build_nestml_models
+        build_nestml_models.install_ignore_and_fire_module() ## include ignore_and_fire model (built only if not in build cache)
+    return
+
+##############################################
+def derive_parameters(parameters):
+    '''
+    Compute parameters derived from base parameters (without NEST kernel).
+
+    Arguments
+    ---------
+    parameters:    dict
+                   Dictionary containing base parameters
+
+    Returns
+    -------
+    pars:          dict
+                   Dictionary containing all (base and derived) parameters.
+
+    '''
+    pars = copy.deepcopy(parameters)
+
+    pars['N_E'] = int(pars['beta'] * pars['N'])  # number of excitatory neurons
+    pars['N_I'] = pars['N']-pars['N_E']           # number of inhibitory neurons        
+    pars['K_E'] = int(pars['beta'] * pars['K'])  # number of excitatory inputs per neuron
+    pars['K_I'] = pars['K']-pars['K_E']           # number of inhibitory inputs per neuron
+
+    # conversion of PSP amplitudes to PSC amplitudes
+    pars['J_unit'] = unit_psp_amplitude(pars['tau_m'], pars['C_m'], pars['tau_s']) # unit PSP amplitude        
+    pars['I_E'] = pars['J_E'] / pars['J_unit']  # EPSC amplitude for local inputs (pA)
+    pars['I_I'] = - pars['g'] * pars['I_E']     # IPSC amplitude (pA)
+    pars['I_X'] = pars['I_E']                   # EPSC amplitude for external inputs (pA)
+    
+    # rate of external Poissonian sources
+    pars['nu_theta'] = 1000. * pars['theta'] * pars['C_m'] / (pars['I_X'] * np.exp(1.) * pars['tau_m'] * pars['tau_s'])
+    pars['nu_X'] = pars['eta'] * pars['nu_theta']
+
+    # number of neurons spikes are recorded from
+    if pars['N_rec_spikes'] == 'all':
+        pars['N_rec_spikes'] = pars['N']
+
+    return pars
+
+##############################################
+def get_default_parameters():
+    '''    
+    Import default model-parameter file.
+
+    Returns
+    -------
+    pars: dict
+          Parameter dictionary.
+
+    '''
+
+    import parameter_dicts
+    pars = parameter_dicts.pars
+    
+    return pars
+
+
+##############################################
+def get_data_file_list(path, label, extension = '.dat'):
+    '''
+    Searches for files with extension "extension" (default: "*.dat") in directory "path" with names starting with "label", 
+    and returns list of file names.
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing spike files.
+
+    label:          str
+                    Spike file label (file name root).
+
+    extension:      str (optional)
+                    File extension. The default is ".dat".
+
+    Returns
+    -------
+    files:          list(str)
+                    List of file names
+
+
+    '''
+ 
+    ## get list of files names
+    files = []
+    for file_name in os.listdir(path):
+        if file_name.endswith(extension) and file_name.startswith(label):
+            files += [file_name]
+    files.sort()
+    
+    assert len(files)>0 ,'No files of type "%s*%s" found in path "%s".' % (label,extension,path)
+
+    return files
+
+##############################################
+def count_data_rows(file_name, skip_rows = 0):
+    '''
+    Count number of data rows in ASCII file 'file_name' (excluding the first 'skip_rows' rows, empty rows and comments).
+    '''
+    n_rows = 0
+    with open(file_name, 'rb') as f:
+        for i, line in enumerate(f):
+            if i >= skip_rows and line.strip() and not line.startswith(b'#'):
+                n_rows += 1
+                
+    return n_rows
+
+##############################################
+def load_ascii_data_file(file_name, skip_rows = 0):
+    '''
+    Load 2D data array from ASCII file 'file_name' while skipping the first 'skip_rows' rows.
+    '''
+    return np.loadtxt(file_name, skiprows = skip_rows, ndmin = 2)
+
+##############################################
+def load_ascii_data(path, files, n_columns, skip_rows = 0, n_workers = 1):
+    '''
+    Load and merge data arrays from a list of ASCII files (e.g., from different virtual processes).
+
+    The number of data rows in each file is determined first, such that the data can be 
+    written into a preallocated output array. For n_workers > 1, files are counted and parsed 
+    in parallel by a pool of worker processes. Errors are collected for all files and reported together.
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing data files.
+
+    files:          list(str)
+                    List of file names.
+
+    n_columns:      int
+                    Number of data columns.
+
+    skip_rows:      int (optional)
+                    Number of rows to be skipped while reading files (to remove file headers). The default is 0.
+
+    n_workers:      int (optional)
+                    Number of worker processes. The default is 1.
+
+    Returns
+    -------
+    data:           numpy.ndarray
+                    Lxn_columns data array (L = total number of rows).
+
+    '''
+    import concurrent.futures
+
+    file_names = ['%s/%s' % (path, file_name) for file_name in files]
+
+    if n_workers > 1 and len(file_names) > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers = min(n_workers, len(file_names)))
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers = 1)
+
+    errors = []
+    with executor:
+        ## count rows and preallocate output array
+        futures = [executor.submit(count_data_rows, file_name, skip_rows) for file_name in file_names]
+        n_rows = []
+        for file_name, future in zip(file_names, futures):
+            try:
+                n_rows += [future.result()]
+            except Exception as error:
+                errors += [(file_name, error)]
+                n_rows += [0]
+        offsets = np.concatenate([[0], np.cumsum(n_rows)]).astype(int)
+        data = np.zeros((offsets[-1], n_columns))
+
+        ## parse files
+        futures = {}
+        for i, file_name in enumerate(file_names):
+            if n_rows[i] > 0:
+                futures[executor.submit(load_ascii_data_file, file_name, skip_rows)] = i
+        for future in concurrent.futures.as_completed(futures):
+            i = futures[future]
+            try:
+                data[offsets[i]:offsets[i+1], :] = future.result()
+            except Exception as error:
+                errors += [(file_names[i], error)]
+
+    if len(errors) > 0:
+        message = 'Failed to load %d of %d files:\n' % (len(errors), len(file_names))
+        for file_name, error in sorted(errors, key = lambda e: e[0]):
+            message += '  %s: %s\n' % (file_name, error)
+        message += 'Remove non-numeric entries from these files (e.g. in file header) by specifying (optional) parameter "skip_rows".'
+        raise IOError(message)
+
+    return data
+
+##############################################
+#def load_spike_data(path, label, skip_rows = 3):
+def load_spike_data(path, label, time_interval = None, pop = None, skip_rows = 3, sort_by = 'sender', n_workers = 1):        
+    '''
+    Load spike data from files.
+
+    The file format is detected automatically: if binary spike files (see write_binary_spike_data()) 
+    with the given label exist in "path", these are memory mapped, otherwise the ASCII files ("*.dat") 
+    written by NEST are parsed.
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing spike files.
+
+    label:          str
+                    Spike file label (file name root).
+
+    time_interval:  None (default) or tuple (optional)
+                    Start and stop of observation interval (ms). All spikes outside this interva are discarded.
+                    If None, all recorded spikes are loaded.
+
+    pop:            None (default), nest.NodeCollection, numpy.ndarray, list or range (optional)
+                    Oberserved neuron population (node ids). All spike sendes that are not part of this population are discarded.
+                    If None, all recorded spikes are loaded.
+
+    skip_rows:      int (optional)
+                    Number of rows to be skipped while reading spike files (to remove file headers). The default is 3.
+
+    sort_by:        str (optional)
+                    Order of the spikes extracted for population 'pop' (ignored if pop=None):
+
+                       'sender': sorted by the position of the sender in 'pop', and by time for each sender (default)
+                       'time':   sorted by time, and by sender id for simultaneous spikes
+
+    n_workers:      int (optional)
+                    Number of worker processes for parsing ASCII spike files in parallel. The default is 1.
+
+    Returns
+    -------
+    spikes:   numpy.ndarray
+              Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (L = number of spikes).
+
+    '''
+
+    if type(time_interval) == tuple:
+        print('Loading spike data in interval (%.1f ms, %.1f ms] ...' % (time_interval[0], time_interval[1]) )
+    else:
+        print('Loading spike data...')        
+
+    if has_binary_spike_data(path, label):
+        spikes = load_binary_spike_data(path, label)
+    else:
+        files = get_data_file_list(path, label)
+        spikes = load_ascii_data(path, files, n_columns = 2, skip_rows = skip_rows, n_workers = n_workers)
+
+    ## extract spikes in specified time interval
+    if time_interval != None:
         if type(time_interval) == tuple:
             ind = (spikes[:,1]>=time_interval[0]) * (spikes[:,1]<=time_interval[1]) 
             spikes = spikes[ind,:]
         else:
             print("Warning: time_interval must be a tuple or None. All spikes are loaded.")
 
-    if type(pop) == nest.NodeCollection:
-        spikes_subset = []
-        for cn,nid in enumerate(pop):  ## loop over all neurons
-            print("Spike extraction from %d/%d (%d%%) neurons completed" % (cn+1, len(pop), 1.*(cn+1)/len(pop)*100), end = '\r')            
-            ind = np.where(spikes[:,0] == nid)[0]
-            spikes_subset += list(spikes[ind,:])
-        spikes = np.array(spikes_subset)
-    elif pop == None:
-        pass
-    else:
-        print("Warning: pop must be a NEST NodeCollection or None. All spikes are loaded.")
-    print()
-    
+    if pop is not None:
+        if 'nest' in sys.modules and isinstance(pop, sys.modules['nest'].NodeCollection):  ## avoids importing nest
+            pop_ids = np.array(pop.tolist())
+        else:
+            pop_ids = np.asarray(pop)
+        ## single-pass extraction of all spikes emitted by neurons in pop
+        pos, valid = map_ids_to_indices(spikes[:,0], pop_ids)
+        spikes = spikes[valid,:]
+        pos = pos[valid]
+        if sort_by == 'sender':
+            order = np.lexsort((spikes[:,1], pos))
+        elif sort_by == 'time':
+            order = np.lexsort((spikes[:,0], spikes[:,1]))
+        else:
+            raise ValueError('sort_by must be "sender" or "time".')
+        spikes = spikes[order,:]
+    print()
+    
+    return spikes
+
+##############################################
+def iter_spike_data(path, label, chunk_size = 10000000, skip_rows = 3):
+    '''
+    Iterate over spike data in chunks of at most chunk_size spikes (without loading all spikes into memory).
+
+    Binary spike files (see write_binary_spike_data()) are memory mapped, ASCII files are parsed chunk by chunk.
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing spike files.
+
+    label:          str
+                    Spike file label (file name root).
+
+    chunk_size:     int (optional)
+                    Maximum number of spikes per chunk. Default: 10^7.
+
+    skip_rows:      int (optional)
+                    Number of header rows of ASCII spike files. The default is 3.
+
+    Yields
+    ------
+    spikes:   numpy.ndarray
+              Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (ms).
+
+    '''
+    if has_binary_spike_data(path, label):
+        for file_name in get_binary_manifest_list(path, label, 'spikes_binary_columns'):
+            manifest, columns = read_binary_data(path, file_name)
+            time_factor = manifest['dt'] if manifest['time_unit'] == 'steps' else 1.
+            for start in range(0, manifest['n_rows'], chunk_size):
+                stop = min(start + chunk_size, manifest['n_rows'])
+                spikes = np.zeros((stop - start, 2))
+                spikes[:,0] = columns['senders'][start:stop]
+                spikes[:,1] = columns['times'][start:stop] * time_factor
+                yield spikes
+    else:
+        for file_name in get_data_file_list(path, label):
+            for spikes in iter_ascii_data_file('%s/%s' % (path, file_name), chunk_size, skip_rows):
+                yield spikes
+
+##############################################
+def iter_ascii_data_file(file_name, chunk_size, skip_rows = 0):
+    '''
+    Iterate over the rows of an ASCII data file in chunks of at most chunk_size rows 
+    (skipping the first skip_rows rows), and yield each chunk as 2D array.
+    '''
+    import itertools
+
+    with open(file_name, 'r') as f:
+        for _ in range(skip_rows):
+            f.readline()
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if len(lines) == 0:
+                break
+            data = np.loadtxt(lines, ndmin = 2)
+            if len(data) > 0:
+                yield data
+
+##############################################
+def get_spike_count_image(spikes, time_range, id_range, shape):
+    '''
+    Compute 2D histogram of spike counts in (neuron x time) bins.
+
+    Arguments
+    ---------
+    spikes:       numpy.ndarray or iterable
+                  Lx2 array of spike senders and times, or iterable of such arrays (e.g. from iter_spike_data()).
+
+    time_range:   tuple
+                  Start and stop time (ms).
+
+    id_range:     tuple
+                  First and last neuron id.
+
+    shape:        tuple
+                  Number of neuron bins and time bins.
+
+    Returns
+    -------
+    counts:       numpy.ndarray
+                  Spike counts of shape (number of neuron bins, number of time bins).
+
+    '''
+    n_id_bins, n_time_bins = shape
+    n_id_bins = min(n_id_bins, int(id_range[1] - id_range[0] + 1))
+    counts = np.zeros(n_id_bins * n_time_bins, dtype = np.int64)
+
+    if isinstance(spikes, np.ndarray):
+        spikes = [spikes]
+
+    for chunk in spikes:
+        senders = chunk[:,0]
+        times = chunk[:,1]
+        valid = (times >= time_range[0]) & (times <= time_range[1]) & (senders >= id_range[0]) & (senders <= id_range[1])
+        time_bins = ((times[valid] - time_range[0]) / (time_range[1] - time_range[0]) * n_time_bins).astype(np.int64)
+        id_bins = ((senders[valid] - id_range[0]) / (id_range[1] - id_range[0] + 1) * n_id_bins).astype(np.int64)
+        np.minimum(time_bins, n_time_bins - 1, out = time_bins)
+        counts += np.bincount(id_bins * n_time_bins + time_bins, minlength = n_id_bins * n_time_bins)
+
+    return counts.reshape(n_id_bins, n_time_bins)
+
+##############################################
+binary_header_size = 16           ## size of binary-column file header (bytes)
+binary_magic = b'TPNPCOL1'        ## file signature (8 bytes), followed by the numpy dtype string (8 bytes, zero padded)
+
+def write_binary_column(file_name, data, dtype, append = False):
+    '''
+    Write (or append) a 1D data column to a binary file with a small header.
+
+    File layout: 8-byte signature, 8-byte numpy dtype string (zero padded), raw column data.
+
+    Arguments
+    ---------
+    file_name:  str
+                Name of binary file.
+
+    data:       numpy.ndarray
+                1D data array.
+
+    dtype:      str
+                numpy dtype string of the stored data (e.g. "<i4", "<f8", "<i8").
+
+    append:     bool (optional)
+                If True, data is appended to an existing file. Default: False.
+
+    '''
+    data = np.ascontiguousarray(data, dtype = dtype)
+
+    if append and os.path.exists(file_name):
+        with open(file_name, 'ab') as f:
+            f.write(data.tobytes())
+    else:
+        with open(file_name, 'wb') as f:
+            f.write(binary_magic + dtype.encode('ascii').ljust(binary_header_size - len(binary_magic), b'\0'))
+            f.write(data.tobytes())
+
+    return
+
+##############################################
+def read_binary_column(file_name, n_rows = None):
+    '''
+    Memory map a data column written by write_binary_column().
+
+    Arguments
+    ---------
+    file_name:  str
+                Name of binary file.
+
+    n_rows:     int (optional)
+                Number of rows to be mapped. If None (default), all rows are mapped.
+
+    Returns
+    -------
+    data:       numpy.memmap
+                1D data array.
+
+    '''
+    with open(file_name, 'rb') as f:
+        header = f.read(binary_header_size)
+    assert header[:len(binary_magic)] == binary_magic, 'File %s is not a binary column file.' % (file_name)
+    dtype = np.dtype(header[len(binary_magic):].rstrip(b'\0').decode('ascii'))
+
+    if n_rows is None:
+        n_rows = (os.path.getsize(file_name) - binary_header_size) // dtype.itemsize
+    if n_rows == 0:
+        return np.zeros(0, dtype = dtype)
+
+    return np.memmap(file_name, dtype = dtype, mode = 'r', offset = binary_header_size, shape = (n_rows,))
+
+##############################################
+def write_binary_data(path, label, data_format, columns, attributes = {}, append = False):
+    '''
+    Write (or append) a table of data columns in binary columnar format.
+
+    Each column "name" is stored in a separate file "<label>.<name>.bin" (see write_binary_column()).
+    The table is described by a human-readable manifest "<label>.json" containing the data format,
+    the number of rows, the column files and dtypes, and additional attributes.
+
+    Arguments
+    ---------
+    path:           str
+                    Data path.
+
+    label:          str
+                    File label (file name root).
+
+    data_format:    str
+                    Name of the data format (e.g. "spikes_binary_columns"), used to identify manifests.
+
+    columns:        dict
+                    Dictionary of columns {name: (data, dtype)} with 1D data arrays of equal length 
+                    and numpy dtype strings.
+
+    attributes:     dict (optional)
+                    Additional (json serializable) entries of the manifest.
+
+    append:         bool (optional)
+                    If True, data is appended to existing files. Default: False.
+
+    '''
+    import json
+
+    manifest_file = '%s/%s.json' % (path, label)
+    n_rows = 0
+    if append and os.path.exists(manifest_file):
+        with open(manifest_file, 'r') as f:
+            n_rows = json.load(f)['n_rows']
+    else:
+        append = False
+
+    manifest = {
+        'format': data_format,
+        'version': 1,
+        'header_size': binary_header_size,
+        'n_rows': n_rows + len(list(columns.values())[0][0]),
+        'columns': {},
+    }
+    manifest.update(attributes)
+
+    for name, (data, dtype) in columns.items():
+        file_name = '%s.%s.bin' % (label, name)
+        write_binary_column('%s/%s' % (path, file_name), data, dtype, append)
+        manifest['columns'][name] = {'file': file_name, 'dtype': dtype}
+
+    with open(manifest_file, 'w') as f:
+        json.dump(manifest, f, indent=4)
+
+    return
+
+##############################################
+def get_binary_manifest_list(path, label, data_format):
+    '''
+    Return sorted list of manifest files of binary data of type "data_format" in directory "path" 
+    with names starting with "label".
+    '''
+    import json
+
+    files = []
+    for file_name in sorted(os.listdir(path)):
+        if file_name.endswith('.json') and file_name.startswith(label):
+            with open('%s/%s' % (path, file_name), 'r') as f:
+                try:
+                    manifest = json.load(f)
+                except ValueError:
+                    continue
+            if isinstance(manifest, dict) and manifest.get('format') == data_format:
+                files += [file_name]
+
+    return files
+
+##############################################
+def read_binary_data(path, manifest_file):
+    '''
+    Memory map all data columns described by a manifest written by write_binary_data().
+
+    Arguments
+    ---------
+    path:           str
+                    Data path.
+
+    manifest_file:  str
+                    Name of the manifest file.
+
+    Returns
+    -------
+    manifest:       dict
+                    Manifest.
+
+    columns:        dict
+                    Dictionary of memory-mapped 1D column arrays {name: numpy.memmap}.
+
+    '''
+    import json
+
+    with open('%s/%s' % (path, manifest_file), 'r') as f:
+        manifest = json.load(f)
+
+    columns = {}
+    for name, column in manifest['columns'].items():
+        columns[name] = read_binary_column('%s/%s' % (path, column['file']), manifest['n_rows'])
+
+    return manifest, columns
+
+##############################################
+def write_binary_spike_data(path, label, senders, times, time_unit = 'ms', dt = None, append = False):
+    '''
+    Write (or append) spike data in binary columnar format.
+
+    The data is stored in two column files "<label>.senders.bin" (int32) and "<label>.times.bin" 
+    (float64 spike times in ms, or int64 spike times in simulation steps), 
+    and a human-readable manifest "<label>.json" (see write_binary_data()).
+
+    Arguments
+    ---------
+    path:           str
+                    Data path.
+
+    label:          str
+                    File label (file name root).
+
+    senders:        numpy.ndarray
+                    Spike senders.
+
+    times:          numpy.ndarray
+                    Spike times (ms or steps, see time_unit).
+
+    time_unit:      str (optional)
+                    Unit of spike times: "ms" (default) or "steps".
+
+    dt:             float (optional)
+                    Simulation resolution (ms). Required for time_unit = "steps".
+
+    append:         bool (optional)
+                    If True, data is appended to existing files. Default: False.
+
+    '''
+    assert time_unit in ['ms', 'steps'], 'time_unit must be "ms" or "steps".'
+    assert time_unit == 'ms' or dt is not None, 'dt must be specified for time_unit = "steps".'
+
+    columns = {
+        'senders': (senders, '<i4'),
+        'times': (times, '<f8' if time_unit == 'ms' else '<i8'),
+    }
+    write_binary_data(path, label, 'spikes_binary_columns', columns, 
+                      attributes = {'time_unit': time_unit, 'dt': dt}, append = append)
+
+    return
+
+##############################################
+def has_binary_spike_data(path, label):
+    '''Return True if binary spike data with the given label exists in directory "path".'''
+    return len(get_binary_manifest_list(path, label, 'spikes_binary_columns')) > 0
+
+##############################################
+def load_binary_spike_data(path, label):
+    '''
+    Load spike data stored in binary columnar format (see write_binary_spike_data()).
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing spike files.
+
+    label:          str
+                    Spike file label (file name root).
+
+    Returns
+    -------
+    spikes:   numpy.ndarray
+              Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (ms) (L = number of spikes).
+
+    '''
+    files = get_binary_manifest_list(path, label, 'spikes_binary_columns')
+    assert len(files)>0 ,'No binary spike data "%s*.json" found in path "%s".' % (label,path)
+
+    data = [read_binary_data(path, file_name) for file_name in files]
+
+    spikes = np.zeros((sum([manifest['n_rows'] for manifest, _ in data]), 2))
+    i = 0
+    for manifest, columns in data:
+        n = manifest['n_rows']
+        spikes[i:i+n, 0] = columns['senders']
+        if manifest['time_unit'] == 'steps':
+            spikes[i:i+n, 1] = columns['times'] * manifest['dt']
+        else:
+            spikes[i:i+n, 1] = columns['times']
+        i += n
+
+    return spikes
+
+##############################################
+def get_min_uint_dtype(x):
+    '''Return the smallest unsigned integer dtype string (little endian) that can hold the values of the non-negative array x.'''
+
+    max_value = int(x.max()) if len(x) > 0 else 0
+    for dtype in ['<u1', '<u2', '<u4', '<u8']:
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+
+##############################################
+def encode_spike_block(senders, steps, step_start):
+    '''
+    Encode spikes of one block (sorted by sender and step) as arrays of non-negative integers:
+
+       sender_deltas:  differences between subsequent (unique) sender ids (first entry: first sender id)
+       counts:         number of spikes of each sender
+       step_deltas:    for each sender, first spike step relative to "step_start", followed by the inter-spike intervals (steps)
+
+    Returns list of (name, array) with arrays cast to the smallest sufficient unsigned integer dtype.
+    '''
+    starts = np.flatnonzero(np.r_[True, senders[1:] != senders[:-1]]) if len(senders) > 0 else np.zeros(0, dtype = np.int64)
+    unique_senders = senders[starts]
+    counts = np.diff(np.r_[starts, len(senders)])
+
+    step_deltas = np.diff(steps, prepend = step_start)
+    step_deltas[starts] = steps[starts] - step_start
+
+    arrays = [('sender_deltas', np.diff(unique_senders, prepend = 0)), ('counts', counts), ('step_deltas', step_deltas)]
+
+    return [(name, x.astype(get_min_uint_dtype(x))) for name, x in arrays]
+
+##############################################
+def decode_spike_block(data, block):
+    '''
+    Decode spike block (decompressed bytes "data", block entry of archive manifest) into arrays of senders and steps (see encode_spike_block()).
+    '''
+    arrays = {}
+    offset = 0
+    for name, dtype, length in block['arrays']:
+        arrays[name] = np.frombuffer(data, dtype = dtype, count = length, offset = offset).astype(np.int64)
+        offset += length * np.dtype(dtype).itemsize
+
+    counts = arrays['counts']
+    senders = np.repeat(np.cumsum(arrays['sender_deltas']), counts)
+
+    ## cumulative sum of step deltas, restarted for each sender
+    cumulative = np.cumsum(arrays['step_deltas'])
+    starts = np.r_[0, np.cumsum(counts)[:-1]] if len(counts) > 0 else np.zeros(0, dtype = np.int64)
+    steps = cumulative - np.repeat(cumulative[starts] - arrays['step_deltas'][starts], counts) + block['step_start']
+
+    return senders, steps
+
+##############################################
+def write_spike_archive(path, label, spikes, dt, tics_per_step = None, block_duration = 1000., compression = 'zlib', level = None):
+    '''
+    Write spike data to a compressed archive.
+
+    Spike times are converted to integer simulation steps (exact for spike times on the simulation grid).
+    The spikes are split into blocks of duration "block_duration". In each block, the spikes are sorted 
+    by sender and time, delta encoded (see encode_spike_block()), and compressed independently with 
+    zlib or lzma. The compressed blocks are stored in "<label>.spz", the block index (byte offsets, 
+    step ranges, array dtypes) in the manifest "<label>.json".
+
+    Arguments
+    ---------
+    path:            str
+                     Data path.
+
+    label:           str
+                     File label (file name root).
+
+    spikes:          numpy.ndarray
+                     Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (ms) (see load_spike_data()).
+
+    dt:              float
+                     Simulation resolution (ms).
+
+    tics_per_step:   int (optional)
+                     Number of tics per step (stored in the manifest for reference).
+
+    block_duration:  float (optional)
+                     Duration (ms) of blocks. Default: 1000 ms.
+
+    compression:     str (optional)
+                     Compression method: 'zlib' (default) or 'lzma'.
+
+    level:           int (optional)
+                     Compression level (zlib: 0-9, default 6; lzma: 0-9, default 6).
+
+    '''
+    import json
+    import zlib
+    import lzma
+
+    assert compression in ['zlib', 'lzma'], 'compression must be "zlib" or "lzma".'
+
+    spikes = np.asarray(spikes)
+    senders = spikes[:,0].astype(np.int64)
+    steps = np.rint(spikes[:,1] / dt).astype(np.int64)
+    assert np.allclose(steps * dt, spikes[:,1], rtol = 0., atol = 1e-6 * dt), 'Spike times are not on the simulation grid.'
+
+    block_steps = max(int(round(block_duration / dt)), 1)
+    block_ids = steps // block_steps
+    order = np.lexsort((steps, senders, block_ids))
+    senders, steps, block_ids = senders[order], steps[order], block_ids[order]
+    bounds = np.flatnonzero(np.r_[True, block_ids[1:] != block_ids[:-1], True]) if len(steps) > 0 else np.zeros(1, dtype = np.int64)
+
+    blocks = []
+    offset = 0
+    with open('%s/%s.spz' % (path, label), 'wb') as f:
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            step_start = int(block_ids[a] * block_steps)
+            arrays = encode_spike_block(senders[a:b], steps[a:b], step_start)
+            raw = b''.join([x.tobytes() for _, x in arrays])
+            if compression == 'zlib':
+                data = zlib.compress(raw, 6 if level is None else level)
+            else:
+                data = lzma.compress(raw, preset = 6 if level is None else level)
+            f.write(data)
+            blocks += [{
+                'offset': offset,
+                'size': len(data),
+                'step_start': step_start,
+                'step_min': int(steps[a:b].min()),
+                'step_max': int(steps[a:b].max()),
+                'n_spikes': int(b - a),
+                'arrays': [[name, x.dtype.str, len(x)] for name, x in arrays],
+            }]
+            offset += len(data)
+
+    manifest = {
+        'format': 'spike_archive',
+        'version': 1,
+        'file': '%s.spz' % label,
+        'n_rows': len(steps),
+        'dt': dt,
+        'tics_per_step': tics_per_step,
+        'block_steps': block_steps,
+        'compression': compression,
+        'blocks': blocks,
+    }
+    with open('%s/%s.json' % (path, label), 'w') as f:
+        json.dump(manifest, f, indent = 4)
+
+    return
+
+##############################################
+def load_spike_archive(path, label, time_interval = None):
+    '''
+    Load spike data from a compressed archive (see write_spike_archive()).
+
+    Only the blocks overlapping with "time_interval" are read and decompressed.
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing the archive.
+
+    label:          str
+                    Archive label (file name root).
+
+    time_interval:  None (default) or tuple (optional)
+                    Start and stop of observation interval (ms). Only spikes in (start, stop] are returned.
+                    If None, all spikes are loaded.
+
+    Returns
+    -------
+    spikes:   numpy.ndarray
+              Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (ms), sorted by block, 
+              and by sender and time within each block.
+
+    '''
+    import json
+    import zlib
+    import lzma
+
+    with open('%s/%s.json' % (path, label), 'r') as f:
+        manifest = json.load(f)
+    assert manifest.get('format') == 'spike_archive', '%s/%s.json is not a spike archive.' % (path, label)
+
+    dt = manifest['dt']
+    blocks = manifest['blocks']
+    if time_interval is not None:
+        ## step range corresponding to (start, stop]
+        step_range = (time_interval[0] / dt, time_interval[1] / dt)
+        blocks = [block for block in blocks if block['step_max'] > step_range[0] and block['step_min'] <= step_range[1]]
+
+    decompress = zlib.decompress if manifest['compression'] == 'zlib' else lzma.decompress
+
+    senders = []
+    steps = []
+    with open('%s/%s' % (path, manifest['file']), 'rb') as f:
+        for block in blocks:
+            f.seek(block['offset'])
+            block_senders, block_steps = decode_spike_block(decompress(f.read(block['size'])), block)
+            senders += [block_senders]
+            steps += [block_steps]
+
+    spikes = np.zeros((sum([len(x) for x in senders]), 2))
+    if len(spikes) > 0:
+        spikes[:,0] = np.concatenate(senders)
+        spikes[:,1] = np.concatenate(steps) * dt
+
+    if time_interval is not None:
+        ind = (spikes[:,1] > time_interval[0]) & (spikes[:,1] <= time_interval[1])
+        spikes = spikes[ind]
+
     return spikes
 
 ##############################################
-def load_connectivity_data(path, label, skip_rows = 1):    
+def write_binary_connectivity_data(path, label, C, append = False):
+    '''
+    Write (or append) connectivity data in binary columnar format.
+
+    The data is stored in the column files "<label>.source.bin", "<label>.target.bin" (int32), 
+    "<label>.weight.bin" and "<label>.delay.bin" (float64), and a human-readable manifest "<label>.json"
+    (see write_binary_data()).
+
+    Arguments
+    ---------
+    path:           str
+                    Data path.
+
+    label:          str
+                    File label (file name root).
+
+    C:              dict
+                    Connectivity data {'source': ..., 'target': ..., 'weight': ..., 'delay': ...}.
+
+    append:         bool (optional)
+                    If True, data is appended to existing files. Default: False.
+
+    '''
+    columns = {
+        'source': (C['source'], '<i4'),
+        'target': (C['target'], '<i4'),
+        'weight': (C['weight'], '<f8'),
+        'delay': (C['delay'], '<f8'),
+    }
+    write_binary_data(path, label, 'connectivity_binary_columns', columns, append = append)
+
+    return
+
+##############################################
+def load_connectivity_columns(path, label):
+    '''
+    Memory map connectivity data stored in binary columnar format (see write_binary_connectivity_data()).
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing connectivity files.
+
+    label:          str
+                    Connectivity file label (file name root).
+
+    Returns
+    -------
+    columns:        list(dict)
+                    List of dictionaries {'source', 'target', 'weight', 'delay'} of memory-mapped 
+                    column arrays (one for each data file).
+
+    '''
+    files = get_binary_manifest_list(path, label, 'connectivity_binary_columns')
+    
+    return [read_binary_data(path, file_name)[1] for file_name in files]
+
+##############################################
+def merge_binary_data(path, label, data_format, chunk_size = 10000000, remove_parts = True):
+    '''
+    Merge binary data files "<label>-<rank>" written by different MPI processes into 
+    a single set of files "<label>" (see write_binary_data()).
+
+    Arguments
+    ---------
+    path:           str
+                    Data path.
+
+    label:          str
+                    File label (file name root) of the merged data.
+
+    data_format:    str
+                    Name of the data format (e.g. "spikes_binary_columns").
+
+    chunk_size:     int (optional)
+                    Number of rows copied at once. Default: 10^7.
+
+    remove_parts:   bool (optional)
+                    If True (default), the individual files are removed after merging.
+
+    '''
+    parts = [file_name for file_name in get_binary_manifest_list(path, label + '-', data_format) 
+             if file_name[len(label)+1:-len('.json')].isdigit()]
+    parts.sort(key = lambda file_name: int(file_name[len(label)+1:-len('.json')]))
+    
+    if len(parts) == 0:
+        return
+
+    reserved_keys = ['format', 'version', 'header_size', 'n_rows', 'columns']
+    append = False
+    for file_name in parts:
+        manifest, columns = read_binary_data(path, file_name)
+        attributes = {key: value for key, value in manifest.items() if key not in reserved_keys}
+        for start in range(0, max(manifest['n_rows'], 1), chunk_size):
+            chunk = {name: (columns[name][start:start+chunk_size], manifest['columns'][name]['dtype']) for name in columns}
+            write_binary_data(path, label, data_format, chunk, attributes = attributes, append = append)
+            append = True
+        if remove_parts:
+            for column in manifest['columns'].values():
+                os.remove('%s/%s' % (path, column['file']))
+            os.remove('%s/%s' % (path, file_name))
+
+    return
+
+##############################################
+def load_connectivity_data(path, label, skip_rows = 1, n_workers = 1):    
     '''
     Load connectivity data (weights and delays) from files.
 
+    The file format is detected automatically: if binary connectivity files (see write_binary_connectivity_data()) 
+    with the given label exist in "path", these are memory mapped, otherwise the ASCII files ("*.dat") are parsed.
+
     Arguments
     ---------
     path:           str
@@ -539,6 +2226,9 @@ def load_connectivity_data(path, label, skip_rows = 1):
     skip_rows:      int, optional
                     Number of rows to be skipped while reading connectivity files (to remove file headers). The default is 1.
 
+    n_workers:      int, optional
+                    Number of worker processes for parsing ASCII connectivity files in parallel. The default is 1.
+
     Returns
     -------
     C:        numpy.ndarray
@@ -553,63 +2243,100 @@ def load_connectivity_data(path, label, skip_rows = 1):
 
     '''
 
-    files = get_data_file_list(path, label)
+    columns = load_connectivity_columns(path, label)
 
-    ## open weight files and read data
-    C = []
-    for file_name in files:
-        try:
-            C += [np.loadtxt('%s/%s' % (path,file_name),skiprows=skip_rows)] ## load file while skipping the header 
-        except:
-            print('Error: %s' % sys.exc_info()[1])
-            print('Remove non-numeric entries from file %s (e.g. in file header) by specifying (optional) parameter "skip_rows".\n' % (file_name))
-            
-    C = np.concatenate(C)
+    if len(columns) > 0:
+        C = np.zeros((sum([len(c['source']) for c in columns]), 4))
+        i = 0
+        for c in columns:
+            n = len(c['source'])
+            for k, key in enumerate(['source', 'target', 'weight', 'delay']):
+                C[i:i+n, k] = c[key]
+            i += n
+        return C
+
+    files = get_data_file_list(path, label)
+    C = load_ascii_data(path, files, n_columns = 4, skip_rows = skip_rows, n_workers = n_workers)
     
     return C
 
 ##############################################
-# def load_weight_data(path, label, skip_rows = 3):    
-#     '''
-#     Load synaptic-weight data from files.
+def get_last_update_indices(senders, targets, times, time_bin):
+    '''
+    Return indices of the last weight update of each synapse (sender-target pair) in each time bin of size time_bin (ms).
+    '''
+    if len(times) == 0:
+        return np.zeros(0, dtype = int)
 
-#     Arguments
-#     ---------
-#     path:           str
-#                     Path containing weight files.
+    bins = np.floor(np.asarray(times) / time_bin).astype(np.int64)
+    order = np.lexsort((times, bins, targets, senders))
+    key = np.column_stack((np.asarray(senders)[order], np.asarray(targets)[order], bins[order]))
+    last = np.r_[np.any(key[1:] != key[:-1], axis = 1), True]
 
-#     label:          str
-#                     Weight file label (file name root).
+    return order[last]
 
-#     skip_rows:      int, optional
-#                     Number of rows to be skipped while reading weight files (to remove file headers). The default is 3.
+##############################################
+def load_weight_data(path, label):
+    '''
+    Load synaptic-weight data recorded by the weight recorder (see Model parameter "record_weights"),
+    and arrange them as per-synapse weight trajectories.
 
-#     Returns
-#     -------
-#     weights:   numpy.ndarray
-#               Lx4 array
-#               weights[:,0]: spike senders 
-#               weights[:,1]: spike times
-#               weights[:,2]: synaptic weight
-#               weights[:,3]: spike target
-#               (L = number of recorded weights.
+    Synapses are identified by their sender and target (multapses are therefore merged).
 
-#     '''
+    Arguments
+    ---------
+    path:           str
+                    Path containing weight files.
 
-#     files = get_data_file_list(path, label)
+    label:          str
+                    Weight file label (file name root).
 
-#     ## open weight files and read data
-#     weights = []
-#     for file_name in files:
-#         try:
-#             weights += [np.loadtxt('%s/%s' % (path,file_name),skiprows=skip_rows)] ## load spike file while skipping the header 
-#         except:
-#             print('Error: %s' % sys.exc_info()[1])
-#             print('Remove non-numeric entries from file %s (e.g. in file header) by specifying (optional) parameter "skip_rows".\n' % (file_name))
-            
-#     weights = np.concatenate(weights)
-    
-#     return weights
+    Returns
+    -------
+    weights:   dict
+               Dictionary of weight trajectories in compressed sparse row format:
+
+                  weights['synapses']: Mx2 array of senders and targets (M = number of synapses)
+                  weights['offsets']:  array of length M+1; the trajectory of synapse i is stored 
+                                       in the index range offsets[i]:offsets[i+1] of 'times' and 'weights'
+                  weights['times']:    times of weight updates (ms), sorted by synapse and time
+                  weights['weights']:  synaptic weights (pA)
+
+    '''
+    files = get_binary_manifest_list(path, label, 'weights_binary_columns')
+    assert len(files)>0 ,'No weight data "%s*.json" found in path "%s".' % (label,path)
+
+    data = [read_binary_data(path, file_name) for file_name in files]
+    n_rows = sum([manifest['n_rows'] for manifest, _ in data])
+
+    columns = {key: np.zeros(n_rows, dtype = dtype) for key, dtype in 
+               [('senders', np.int64), ('targets', np.int64), ('times', float), ('weights', float)]}
+    i = 0
+    for manifest, column_data in data:
+        n = manifest['n_rows']
+        for key in columns:
+            columns[key][i:i+n] = column_data[key]
+        i += n
+
+    time_bin = data[0][0].get('time_bin')
+    if time_bin is not None:
+        ## remove duplicate entries of time bins split across files or calls of simulate()
+        ind = get_last_update_indices(columns['senders'], columns['targets'], columns['times'], time_bin)
+    else:
+        ind = np.lexsort((columns['times'], columns['targets'], columns['senders']))
+    senders, targets = columns['senders'][ind], columns['targets'][ind]
+
+    new_synapse = np.r_[True, (senders[1:] != senders[:-1]) | (targets[1:] != targets[:-1])] if len(ind) > 0 else np.zeros(0, dtype = bool)
+    starts = np.flatnonzero(new_synapse)
+
+    weights = {
+        'synapses': np.column_stack((senders[starts], targets[starts])),
+        'offsets': np.r_[starts, len(ind)],
+        'times': columns['times'][ind],
+        'weights': columns['weights'][ind],
+    }
+
+    return weights
 
 ##############################################
 
@@ -619,20 +2346,20 @@ def unit_psp_amplitude(tau_m, C_m, tau_s):
 
     Arguments
     ---------
-    tau_m:  float
+    tau_m:  float or numpy.ndarray
             Membrane time constant (ms).
 
-    C_m:    float
+    C_m:    float or numpy.ndarray
             Membrane capacitance (pF).
 
-    tau_s:  float
+    tau_s:  float or numpy.ndarray
             Synaptic time constant (ms).
 
 
     Returns
     -------
-    J_unit: float
-            Unit-PSP amplitude (mV).
+    J_unit: float or numpy.ndarray
+            Unit-PSP amplitude (mV; arrays are broadcast element-wise).
 
     '''
 
@@ -650,37 +2377,29 @@ def unit_psp_amplitude(tau_m, C_m, tau_s):
 
 ##############################################
 def LambertWm1(x):
-    y = scipy.special.lambertw(x,k=-1 if x < 0 else 0).real
-
-    return y
-
-##############################################
-def get_index(x,y):
     '''
-    Return indices of x where x==y.
+    Lambert W function (real part) on branch k=-1 for x < 0 and on branch k=0 for x >= 0.
 
-    Arguments
-    ---------
-    x: list or numpy.ndarray of int, float, str
+    Accepts scalars and arrays (evaluated element-wise); returns a float for scalar arguments.
+    '''
+    import scipy.special
 
-    y: int, float, str
+    x = np.asarray(x, dtype = float)
+    y = np.where(x < 0, scipy.special.lambertw(x, k = -1).real, scipy.special.lambertw(x, k = 0).real)
 
-    Returns
-    -------
-    ind: numpy.ndarray
-         Index array
+    return float(y) if y.ndim == 0 else y
 
-    '''
-    return np.where(x==y)[0]
-    
 ##############################################
-def get_connectivity_matrix(connectivity, pop_pre = [], pop_post = []):    
+def get_connectivity_matrix(connectivity, pop_pre = [], pop_post = [], multapse_rule = 'sum', dense = False):
     '''
     Generate connectivity matrix from connectivity data in 'connectivity' 
     for the (sub-)set of source and target neurons in 'pop_pre' and 'pop_post'.
     If 'pop_pre' or 'pop_post' are empty (default), the arrays of source and 
     target neurons will be constructed from "connectivity".
 
+    Source and target ids are mapped to column and row indices in a single vectorized step.
+    Connections with sources or targets not contained in 'pop_pre' or 'pop_post' are discarded.
+
     Arguments
     ---------
     connectivity: numpy.ndarray
@@ -693,37 +2412,393 @@ def get_connectivity_matrix(connectivity, pop_pre = [], pop_post = []):
               
                   (L = len(pop_pre)*len(pop_post) = number of connections
 
-    pop_pre:  numpy.ndarray
-              Array of source ids (default: [])
+    pop_pre:       numpy.ndarray
+                   Array of source ids (default: [])
 
-    pop_post: numpy.ndarray
-              Array of target ids (default: [])
+    pop_post:      numpy.ndarray
+                   Array of target ids (default: [])
+
+    multapse_rule: str (optional)
+                   Reduction applied to multiple connections between the same pair of neurons
+                   (multapses; see parameter 'allow_multapses'):
+
+                      'sum':  total weight of all connections (default)
+                      'last': weight of the last connection in 'connectivity'
+                      'max':  maximum weight
+
+    dense:         bool (optional)
+                   If True, return W as a dense numpy.ndarray. Default: False.
 
     Returns
     -------
-    W:        numpy.ndarray
+    W:        scipy.sparse.csr_matrix (or numpy.ndarray if dense=True)
               Connectivity matrix of shape LTxLS, with number of targets LT and number of sources LS
 
+    pop_pre:  numpy.ndarray
+              Array of source ids
+
+    pop_post: numpy.ndarray
+              Array of target ids
+
     '''
+    import scipy.sparse
 
     print('\nGenerating connectivity matrix...')
 
+    assert multapse_rule in ['sum', 'last', 'max'], 'multapse_rule must be "sum", "last" or "max".'
+
     if len(pop_pre)==0:
         pop_pre = np.unique(connectivity[:,0])
     if len(pop_post)==0:
         pop_post = np.unique(connectivity[:,1])
-    
-    ## initialise weight matrix
-    W = np.zeros([len(pop_post),len(pop_pre)]) ## convention: pre = columns, post = rows
-    
-    ## fill weight matrix
-    for c in range(connectivity.shape[0]):
-        W[get_index(pop_post,connectivity[c,1]),get_index(pop_pre,connectivity[c,0])] = connectivity[c,2]
+    pop_pre = np.asarray(pop_pre)
+    pop_post = np.asarray(pop_post)
+
+    ## map source and target ids to column and row indices (convention: pre = columns, post = rows)
+    cols, valid_pre = map_ids_to_indices(connectivity[:,0], pop_pre)
+    rows, valid_post = map_ids_to_indices(connectivity[:,1], pop_post)
+    valid = valid_pre & valid_post
+    rows = rows[valid]
+    cols = cols[valid]
+    weights = connectivity[valid,2]
+
+    ## reduce multapses
+    if multapse_rule in ['last', 'max'] and len(weights)>0:
+        key = rows.astype(np.int64) * len(pop_pre) + cols
+        if multapse_rule == 'last':
+            ## index of the last occurrence of each (row, column) pair
+            _, ind_rev = np.unique(key[::-1], return_index=True)
+            ind = len(key) - 1 - ind_rev
+            rows, cols, weights = rows[ind], cols[ind], weights[ind]
+        else:
+            order = np.argsort(key, kind='stable')
+            key = key[order]
+            starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+            weights = np.maximum.reduceat(weights[order], starts)
+            rows, cols = rows[order][starts], cols[order][starts]
+
+    ## duplicate entries are summed during the conversion to CSR format
+    W = scipy.sparse.coo_matrix((weights, (rows, cols)), shape=(len(pop_post), len(pop_pre))).tocsr()
+
+    if dense:
+        W = W.toarray()
     
     return W, pop_pre, pop_post
 
+##############################################
+def pool_connectivity_matrix(W, shape, reduction = 'mean'):
+    '''
+    Reduce a (sparse or dense) connectivity matrix to at most shape[0] x shape[1] blocks 
+    by block averaging or max pooling.
+
+    Arguments
+    ---------
+    W:          scipy.sparse matrix or numpy.ndarray
+                Connectivity matrix of shape LTxLS (see get_connectivity_matrix()).
+
+    shape:      tuple
+                Maximum number of (row, column) blocks.
+
+    reduction:  str (optional)
+                'mean': average weight in each block, including absent connections as zeros (default),
+                'max':  maximum weight in each block.
+
+    Returns
+    -------
+    W_pooled:   numpy.ndarray
+                Dense pooled matrix of shape (min(LT, shape[0]), min(LS, shape[1])).
+
+    '''
+    import scipy.sparse
+
+    assert reduction in ['mean', 'max'], 'reduction must be "mean" or "max".'
+
+    n_rows, n_cols = W.shape
+    n_rows_pooled = min(n_rows, shape[0])
+    n_cols_pooled = min(n_cols, shape[1])
+
+    W = scipy.sparse.coo_matrix(W)
+    block_rows = W.row.astype(np.int64) * n_rows_pooled // n_rows
+    block_cols = W.col.astype(np.int64) * n_cols_pooled // n_cols
+    block = block_rows * n_cols_pooled + block_cols
+    n_blocks = n_rows_pooled * n_cols_pooled
+
+    if reduction == 'mean':
+        ## number of matrix elements in each block
+        row_sizes = np.bincount(np.arange(n_rows) * n_rows_pooled // n_rows, minlength = n_rows_pooled)
+        col_sizes = np.bincount(np.arange(n_cols) * n_cols_pooled // n_cols, minlength = n_cols_pooled)
+        W_pooled = np.bincount(block, weights = W.data, minlength = n_blocks).reshape(n_rows_pooled, n_cols_pooled)
+        W_pooled /= np.outer(row_sizes, col_sizes)
+    else:
+        W_pooled = np.zeros(n_blocks)
+        if len(W.data) > 0:
+            W_pooled[:] = -np.inf
+            np.maximum.at(W_pooled, block, W.data)
+            ## blocks containing absent connections (zeros)
+            nnz = np.bincount(block, minlength = n_blocks)
+            row_sizes = np.bincount(np.arange(n_rows) * n_rows_pooled // n_rows, minlength = n_rows_pooled)
+            col_sizes = np.bincount(np.arange(n_cols) * n_cols_pooled // n_cols, minlength = n_cols_pooled)
+            incomplete = nnz < np.outer(row_sizes, col_sizes).ravel()
+            W_pooled[incomplete] = np.maximum(W_pooled[incomplete], 0.)
+        W_pooled = W_pooled.reshape(n_rows_pooled, n_cols_pooled)
+
+    return W_pooled
+
+##############################################
+def map_ids_to_indices(ids, pop):
+    '''
+    Map node ids to their positions in the id array 'pop'.
+
+    Arguments
+    ---------
+    ids:    numpy.ndarray
+            Array of node ids.
+
+    pop:    numpy.ndarray
+            Array of (unique) node ids defining the index space.
+
+    Returns
+    -------
+    ind:    numpy.ndarray
+            Array of indices such that pop[ind[i]] == ids[i] for all valid entries.
+
+    valid:  numpy.ndarray
+            Boolean array marking the entries of 'ids' contained in 'pop'.
+
+    '''
+    pop = np.asarray(pop)
+    ids = np.asarray(ids)
+
+    if len(pop) == 0:
+        return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+
+    if np.issubdtype(pop.dtype, np.integer) and pop[-1] - pop[0] == len(pop) - 1 and np.all(np.diff(pop) == 1):
+        ## contiguous range of ids (e.g. NEST populations): direct offset instead of search
+        ind = ids.astype(np.int64) - pop[0]
+        valid = (ind >= 0) & (ind < len(pop))
+        ind[~valid] = 0
+        return ind, valid
+
+    order = np.argsort(pop, kind='stable')
+    pop_sorted = pop[order]
+    pos = np.searchsorted(pop_sorted, ids)
+    pos[pos == len(pop)] = 0
+    valid = pop_sorted[pos] == ids
+    
+    return order[pos], valid
+
+##############################################
+def get_fixed_indegree_sources(rng, source_ids, target_ids, indegree, allow_autapses = True, allow_multapses = True):
+    '''
+    Draw random sources for each target with a fixed in-degree (equivalent of NEST's fixed_indegree rule).
+
+    Arguments
+    ---------
+    rng:              numpy.random.Generator
+                      Random-number generator.
+
+    source_ids:       numpy.ndarray
+                      Node ids of the source population.
+
+    target_ids:       numpy.ndarray
+                      Node ids of the targets.
+
+    indegree:         int
+                      Number of sources per target.
+
+    allow_autapses:   bool (optional)
+                      If False, targets contained in the source population are not connected to themselves. Default: True.
+
+    allow_multapses:  bool (optional)
+                      If False, sources of a target are drawn without replacement (vectorized over targets;
+                      the sources of each target are returned in ascending order of their positions in 
+                      source_ids). Default: True.
+
+    Returns
+    -------
+    sources:          numpy.ndarray
+                      (len(target_ids) x indegree) array of source ids.
+
+    '''
+    source_ids = np.asarray(source_ids)
+    target_ids = np.asarray(target_ids)
+    n_sources = len(source_ids)
+
+    ## positions of targets in the source population (excluded as sources if autapses are not allowed)
+    if allow_autapses:
+        pos = np.zeros(len(target_ids), dtype = np.int64)
+        excluded = np.zeros(len(target_ids), dtype = bool)
+    else:
+        pos, excluded = map_ids_to_indices(target_ids, source_ids)
+    n_available = n_sources - excluded
+
+    if allow_multapses:
+        ind = rng.integers(0, n_available[:, np.newaxis], size = (len(target_ids), indegree))
+    elif 2 * indegree > n_available.min(initial = n_sources):
+        ## dense sampling: first "indegree" elements of random permutations (in chunks of rows, 
+        ## such that at most ~10^7 random keys are held in memory)
+        assert indegree <= n_available.min(initial = indegree), 'In-degree exceeds number of available sources.'
+        ind = np.empty((len(target_ids), indegree), dtype = np.int64)
+        n_rows = max(10**7 // max(n_sources, 1), 1)
+        for start in range(0, len(target_ids), n_rows):
+            keys = rng.random((len(target_ids[start:start+n_rows]), n_sources))
+            keys[np.arange(len(keys))[excluded[start:start+n_rows]], n_sources - 1] = np.inf   ## last index not available
+            ind[start:start+n_rows] = np.sort(np.argpartition(keys, indegree - 1, axis = 1)[:, :indegree], axis = 1) if indegree > 0 else 0
+    else:
+        ## sparse sampling: draw with replacement and redraw duplicates of each row until all sources 
+        ## are distinct (the result is uniform over subsets by symmetry); the number of redrawn elements 
+        ## decreases geometrically as indegree <= n_available/2
+        ind = rng.integers(0, n_available[:, np.newaxis], size = (len(target_ids), indegree))
+        while True:
+            ind.sort(axis = 1)
+            duplicate = np.zeros(ind.shape, dtype = bool)
+            duplicate[:, 1:] = ind[:, 1:] == ind[:, :-1]
+            if not duplicate.any():
+                break
+            rows, columns = np.nonzero(duplicate)
+            ind[rows, columns] = rng.integers(0, n_available[rows])
+
+    ## skip excluded source: draws from [0, n_sources - 1) are mapped to [0, n_sources) without pos
+    ind += (ind >= pos[:, np.newaxis]) & excluded[:, np.newaxis]
+
+    return source_ids[ind]
+
 ##############################################
 def get_weight_distribution(connectivity,weights):
     return np.histogram(connectivity[:,2],weights,density=True)[0]
 
 ##############################################
+def get_weight_statistics(w, bins):
+    '''
+    Compute weight histogram and moments of the weights "w" (see get_weight_distribution_from_files()).
+    '''
+    w = np.asarray(w, dtype = float)
+    n = len(w)
+    mean = w.mean() if n > 0 else 0.
+
+    stats = {
+        'counts': np.histogram(w, bins)[0].astype(np.int64),
+        'n': n,
+        'mean': mean,
+        'M2': ((w - mean)**2).sum(),   ## sum of squared deviations from the mean
+        'n_zero': int(np.count_nonzero(w <= 0.)),
+    }
+
+    return stats
+
+##############################################
+def combine_weight_statistics(a, b):
+    '''
+    Combine weight statistics of two disjoint sets of weights (see get_weight_statistics()).
+    '''
+    n = a['n'] + b['n']
+    if n == 0:
+        return a
+
+    delta = b['mean'] - a['mean']
+    stats = {
+        'counts': a['counts'] + b['counts'],
+        'n': n,
+        'mean': a['mean'] + delta * b['n'] / n,
+        'M2': a['M2'] + b['M2'] + delta**2 * a['n'] * b['n'] / n,
+        'n_zero': a['n_zero'] + b['n_zero'],
+    }
+
+    return stats
+
+##############################################
+def weight_statistics_task(task):
+    '''
+    Compute weight statistics of one part of the connectivity data (worker function of get_weight_distribution_from_files()).
+
+    task = ('binary', path, manifest_file, start, stop, bins) or ('ascii', file_name, skip_rows, chunk_size, bins)
+    '''
+    if task[0] == 'binary':
+        _, path, manifest_file, start, stop, bins = task
+        manifest, columns = read_binary_data(path, manifest_file)
+        return get_weight_statistics(columns['weight'][start:stop], bins)
+    else:
+        _, file_name, skip_rows, chunk_size, bins = task
+        stats = get_weight_statistics([], bins)
+        for data in iter_ascii_data_file(file_name, chunk_size, skip_rows):
+            stats = combine_weight_statistics(stats, get_weight_statistics(data[:,2], bins))
+        return stats
+
+##############################################
+def get_weight_distribution_from_files(path, label, weights, chunk_size = 10000000, n_workers = 1, skip_rows = 1):
+    '''
+    Compute distribution and moments of synaptic weights from connectivity files without loading 
+    all data into memory.
+
+    Connectivity files (binary or ASCII) are read in chunks of at most chunk_size connections, and 
+    histogram counts (fixed bins), mean and variance are accumulated in a single pass. For n_workers > 1, 
+    chunks are processed in parallel by a pool of worker processes.
+
+    Arguments
+    ---------
+    path:           str
+                    Path containing connectivity files.
+
+    label:          str
+                    Connectivity file label (file name root).
+
+    weights:        numpy.ndarray
+                    Bin edges of weight histogram (pA).
+
+    chunk_size:     int (optional)
+                    Maximum number of connections per chunk. Default: 10^7.
+
+    n_workers:      int (optional)
+                    Number of worker processes. Default: 1.
+
+    skip_rows:      int (optional)
+                    Number of header rows of ASCII connectivity files. The default is 1.
+
+    Returns
+    -------
+    whist:          numpy.ndarray
+                    Weight distribution (normalized histogram, as returned by get_weight_distribution()).
+
+    stats:          dict
+                    Dictionary with entries
+
+                       'counts':        histogram counts
+                       'n':             number of synapses
+                       'mean':          mean weight (pA)
+                       'variance':      weight variance (pA^2)
+                       'fraction_zero': fraction of synapses with weights clipped at zero 
+                                        (see rule max(0, w_) in stdp_pl_synapse)
+
+    '''
+    import concurrent.futures
+
+    tasks = []
+    manifest_files = get_binary_manifest_list(path, label, 'connectivity_binary_columns')
+    if len(manifest_files) > 0:
+        for manifest_file in manifest_files:
+            n_rows = read_binary_data(path, manifest_file)[0]['n_rows']
+            for start in range(0, n_rows, chunk_size):
+                tasks += [('binary', path, manifest_file, start, min(start + chunk_size, n_rows), weights)]
+    else:
+        for file_name in get_data_file_list(path, label):
+            tasks += [('ascii', '%s/%s' % (path, file_name), skip_rows, chunk_size, weights)]
+
+    stats = get_weight_statistics([], weights)
+    if n_workers > 1 and len(tasks) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = min(n_workers, len(tasks))) as executor:
+            for task_stats in executor.map(weight_statistics_task, tasks):
+                stats = combine_weight_statistics(stats, task_stats)
+    else:
+        for task in tasks:
+            stats = combine_weight_statistics(stats, weight_statistics_task(task))
+
+    stats['variance'] = stats['M2'] / stats['n'] if stats['n'] > 0 else 0.
+    stats['fraction_zero'] = stats['n_zero'] / stats['n'] if stats['n'] > 0 else 0.
+
+    ## normalization as in np.histogram(..., density=True)
+    n_in_bins = stats['counts'].sum()
+    whist = stats['counts'] / max(n_in_bins, 1) / np.diff(weights)
+
+    return whist, stats
+
+##############################################
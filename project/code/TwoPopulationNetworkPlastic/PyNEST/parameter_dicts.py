@@ -16,7 +16,9 @@ pars['allow_multapses'] = True
 pars['neuron_model'] = 'iaf_psc_alpha_nest'    # NEST version of iaf_psc_alpha and stdp_pl_synapse
 
 #pars['neuron_model'] = 'iaf_psc_alpha_nestml' # NESTML version of iaf_psc_alpha and stdp_pl_synapse
-## note: to build the NESTML models, run build_nestml_models.py first
+#pars['neuron_model'] = 'ignore_and_fire_nestml' # calibration mode: NESTML ignore_and_fire neurons (fixed firing rate, 
+                                                 # random phases) with NEST stdp_pl_synapse (same connectivity)
+## note: the NESTML models are built by build_nestml_models.py (automatically, if not cached)
 
 pars['E_L'] = 0.0      # resting membrane potential(mV)
 pars['C_m'] = 250.0    # membrane capacity (pF)
@@ -24,6 +26,8 @@ pars['tau_m'] = 20.0   # membrane time constant (ms)
 pars['t_ref'] = 2.     # duration of refractory period (ms)
 pars['theta'] = 20.0   # spike threshold(mV)
 pars['V_reset'] = 0.0  # reset potential(mV)
+
+pars['ignore_and_fire_rate'] = 10.0  # firing rate of ignore_and_fire neurons (spikes/s; neuron_model 'ignore_and_fire_nestml' only)
     
 # stimulus parameters
 pars['I_DC'] = 0.0     # (constant) external input current (pA)
@@ -53,18 +57,34 @@ pars['V_init_max'] = pars['theta']  # min of initial membrane potential (mV)
 # data recording
 pars['record_spikes'] = False   # if True: set up spike detectors and record spikes
 pars['N_rec_spikes'] = 'all'    # number of neurons to record spikes from; if 'all', spikes from all neurons are recorded
-
-# pars['record_weights'] = False           # True: record weights of plastic synapses
-# pars['weight_recording_start_time'] = 0. # start time of weight recording (ms)
+pars['spike_recording_format'] = 'ascii'  # 'ascii': NEST ascii files (*.dat); 'binary': binary columns (*.bin) + json manifest
+pars['spike_time_format'] = 'ms'          # binary format only: spike times stored as float64 in ms ('ms') or as int64 steps ('steps')
+pars['flush_interval'] = 1000.            # interval (ms) in which data buffered in memory (binary spike format, weight recording) are written to file; if None, data are written at the end of simulate()
+pars['connectivity_file_format'] = 'ascii'   # 'ascii': ASCII files (*.dat); 'binary': binary columns (<label>.<column>.bin) + json manifest (<label>.json)
+pars['connectivity_chunk_size'] = 1000000    # number of connections fetched from the kernel and written to file at once
+
+pars['analysis_interval'] = None      # interval (ms) of online statistics (rates, weight histograms); if None, no online statistics
+pars['weight_bins'] = [0., 150.1, 0.5]  # start, stop and step of weight-histogram bins (pA)
+
+pars['record_weights'] = False            # True: record weights of plastic synapses
+pars['weight_recording_start_time'] = 0.  # start time of weight recording (ms)
+pars['weight_recording_n_senders'] = 100  # number of randomly sampled E senders of recorded synapses (None: all)
+pars['weight_recording_n_targets'] = 100  # number of randomly sampled E targets of recorded synapses (None: all)
+pars['weight_recording_every_k'] = 1      # store only every k-th weight update
+pars['weight_recording_bin'] = None       # if not None: store only the last update of each synapse in time bins of this size (ms)
 
 # simulation parameters
 pars['T'] = 10000.            # simulation time
 pars['dt'] = 2**-3            # simulation resolution (ms)  !!! revise documentation (incl delay)
 pars['tics_per_step'] = 2**7  # number of tics per time step (defines resolution of time variables in NEST)
+                              # (see resolution_study.py for the accuracy and cost of different dt and tics_per_step)
 pars['seed'] = 1              # seed for random number generator
-pars['n_threads'] = 4         # number of threads for simulation
+pars['n_threads'] = 4         # number of threads for simulation (per MPI process)
                               # (note: varying the number of threads leads to different random-number sequences,
                               # and, hence, to different results)
+pars['thread_invariant_connectivity'] = False  # True: draw fixed-indegree sources and initial states with a seeded numpy generator
+                                               # outside the kernel (network independent of the number of threads and processes;
+                                               # note: the realization of the Poissonian input still depends on the number of threads)
 
 pars['print_simulation_progress'] = True   # print network time and realtime factor
 pars['nest_verbosity'] = 'M_WARNING'       # 'M_FATAL', 'M_ERROR', 'M_WARNING', 'M_DEPRECATED', 'M_INFO', 'M_ALL'
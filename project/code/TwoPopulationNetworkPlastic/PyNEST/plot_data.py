@@ -4,7 +4,6 @@ import model
 
 import matplotlib.pyplot as plt
 from matplotlib import gridspec
-import nest
 import numpy as np
 import os
 
@@ -18,23 +17,70 @@ def time_and_population_averaged_spike_rate(spikes,time_interval,pop_size):
     return rate
 
 #################################################
-def plot_spikes(spikes, nodes, pars, path = './'):
+def plot_spikes(spikes, nodes, pars, path = './', mode = 'auto', image_shape = (500, 1000), max_scatter_spikes = 100000):
     '''
     Create raster plot of spiking activity.
+
+    Arguments
+    ---------
+    spikes:              numpy.ndarray or iterable
+                         Lx2 array of spike senders and times, or iterable of such arrays 
+                         (chunks, see model.iter_spike_data()).
+
+    nodes:               dict
+                         Node ids.
+
+    pars:                dict
+                         Model parameters.
+
+    path:                str (optional)
+                         Path of output figure. Default: './'.
+
+    mode:                str (optional)
+                         'scatter': one marker per spike,
+                         'density': image of spike counts in (neuron x time) bins, accumulated over spike chunks,
+                         'auto':    'scatter' for arrays with at most max_scatter_spikes spikes, 'density' otherwise (default).
+
+    image_shape:         tuple (optional)
+                         Number of (neuron, time) bins of the density image. Default: (500, 1000).
+
+    max_scatter_spikes:  int (optional)
+                         Maximum number of spikes for scatter plots in mode 'auto'. Default: 10^5.
+
     '''
 
     pop_all = np.array(nodes['pop_all'])
-    
-    rate = time_and_population_averaged_spike_rate(spikes,(0.,pars['T']),pars['N_rec_spikes'])
+
+    if mode == 'auto':
+        if isinstance(spikes, np.ndarray) and len(spikes) <= max_scatter_spikes:
+            mode = 'scatter'
+        else:
+            mode = 'density'
     
     # plot spiking activity
     plt.figure(num=1,figsize=(7, 5))
     plt.clf()
-    plt.title(r'time and population averaged firing rate: $\nu=%.2f$ spikes/s' % rate)
-    plt.plot(spikes[:,1],spikes[:,0],'o',ms=0.5,lw=0, mfc='k',mec='k',alpha=0.3,rasterized=True)
 
-    plt.xlim(0,pars['T'])
-    plt.ylim(0,pars['N_rec_spikes'])
+    if mode == 'scatter':
+        if not isinstance(spikes, np.ndarray):
+            spikes = np.concatenate(list(spikes))
+        rate = time_and_population_averaged_spike_rate(spikes,(0.,pars['T']),pars['N_rec_spikes'])
+        plt.plot(spikes[:,1],spikes[:,0],'o',ms=0.5,lw=0, mfc='k',mec='k',alpha=0.3,rasterized=True)
+        plt.xlim(0,pars['T'])
+        plt.ylim(0,pars['N_rec_spikes'])
+    elif mode == 'density':
+        id_range = (pop_all[0], pop_all[0] + pars['N_rec_spikes'] - 1)
+        counts = model.get_spike_count_image(spikes, (0., pars['T']), id_range, image_shape)
+        rate = counts.sum() / pars['T'] * 1000.0 / pars['N_rec_spikes']
+        print("\n-----> average firing rate: nu=%.2f /s\n" % (rate))
+        image = plt.imshow(counts, origin='lower', aspect='auto', interpolation='nearest', cmap=plt.cm.gray_r,
+                           extent=(0., pars['T'], id_range[0] - 0.5, id_range[1] + 0.5))
+        cb = plt.colorbar(image)
+        cb.set_label(r'spike count per bin')
+    else:
+        raise ValueError('mode must be "scatter", "density" or "auto".')
+
+    plt.title(r'time and population averaged firing rate: $\nu=%.2f$ spikes/s' % rate)
     plt.xlabel(r'time (ms)')
     plt.ylabel(r'neuron id')
     plt.savefig(path + '/TwoPopulationNetworkPlastic_spikes.png')
@@ -55,10 +101,14 @@ def plot_spikes(spikes, nodes, pars, path = './'):
 #     ax.set_yticklabels(yticks.astype('int'))
 
 #################################################        
-def plot_connectivity_matrix(W, pop_pre, pop_post, filename_label = None, path = './'):
+def plot_connectivity_matrix(W, pop_pre, pop_post, filename_label = None, path = './', max_blocks = (500, 500), reduction = 'mean'):
     '''
     Plot connectivity matrix 'W' for source and target neurons contained in 'pop_pre' and 'pop_post', 
     and save figure to file.
+
+    'W' may be a sparse (see model.get_connectivity_matrix()) or dense matrix. Matrices with more than 
+    max_blocks[0] x max_blocks[1] elements are reduced to this size by block averaging (reduction='mean') 
+    or max pooling (reduction='max') before rendering (see model.pool_connectivity_matrix()).
     '''
 
     wmin=0
@@ -73,14 +123,13 @@ def plot_connectivity_matrix(W, pop_pre, pop_post, filename_label = None, path =
 
     matrix_ax = fig.add_subplot(gs[0])
     cmap = plt.cm.gray_r
-    matrix = plt.pcolor(pop_pre,pop_post,W,cmap=cmap,rasterized=True,vmin=wmin,vmax=wmax)
+    W_pooled = model.pool_connectivity_matrix(W, max_blocks, reduction)
+    matrix = plt.imshow(W_pooled,cmap=cmap,origin='lower',aspect='auto',interpolation='nearest',vmin=wmin,vmax=wmax,
+                        extent=(pop_pre[0]-0.5,pop_pre[-1]+0.5,pop_post[0]-0.5,pop_post[-1]+0.5))
     plt.xlabel(r'source id')
     plt.ylabel(r'target id')
 
     #center_axes_ticks(matrix_ax)
-
-    plt.xlim(pop_pre[0],pop_pre[-1])
-    plt.ylim(pop_post[0],pop_post[-1])
     
     ###
 
@@ -119,47 +168,48 @@ def plot_weight_distributions(whist_presim, whist_postsim, weights, path = './')
 def plot_data():
     '''Plot spike and connectivity data'''
 
-    ## raster plot
-    parameters = model.get_default_parameters()
-    parameters['record_spikes'] = True
-    parameters['record_weights'] = True
-
-    model.install_nestml_module(parameters['neuron_model'])
-    
-    ## fetch node ids
-    model_instance = model.Model(parameters)
-    model_instance.create()
+    ## fetch node ids, file labels and parameters from run manifest (written by run_model.py)
+    data_path = model.get_default_parameters()['data_path']
+    manifest = model.load_run_manifest(data_path)
+    pars = manifest['parameters']
+    nodes = manifest['nodes']
 
     ## create subfolder for figures (if necessary)
-    os.system('mkdir -p ' + model_instance.pars['data_path'])
+    os.system('mkdir -p ' + data_path)
     
-    ## load spikes
-    spikes = model.load_spike_data(model_instance.pars['data_path'], "spikes-%d" % (np.array(model_instance.nodes['spike_recorder'])[0]))    
-    plot_spikes(spikes, model_instance.nodes, model_instance.pars, model_instance.pars['data_path'])
+    ## raster plot (spike-count image streamed over spike-file chunks for large networks)
+    if pars['N_rec_spikes'] <= 1000:
+        spikes = model.load_spike_data(data_path, manifest['files']['spikes']['label'])    
+        plot_spikes(spikes, nodes, pars, data_path, mode='scatter')
+    else:
+        spikes = model.iter_spike_data(data_path, manifest['files']['spikes']['label'])
+        plot_spikes(spikes, nodes, pars, data_path, mode='density')
 
     ## load connectivity
-    connectivity_presim = model.load_connectivity_data(model_instance.pars['data_path'],'connectivity_presim')
-    connectivity_postsim = model.load_connectivity_data(model_instance.pars['data_path'],'connectivity_postsim')
+    connectivity_presim = model.load_connectivity_data(data_path,'connectivity_presim')
+    connectivity_postsim = model.load_connectivity_data(data_path,'connectivity_postsim')
 
-    ## create connectivity matrices before and after simulation for a subset of neurons
-    subset_size = 100
-    pop_pre = np.array(model_instance.nodes['pop_E'])[:subset_size]
-    pop_post = np.array(model_instance.nodes['pop_E'])[:subset_size]
+    ## create (sparse) connectivity matrices before and after simulation for the exported subset of neurons
+    subset_size = 1000
+    pop_pre = nodes['pop_E'][:subset_size]
+    pop_post = nodes['pop_E'][:subset_size]
     W_presim, pop_pre, pop_post = model.get_connectivity_matrix(connectivity_presim, pop_pre, pop_post)
     W_postsim, pop_pre, pop_post = model.get_connectivity_matrix(connectivity_postsim, pop_pre, pop_post)
     
     ## plot connectivity matrices
-    plot_connectivity_matrix(W_presim, pop_pre, pop_post,'_presim', model_instance.pars['data_path'])
-    plot_connectivity_matrix(W_postsim, pop_pre, pop_post,'_postsim', model_instance.pars['data_path'])
+    plot_connectivity_matrix(W_presim, pop_pre, pop_post,'_presim', data_path)
+    plot_connectivity_matrix(W_postsim, pop_pre, pop_post,'_postsim', data_path)
 
-    ## compute weight distributions
+    ## compute weight distributions (streamed over connectivity-file chunks)
     #weights = np.arange(29.5,34.1,0.05)
-    weights = np.arange(0.,150.1,0.5)
-    whist_presim = model.get_weight_distribution(connectivity_presim,weights)
-    whist_postsim = model.get_weight_distribution(connectivity_postsim,weights)
+    weights = model.get_weight_bins(pars)
+    whist_presim, stats_presim = model.get_weight_distribution_from_files(data_path,'connectivity_presim',weights)
+    whist_postsim, stats_postsim = model.get_weight_distribution_from_files(data_path,'connectivity_postsim',weights)
+    for label, stats in [('pre sim.', stats_presim), ('post sim.', stats_postsim)]:
+        print('Weights (%s): mean = %.2f pA, std = %.2f pA, fraction at zero = %.4f' % (label, stats['mean'], np.sqrt(stats['variance']), stats['fraction_zero']))
 
     ## plot weight distributions
-    plot_weight_distributions(whist_presim, whist_postsim, weights, model_instance.pars['data_path'])
+    plot_weight_distributions(whist_presim, whist_postsim, weights, data_path)
             
 #################################################
 
@@ -0,0 +1,255 @@
+'''
+Accuracy-versus-cost study of the simulation resolution for the TwoPopulationNetworkPlastic model.
+
+The model is simulated for all combinations of the simulation resolution "dt" and the number
+of tics per step "tics_per_step" in "grid", each in a separate process. For each run, the
+wall-clock time of the simulation phase is measured, and the following distributions are
+compared to those of the reference run (finest resolution, first entries of "reference"):
+
+- firing rates of individual neurons (E and I),
+- final weights of E->E (plastic) synapses.
+
+Deviations are quantified by the Wasserstein-1 (earth mover's) distance between the
+distributions, and by the relative deviations of the population-averaged rate and of the
+mean weight. The network (connectivity and initial states) is identical for all runs
+(pars['thread_invariant_connectivity'] = True); the spike trains are, however, different
+realizations for different resolutions, i.e., only statistical deviations are meaningful.
+
+To bound the memory consumption, the weight distribution of each run (~10^7 synapses) is reduced
+to "n_quantiles" quantiles in the simulation process, and the deviations of each run are computed
+as soon as the run has finished; only the reference distributions are kept.
+
+The Pareto front (runs for which no other run is both faster and more accurate with respect to
+all four deviation measures) is reported and stored with the results. Runs are executed with
+benchmark_model.run_in_process(), such that crashed or stuck runs are recorded as failed.
+
+'''
+
+import os
+import time
+import json
+
+import numpy as np
+
+import benchmark_model
+
+#################################################
+## resolution grid
+grid = {
+    'dt': [2**-4, 2**-3, 2**-2, 2**-1],   # simulation resolution (ms); must divide the delay
+    'tics_per_step': [2**4, 2**7, 2**10], # number of tics per time step
+}
+
+reference = {'dt': 2**-4, 'tics_per_step': 2**10}   # reference (finest) resolution
+
+T_study = 10000.                                 # simulation time (ms)
+study_file = './data/resolution_study.json'     # output file
+n_quantiles = 1000                               # number of quantiles representing the weight distribution
+
+#################################################
+def run_resolution_instance(parameters, T):
+    '''
+    Run a single model instance, and return simulate time, per-neuron rates, and mean and quantiles
+    of the final E->E weights.
+
+    Arguments
+    ---------
+    parameters:  dict
+                 Model parameters.
+
+    T:           float
+                 Simulation time (ms).
+
+    Returns
+    -------
+    result:      dict
+                 Dictionary with entries 'time_simulate' (s), 'rates' (spikes/s; all neurons; float32
+                 array), 'weight_mean' (pA) and 'weight_quantiles' (pA; quantiles of all E->E weights at
+                 the probabilities get_quantile_levels(n_quantiles)).
+
+    '''
+    import nest
+    import model
+
+    model.install_nestml_module(parameters['neuron_model'])
+
+    model_instance = model.Model(parameters)
+    model_instance.create()
+
+    ## spike recorder for all neurons (spikes kept in memory)
+    spike_recorder = nest.Create('spike_recorder', {'record_to': 'memory'})
+    nest.Connect(model_instance.nodes['pop_all'], spike_recorder)
+
+    model_instance.connect()
+
+    t0 = time.perf_counter()
+    model_instance.simulate(T)
+    t1 = time.perf_counter()
+
+    pop_ids = np.array(model_instance.nodes['pop_all'].tolist())
+    senders = spike_recorder.get('events', 'senders')
+    rates = np.bincount(senders - pop_ids[0], minlength = len(pop_ids)) / T * 1000.
+
+    conns = nest.GetConnections(source = model_instance.nodes['pop_E'], target = model_instance.nodes['pop_E'])
+    weights = np.array(conns.get('weight'), dtype = np.float32)
+
+    return {'time_simulate': t1 - t0, 'rates': rates.astype(np.float32), 'weight_mean': float(weights.mean()),
+            'weight_quantiles': np.quantile(weights, get_quantile_levels(n_quantiles))}
+
+#################################################
+def get_quantile_levels(n):
+    '''Return the probabilities (k + 1/2) / n, k = 0, ..., n-1, at which distributions are represented by quantiles.'''
+
+    return (np.arange(n) + 0.5) / n
+
+#################################################
+def wasserstein_distance(x, y):
+    '''Return the Wasserstein-1 distance between the empirical distributions of the samples x and y.'''
+
+    x = np.sort(x)
+    y = np.sort(y)
+    values = np.sort(np.concatenate([x, y]))
+    cdf_x = np.searchsorted(x, values[:-1], side = 'right') / len(x)
+    cdf_y = np.searchsorted(y, values[:-1], side = 'right') / len(y)
+
+    return np.sum(np.abs(cdf_x - cdf_y) * np.diff(values))
+
+#################################################
+def quantile_wasserstein_distance(quantiles_x, quantiles_y):
+    '''
+    Return the Wasserstein-1 distance between two distributions represented by their quantiles at the
+    same probabilities get_quantile_levels(n) (midpoint rule for the integral of |F_x^-1(p) - F_y^-1(p)| over p).
+    '''
+    return np.mean(np.abs(np.asarray(quantiles_x, dtype = float) - np.asarray(quantiles_y, dtype = float)))
+
+#################################################
+def get_deviations(result, result_ref):
+    '''
+    Return deviations of rate and weight distributions of a run from those of the reference run.
+    '''
+    rates, rates_ref = np.asarray(result['rates'], dtype = float), np.asarray(result_ref['rates'], dtype = float)
+
+    deviations = {
+        'rate_distance': wasserstein_distance(rates, rates_ref),                        ## spikes/s
+        'rate_relative_error': abs(rates.mean() - rates_ref.mean()) / rates_ref.mean(),
+        'weight_distance': quantile_wasserstein_distance(result['weight_quantiles'], result_ref['weight_quantiles']),  ## pA
+        'weight_relative_error': abs(result['weight_mean'] - result_ref['weight_mean']) / result_ref['weight_mean'],
+    }
+
+    return deviations
+
+#################################################
+def get_pareto_front(costs):
+    '''
+    Return indices of non-dominated points (all objectives minimized).
+
+    Arguments
+    ---------
+    costs:    numpy.ndarray
+              (n_points x n_objectives) array of objective values.
+
+    Returns
+    -------
+    front:    numpy.ndarray
+              Indices of points for which no other point is better or equal in all objectives
+              and strictly better in at least one objective.
+
+    '''
+    costs = np.asarray(costs, dtype = float)
+    better_equal = np.all(costs[:, np.newaxis, :] <= costs[np.newaxis, :, :], axis = 2)   ## [i,j]: i <= j in all objectives
+    better = np.any(costs[:, np.newaxis, :] < costs[np.newaxis, :, :], axis = 2)          ## [i,j]: i < j in some objective
+    dominated = np.any(better_equal & better, axis = 0)
+
+    return np.flatnonzero(~dominated)
+
+#################################################
+def run_resolution_study(grid, reference, T, filename, timeout = None):
+    '''
+    Run the model for all resolutions in "grid" and the reference resolution, compare the results
+    to the reference, and report the Pareto front of simulate time vs. rate and weight deviations
+    (Wasserstein distances and relative errors of the means).
+
+    Arguments
+    ---------
+    grid:        dict
+                 Dictionary of parameter lists {'dt': [...], 'tics_per_step': [...]}.
+
+    reference:   dict
+                 Reference resolution {'dt': ..., 'tics_per_step': ...}.
+
+    T:           float
+                 Simulation time (ms).
+
+    filename:    str
+                 Name of output (json) file.
+
+    timeout:     float (optional)
+                 Maximum wall-clock time (s) of each run (see benchmark_model.run_in_process()).
+                 Default: None (no limit).
+
+    Returns
+    -------
+    study:       dict
+                 Results (without per-neuron data) and indices of the Pareto front.
+
+    '''
+    import model
+
+    points = [reference] + [point for point in benchmark_model.get_sweep_points(grid) if point != reference]
+    result_ref = None
+    runs = []
+    for point in points:
+        print('\nResolution study: %s' % point)
+
+        parameters = dict(model.get_default_parameters())
+        parameters.update(point)
+        parameters['thread_invariant_connectivity'] = True
+        parameters['record_spikes'] = False
+        parameters['print_simulation_progress'] = False
+        parameters['data_path'] = os.path.dirname(filename) + '/resolution_study'
+
+        result = benchmark_model.run_in_process(run_resolution_instance, (parameters, T), timeout)
+
+        if 'error' in result:
+            if result_ref is None:
+                raise RuntimeError('Reference run failed: %s' % result['error'])
+            print('Run failed: %s' % result['error'])
+            runs += [{'parameters': point, 'error': result['error']}]
+            continue
+
+        if result_ref is None:
+            result_ref = result           ## reference distributions (kept until the end of the study)
+
+        ## deviations are computed immediately, such that per-neuron data of only one run is held in memory
+        run = {'parameters': point, 'time_simulate': result['time_simulate']}
+        run.update(get_deviations(result, result_ref))
+        runs += [run]
+        del result
+
+    objectives = ['time_simulate', 'rate_distance', 'rate_relative_error', 'weight_distance', 'weight_relative_error']
+    valid = [k for k, run in enumerate(runs) if 'error' not in run]
+    costs = [[runs[k][objective] for objective in objectives] for k in valid]
+    front = [valid[k] for k in get_pareto_front(costs)] if len(valid) > 0 else []
+
+    print('\n%10s %14s %12s %12s %12s %14s %14s  %s' % ('dt (ms)', 'tics_per_step', 'T_sim (s)', 'rate dist.', 'rate error',
+                                                       'weight dist.', 'weight error', 'Pareto'))
+    for k in valid:
+        run = runs[k]
+        print('%10.4f %14d %12.2f %12.3f %12.4f %14.3f %14.4f  %s' % (run['parameters']['dt'], run['parameters']['tics_per_step'],
+                                                                   run['time_simulate'], run['rate_distance'], run['rate_relative_error'],
+                                                                   run['weight_distance'], run['weight_relative_error'],
+                                                                   '*' if k in front else ''))
+
+    study = {'T': T, 'reference': reference, 'runs': runs, 'objectives': objectives, 'pareto_front': front}
+
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok = True)
+    with open(filename, 'w') as f:
+        json.dump(study, f, indent = 4)
+    print('\nResults written to %s' % filename)
+
+    return study
+
+#################################################
+
+if __name__ == '__main__':
+    run_resolution_study(grid, reference, T_study, study_file)
@@ -1,12 +1,85 @@
 import sys
+import json
 import model
 import psutil
 
 #################################################
-def run_model():
+def get_rss():
+    '''Return resident set size (MB) of the current process.'''
+
+    return psutil.Process().memory_info().rss / 1024.**2
+
+#################################################
+def run_phase(memory_profile, phase, function, *args, **kwargs):
+    '''
+    Call function(*args, **kwargs) and record the resident set size before and after the call
+    in memory_profile['phases'].
+    '''
+    rss_before = get_rss()
+    result = function(*args, **kwargs)
+    rss_after = get_rss()
+
+    memory_profile['phases'] += [{
+        'phase': phase,
+        'rss_before_MB': rss_before,
+        'rss_after_MB': rss_after,
+        'rss_increase_MB': rss_after - rss_before,
+    }]
+
+    return result
+
+#################################################
+def get_memory_estimates(memory_profile):
+    '''
+    Derive memory consumption per neuron and per synapse from the RSS increase during
+    create() and connect() (see run_phase()), and from the local numbers of neurons and
+    connections in memory_profile['counts'] (see model.Model.get_local_counts()).
+
+    Note that the increase during connect() includes the buffers allocated by nest.Prepare().
+
+    Returns
+    -------
+    estimates:   dict
+                 Dictionary with entries 'bytes_per_neuron', 'bytes_per_synapse' and 'base_MB'
+                 (RSS after __init__()).
+
+    '''
+    increase = {entry['phase']: entry['rss_increase_MB'] * 1024.**2 for entry in memory_profile['phases']}
+    n_neurons = memory_profile['counts']['n_local_neurons']
+    n_synapses = sum(memory_profile['counts']['num_connections'].values())
+
+    estimates = {
+        'base_MB': [entry['rss_after_MB'] for entry in memory_profile['phases'] if entry['phase'] == '__init__'][0],
+        'bytes_per_neuron': increase['create'] / n_neurons if n_neurons > 0 else None,
+        'bytes_per_synapse': increase['connect'] / n_synapses if n_synapses > 0 else None,
+    }
+
+    return estimates
+
+#################################################
+def estimate_memory(memory_profile, N, K, n_processes = 1):
+    '''
+    Extrapolate the memory consumption (MB per MPI process) to a network of size N with in-degree K,
+    using the estimates in memory_profile['estimates'] (see get_memory_estimates()).
+
+    The number of synapses per neuron is K + 1 (local inputs and external Poisson input).
+    Recording and simulation buffers are neglected.
+    '''
+    estimates = memory_profile['estimates']
+    n_neurons = N / n_processes
+    n_synapses = n_neurons * (K + 1)
+
+    return estimates['base_MB'] + (n_neurons * estimates['bytes_per_neuron'] + n_synapses * estimates['bytes_per_synapse']) / 1024.**2
+
+#################################################
+def run_model(parameters = None):
     '''
     Runs the model and stores data on disk (spike data and model paramaters).
 
+    The resident set size before and after each model phase, the local numbers of neurons
+    and connections, and the derived memory per neuron and per synapse are stored in
+    "memory_profile-<rank>.json" in the data path (see get_memory_estimates()).
+
     Note: Data can be loaded from file using
 
              parameters = model.get_default_parameters()
@@ -14,41 +87,59 @@ def run_model():
 
     Arguments
     ---------
+    parameters: dict (optional)
+                Model parameters. If None (default), the default parameters with spike recording are used.
 
     Returns
     -------
-    
+
     '''
 
-    parameters = model.get_default_parameters()
-    parameters['record_spikes'] = True
-    #parameters['record_weights'] = True
+    if parameters is None:
+        parameters = model.get_default_parameters()
+        parameters['record_spikes'] = True
+        #parameters['record_weights'] = True
 
     model.install_nestml_module(parameters['neuron_model'])
 
-    model_instance = model.Model(parameters)
-    model_instance.create()
-    model_instance.connect()
+    memory_profile = {'phases': []}
+
+    model_instance = run_phase(memory_profile, '__init__', model.Model, parameters)
+    run_phase(memory_profile, 'create', model_instance.create)
+    run_phase(memory_profile, 'connect', model_instance.connect)   ## incl. nest.Prepare()
 
     ## connectivity at start of simulation
     subset_size = 1000 #2000    ## number of pre- and post-synaptic neurons weights are extracted from
     pop_pre = model_instance.nodes['pop_E'][:subset_size]
     pop_post = model_instance.nodes['pop_E'][:subset_size]
-    C = model_instance.get_connectivity(pop_pre, pop_post, model_instance.pars['data_path'] +  '/' +'connectivity_presim.dat')
+    C = run_phase(memory_profile, 'get_connectivity_presim', model_instance.get_connectivity,
+                  pop_pre, pop_post, model_instance.pars['data_path'] +  '/' +'connectivity_presim.dat', return_data=False)
 
     ## simulate
-    model_instance.simulate(model_instance.pars['T'])
+    run_phase(memory_profile, 'simulate', model_instance.simulate, model_instance.pars['T'])
 
     ## save parameters to file
     model_instance.save_parameters('model_instance_parameters',model_instance.pars['data_path'])
 
     ## connectivity at end of simulation
-    C = model_instance.get_connectivity(pop_pre, pop_post, model_instance.pars['data_path'] + '/' + 'connectivity_postsim.dat')
-        
-    return 
+    C = run_phase(memory_profile, 'get_connectivity_postsim', model_instance.get_connectivity,
+                  pop_pre, pop_post, model_instance.pars['data_path'] + '/' + 'connectivity_postsim.dat', return_data=False)
 
-#################################################
+    ## save memory profile (per MPI process)
+    memory_profile['counts'] = model_instance.get_local_counts()
+    memory_profile['estimates'] = get_memory_estimates(memory_profile)
+    with open('%s/memory_profile-%d.json' % (model_instance.pars['data_path'], model_instance.rank), 'w') as f:
+        json.dump(memory_profile, f, indent = 4)
+
+    ## merge data files of different MPI processes
+    model_instance.merge_data()
 
-run_model()
+    ## save run manifest (node ids, file labels and formats, parameters) for analysis without NEST kernel
+    model_instance.save_manifest()
 
+    return
+
+#################################################
 
+if __name__ == '__main__':
+    run_model()
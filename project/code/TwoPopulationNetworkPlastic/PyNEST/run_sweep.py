@@ -0,0 +1,208 @@
+'''
+Parallel parameter sweeps for the TwoPopulationNetworkPlastic model.
+
+The parameter grid defined in "grid" is expanded into all parameter combinations.
+Each sweep point is simulated by run_model.run_model() in a separate (spawned) process, started
+with benchmark_model.run_in_process(), such that crashed, killed or stuck simulations (optional
+"timeout") are detected and do not block the sweep. The available cores ("n_cores") are split
+between "n_workers" simultaneous simulations with "n_threads" threads each.
+
+The results of each sweep point are stored in a subdirectory of "sweep_path" named by the
+hash of the fully derived parameter dictionary (see get_parameter_hash()). The index file
+"index.json" maps the hashes to the sweep points and their status ('pending', 'complete' or
+'failed', with error message and exit code of failed runs). Sweep points with existing results
+are skipped when the sweep is run again, failed and pending points are rerun.
+
+'''
+
+import os
+import json
+import hashlib
+import itertools
+import concurrent.futures
+
+import model
+import benchmark_model
+
+#################################################
+## parameter grid
+grid = {
+    'stdp_alpha': [0.05, 0.1],  # relative magnitude of weight update for acausal firing
+    'eta': [1.2],               # rate of external Poissonian sources relative to threshold rate
+    'g': [10.0],                # relative IPSP amplitude
+    'J_E': [0.5],               # EPSP amplitude (mV)
+}
+
+n_cores = os.cpu_count()        # total number of cores used by the sweep
+n_threads = 4                   # number of threads per simulation
+sweep_path = './data/sweep'     # root directory of sweep results
+timeout = None                  # maximum wall-clock time (s) per sweep point (None: no limit)
+
+## parameters excluded from the hash (no effect on the simulation results)
+hash_excluded_parameters = ['data_path', 'print_simulation_progress', 'nest_verbosity']
+
+#################################################
+def get_parameter_hash(parameters):
+    '''
+    Return hash (hex string) of the fully derived parameter dictionary.
+
+    Arguments
+    ---------
+    parameters:  dict
+                 Base parameters.
+
+    Returns
+    -------
+    hash:        str
+                 SHA-1 hash of the json representation of all (base and derived) parameters,
+                 excluding the parameters in "hash_excluded_parameters".
+
+    '''
+    pars = model.derive_parameters(parameters)
+    pars = {key: value for key, value in pars.items() if key not in hash_excluded_parameters}
+
+    return hashlib.sha1(json.dumps(pars, sort_keys = True).encode()).hexdigest()
+
+#################################################
+def get_grid_points(grid):
+    '''Return list of parameter dictionaries for all combinations of the parameter values in "grid".'''
+
+    keys = list(grid.keys())
+
+    return [dict(zip(keys, values)) for values in itertools.product(*[grid[key] for key in keys])]
+
+#################################################
+def run_sweep_point(parameters):
+    '''
+    Run model for a single sweep point, and mark result as complete.
+    '''
+    import run_model
+
+    run_model.run_model(parameters)
+
+    with open(parameters['data_path'] + '/complete', 'w') as f:
+        f.write('')
+
+    return {'data_path': parameters['data_path']}
+
+#################################################
+def read_sweep_index(index_file):
+    '''Return sweep index {parameter hash: {'parameters': sweep point, 'status': ...}} (empty if "index_file" does not exist).'''
+
+    if not os.path.exists(index_file):
+        return {}
+    with open(index_file, 'r') as f:
+        index = json.load(f)
+
+    ## indices of earlier versions map hashes to sweep points (without status)
+    return {parameter_hash: entry if 'status' in entry else {'parameters': entry, 'status': 'pending'}
+            for parameter_hash, entry in index.items()}
+
+#################################################
+def write_sweep_index(index, index_file):
+    '''Write sweep index (written to a temporary file first, such that an interrupted sweep leaves a valid index).'''
+
+    with open(index_file + '.tmp', 'w') as f:
+        json.dump(index, f, indent = 4)
+    os.replace(index_file + '.tmp', index_file)
+
+#################################################
+def run_sweep(grid, sweep_path, n_cores, n_threads, timeout = None):
+    '''
+    Run all points of a parameter grid which have not been simulated before.
+
+    Arguments
+    ---------
+    grid:        dict
+                 Dictionary of parameter lists {parameter name: list of values}.
+
+    sweep_path:  str
+                 Root directory of sweep results.
+
+    n_cores:     int
+                 Total number of cores.
+
+    n_threads:   int
+                 Number of threads per simulation.
+
+    timeout:     float (optional)
+                 Maximum wall-clock time (s) of each sweep point (see benchmark_model.run_in_process()).
+                 Default: None (no limit).
+
+    Returns
+    -------
+    index:       dict
+                 Dictionary {parameter hash: {'parameters': sweep point, 'status': ...}} of all points in
+                 the index (failed points additionally contain 'error' and 'exitcode').
+
+    '''
+    os.makedirs(sweep_path, exist_ok = True)
+
+    n_workers = max(1, n_cores // n_threads)
+
+    ## read index of previous sweeps
+    index_file = sweep_path + '/index.json'
+    index = read_sweep_index(index_file)
+
+    tasks = []
+    for point in get_grid_points(grid):
+        parameters = dict(model.get_default_parameters())
+        parameters.update(point)
+        parameters['record_spikes'] = True
+        parameters['n_threads'] = n_threads
+        parameters['print_simulation_progress'] = False
+
+        parameter_hash = get_parameter_hash(parameters)
+        parameters['data_path'] = '%s/%s' % (sweep_path, parameter_hash)
+
+        if os.path.exists(parameters['data_path'] + '/complete'):
+            print('Skipping %s (results in %s)' % (point, parameters['data_path']))
+            index[parameter_hash] = {'parameters': point, 'status': 'complete'}
+        else:
+            if index.get(parameter_hash, {}).get('status') == 'failed':
+                print('Rerunning failed point %s (%s)' % (point, index[parameter_hash]['error']))
+            index[parameter_hash] = {'parameters': point, 'status': 'pending'}
+            tasks += [(parameter_hash, parameters)]
+
+    write_sweep_index(index, index_file)
+
+    print('\nRunning %d sweep points with %d worker(s) and %d thread(s) per worker...' % (len(tasks), n_workers, n_threads))
+
+    ## each simulation runs in a fresh process (the worker threads only wait for their process);
+    ## the status of each point is written to the index as soon as the point has finished
+    n_failed = 0
+    with concurrent.futures.ThreadPoolExecutor(n_workers) as executor:
+        futures = {executor.submit(benchmark_model.run_in_process, run_sweep_point, (parameters,), timeout): parameter_hash
+                   for parameter_hash, parameters in tasks}
+        for future in concurrent.futures.as_completed(futures):
+            parameter_hash = futures[future]
+            result = future.result()
+            entry = index[parameter_hash]
+            if 'error' in result:
+                entry.update({'status': 'failed', 'error': result['error'], 'exitcode': result.get('exitcode')})
+                print('Failed %s/%s: %s' % (sweep_path, parameter_hash, result['error']))
+                n_failed += 1
+            else:
+                entry['status'] = 'complete'
+                print('Completed %s' % result['data_path'])
+            write_sweep_index(index, index_file)
+
+    if n_failed > 0:
+        print('\n%d of %d sweep point(s) failed (see %s); rerun the sweep to resume.' % (n_failed, len(tasks), index_file))
+
+    return index
+
+#################################################
+def load_sweep_index(sweep_path):
+    '''
+    Return dictionary {data path: sweep point} of all completed sweep points in "sweep_path".
+    '''
+    index = read_sweep_index(sweep_path + '/index.json')
+
+    return {'%s/%s' % (sweep_path, parameter_hash): entry['parameters'] for parameter_hash, entry in index.items()
+            if os.path.exists('%s/%s/complete' % (sweep_path, parameter_hash))}
+
+#################################################
+
+if __name__ == '__main__':
+    run_sweep(grid, sweep_path, n_cores, n_threads, timeout)
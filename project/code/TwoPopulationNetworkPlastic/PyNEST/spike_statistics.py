@@ -0,0 +1,279 @@
+'''
+Spike-train statistics for the TwoPopulationNetworkPlastic model.
+
+Vectorized computation of per-neuron firing rates, coefficients of variation (CV) of the
+inter-spike intervals (ISIs), Fano factors of spike counts, and spike-count correlation
+coefficients for randomly sampled neuron pairs from Lx2 spike arrays (senders spikes[:,0],
+spike times spikes[:,1]), as returned by model.load_spike_data().
+
+The spikes are sorted once by sender and time; all per-neuron quantities are then obtained
+with np.bincount(), without loops over neurons. For n_workers > 1, the population is split
+into blocks of neurons that are processed in parallel.
+
+'''
+
+import numpy as np
+import model
+
+#################################################
+def get_sender_indices(spikes, pop, time_interval):
+    '''
+    Restrict spikes to population "pop" and time interval (t_start, t_stop].
+
+    Returns
+    -------
+    ind:     numpy.ndarray
+             Sender indices (positions in "pop").
+
+    times:   numpy.ndarray
+             Spike times (ms).
+
+    '''
+    spikes = np.asarray(spikes)
+    times = spikes[:,1]
+    ind, valid = model.map_ids_to_indices(spikes[:,0], pop)
+    valid &= (times > time_interval[0]) & (times <= time_interval[1])
+
+    return ind[valid], times[valid]
+
+#################################################
+def sort_spikes(ind, times):
+    '''
+    Sort spikes by sender index and time.
+    '''
+    order = np.lexsort((times, ind))
+
+    return ind[order], times[order]
+
+#################################################
+def get_firing_rates(ind, n_neurons, time_interval):
+    '''Return firing rates (spikes/s) of n_neurons neurons from (sorted or unsorted) sender indices "ind".'''
+
+    return np.bincount(ind, minlength = n_neurons) / (time_interval[1] - time_interval[0]) * 1000.
+
+#################################################
+def get_isi_cvs(ind, times, n_neurons):
+    '''
+    Return coefficients of variation of the inter-spike intervals of n_neurons neurons.
+
+    "ind" and "times" must be sorted by sender index and time (see sort_spikes()).
+    The CV is NaN for neurons with less than two ISIs.
+    '''
+    isi = np.diff(times)
+    same_sender = ind[1:] == ind[:-1]
+    isi = isi[same_sender]
+    isi_ind = ind[1:][same_sender]
+
+    n_isi = np.bincount(isi_ind, minlength = n_neurons)
+    sum_isi = np.bincount(isi_ind, weights = isi, minlength = n_neurons)
+    sum_isi2 = np.bincount(isi_ind, weights = isi**2, minlength = n_neurons)
+
+    cv = np.full(n_neurons, np.nan)
+    has_isi = n_isi >= 2
+    mean = sum_isi[has_isi] / n_isi[has_isi]
+    var = np.maximum(sum_isi2[has_isi] / n_isi[has_isi] - mean**2, 0.)
+    cv[has_isi] = np.sqrt(var) / mean
+
+    return cv
+
+#################################################
+def get_count_bins(ind, times, n_bins, time_interval, bin_size):
+    '''
+    Return flat (sender index, time bin) indices ind * n_bins + time bin of all spikes.
+
+    Bins are left-open and right-closed, (t_start + k bin_size, t_start + (k+1) bin_size], consistent
+    with the observation interval (t_start, t_stop]; the last bin is truncated at t_stop.
+    '''
+    bins = np.ceil((times - time_interval[0]) / bin_size).astype(np.int64) - 1
+    bins = np.clip(bins, 0, n_bins - 1)
+
+    return ind.astype(np.int64) * n_bins + bins
+
+#################################################
+def get_fano_factors(ind, times, n_neurons, time_interval, bin_size):
+    '''
+    Return Fano factors (variance / mean) of spike counts in time bins of size "bin_size" (ms)
+    of n_neurons neurons.
+
+    Spike counts are accumulated as sums of counts and squared counts over non-empty bins, such
+    that no (neurons x bins) count matrix is allocated. "ind" and "times" must be sorted by
+    sender index and time. The Fano factor is NaN for neurons without spikes.
+    '''
+    n_bins = int(np.ceil((time_interval[1] - time_interval[0]) / bin_size))
+    flat = get_count_bins(ind, times, n_bins, time_interval, bin_size)    ## sorted
+
+    ## counts of non-empty (neuron, bin) combinations
+    starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]]) if len(flat) > 0 else np.zeros(0, dtype = np.int64)
+    counts = np.diff(np.r_[starts, len(flat)])
+    count_ind = flat[starts] // n_bins
+
+    mean = np.bincount(count_ind, weights = counts, minlength = n_neurons) / n_bins
+    mean2 = np.bincount(count_ind, weights = counts**2, minlength = n_neurons) / n_bins
+
+    fano = np.full(n_neurons, np.nan)
+    active = mean > 0
+    fano[active] = (mean2[active] - mean[active]**2) / mean[active]
+
+    return fano
+
+#################################################
+def get_count_matrix(ind, times, neurons, time_interval, bin_size):
+    '''
+    Return (len(neurons) x n_bins) matrix of spike counts of the neurons with indices "neurons" in time bins of size "bin_size" (ms).
+    '''
+    n_bins = int(np.ceil((time_interval[1] - time_interval[0]) / bin_size))
+    rows, valid = model.map_ids_to_indices(ind, neurons)
+    flat = get_count_bins(rows[valid], times[valid], n_bins, time_interval, bin_size)
+
+    return np.bincount(flat, minlength = len(neurons) * n_bins).reshape(len(neurons), n_bins)
+
+#################################################
+def sample_pairs(n_neurons, n_pairs, rng):
+    '''Return (n_pairs x 2) array of randomly drawn pairs of distinct neuron indices.'''
+
+    i = rng.integers(0, n_neurons, n_pairs)
+    j = rng.integers(0, n_neurons - 1, n_pairs)
+    j += j >= i
+
+    return np.column_stack([i, j])
+
+#################################################
+def get_count_correlations(counts, rows, chunk_size = 10000):
+    '''
+    Return Pearson correlation coefficients of the spike counts of pairs of neurons.
+
+    Arguments
+    ---------
+    counts:       numpy.ndarray
+                  (n x n_bins) matrix of spike counts (see get_count_matrix()).
+
+    rows:         numpy.ndarray
+                  (n_pairs x 2) array of row indices into "counts".
+
+    chunk_size:   int (optional)
+                  Number of pairs processed at once. Default: 10000.
+
+    Returns
+    -------
+    cc:           numpy.ndarray
+                  Correlation coefficients (NaN for pairs involving neurons with constant counts).
+
+    '''
+    counts = counts.astype(float)
+    std = counts.std(axis = 1)
+    z = np.zeros_like(counts)
+    varying = std > 0
+    z[varying] = (counts[varying] - counts[varying].mean(axis = 1)[:, np.newaxis]) / std[varying][:, np.newaxis]
+
+    cc = np.empty(len(rows))
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        cc[start:start + chunk_size] = np.einsum('ij,ij->i', z[chunk[:,0]], z[chunk[:,1]]) / counts.shape[1]
+    cc[~(varying[rows[:,0]] & varying[rows[:,1]])] = np.nan
+
+    return cc
+
+#################################################
+def spike_train_statistics_task(task):
+    '''
+    Compute statistics for a block of neurons (worker function of get_spike_train_statistics()).
+
+    task = (ind, times, n_neurons, time_interval, bin_size, sampled), where "ind" are the
+    (unsorted) sender indices relative to the first neuron of the block, and "sampled" are the
+    (block-relative) indices of neurons sampled for count correlations.
+    '''
+    ind, times, n_neurons, time_interval, bin_size, sampled = task
+    ind, times = sort_spikes(ind, times)
+
+    result = {
+        'rates': get_firing_rates(ind, n_neurons, time_interval),
+        'cvs': get_isi_cvs(ind, times, n_neurons),
+        'fano_factors': get_fano_factors(ind, times, n_neurons, time_interval, bin_size),
+        'counts': get_count_matrix(ind, times, sampled, time_interval, bin_size),
+    }
+
+    return result
+
+#################################################
+def get_spike_train_statistics(spikes, pop, time_interval, bin_size = 10., n_pairs = 1000, seed = None, n_workers = 1):
+    '''
+    Compute per-neuron firing rates, ISI CVs and spike-count Fano factors, and spike-count
+    correlation coefficients for randomly sampled pairs of neurons.
+
+    Arguments
+    ---------
+    spikes:         numpy.ndarray
+                    Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (see model.load_spike_data()).
+
+    pop:            numpy.ndarray, list or range
+                    Neuron population (node ids). Spikes of other senders are ignored.
+
+    time_interval:  tuple
+                    Start and stop of observation interval (ms). Only spikes in (start, stop] are considered.
+
+    bin_size:       float (optional)
+                    Size of time bins (ms) for spike counts (Fano factors and correlations). Default: 10 ms.
+
+    n_pairs:        int (optional)
+                    Number of sampled neuron pairs for count correlations. Default: 1000.
+
+    seed:           int (optional)
+                    Seed of the random-number generator for sampling neuron pairs. Default: None.
+
+    n_workers:      int (optional)
+                    Number of worker processes (blocks of neurons processed in parallel). Default: 1.
+
+    Returns
+    -------
+    stats:          dict
+                    Dictionary with entries
+
+                       'rates':         firing rates (spikes/s) of all neurons in "pop"
+                       'cvs':           ISI CVs of all neurons in "pop" (NaN for less than two ISIs)
+                       'fano_factors':  Fano factors of all neurons in "pop" (NaN for silent neurons)
+                       'pairs':         (n_pairs x 2) array of node ids of sampled pairs
+                       'correlations':  spike-count correlation coefficients of sampled pairs
+
+    '''
+    import concurrent.futures
+
+    pop = np.asarray(pop)
+    n_neurons = len(pop)
+    bin_size = float(bin_size)
+
+    ind, times = get_sender_indices(spikes, pop, time_interval)
+
+    rng = np.random.default_rng(seed)
+    pairs = sample_pairs(n_neurons, n_pairs, rng) if n_neurons > 1 else np.zeros((0, 2), dtype = np.int64)
+    sampled = np.unique(pairs)
+
+    ## split population into contiguous blocks of neurons; spikes are grouped by block with a 
+    ## stable sort of the block ids, and sorted within each block by the workers
+    n_blocks = max(min(n_workers, n_neurons), 1)
+    block_bounds = np.linspace(0, n_neurons, n_blocks + 1).astype(np.int64)
+    if n_blocks > 1:
+        block = (np.searchsorted(block_bounds, ind, side = 'right') - 1).astype(np.intp)
+        order = np.argsort(block, kind = 'stable')
+        ind, times = ind[order], times[order]
+        spike_bounds = np.r_[0, np.cumsum(np.bincount(block, minlength = n_blocks))]
+    else:
+        spike_bounds = np.array([0, len(ind)])
+    sample_bounds = np.searchsorted(sampled, block_bounds)
+    tasks = []
+    for k in range(n_blocks):
+        a, b = spike_bounds[k], spike_bounds[k + 1]
+        tasks += [(ind[a:b] - block_bounds[k], times[a:b], block_bounds[k + 1] - block_bounds[k],
+                   time_interval, bin_size, sampled[sample_bounds[k]:sample_bounds[k + 1]] - block_bounds[k])]
+
+    if n_blocks > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = n_blocks) as executor:
+            results = list(executor.map(spike_train_statistics_task, tasks))
+    else:
+        results = [spike_train_statistics_task(task) for task in tasks]
+
+    stats = {key: np.concatenate([result[key] for result in results]) for key in ['rates', 'cvs', 'fano_factors']}
+    counts = np.concatenate([result['counts'] for result in results])   ## rows ordered as "sampled"
+    stats['pairs'] = pop[pairs]
+    stats['correlations'] = get_count_correlations(counts, np.searchsorted(sampled, pairs))
+
+    return stats
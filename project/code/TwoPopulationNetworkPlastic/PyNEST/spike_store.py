@@ -0,0 +1,301 @@
+'''
+Indexed spike store for the TwoPopulationNetworkPlastic model.
+
+A SpikeStore is built once from recorded spike data (see model.load_spike_data()) and persisted
+in binary columnar format (see model.write_binary_data()). It holds
+
+- a CSR (compressed sparse row) layout: the spike times sorted by sender and time, the (sorted)
+  sender ids, and per-sender offsets into the time array,
+- a time-sorted copy of senders and times, with a coarse index of the times of the first spike
+  of each block of "block_size" spikes.
+
+Spikes of individual neurons and spike counts per neuron are obtained from the CSR layout: the
+segments of the requested senders are located by binary search in the sender ids, and the time
+window within each segment by a (vectorized) binary search in the segment. Population spikes in
+time windows are read either from the CSR segments (small populations) or from the time window
+of the time-sorted copy (large populations, O(log n) search plus the spikes in the window), see
+SpikeStore.get_population_spikes(). Reopening a store only reads the manifests and memory maps
+the data files.
+
+'''
+
+import numpy as np
+import model
+
+#################################################
+class SpikeStore:
+    """
+    Indexed, persistent store of spike data.
+
+    Usage:
+
+       store = SpikeStore.create(spikes, path, label)     # build from Lx2 spike array
+       store = SpikeStore.from_recorder(data_path, 'spikes-12502', path, label)   # build from recorder files
+       store = SpikeStore(path, label)                    # reopen
+
+       times = store.get_neuron_spikes(node_id)
+       spikes = store.get_population_spikes(pop, (t_start, t_stop))
+       counts = store.get_counts(pop)
+
+    """
+
+    ##############################################
+    def __init__(self, path, label):
+        '''
+        Open existing spike store "label" in directory "path" (data files are memory mapped).
+        '''
+        manifest, columns = model.read_binary_data(path, '%s.index.json' % label)
+        assert manifest.get('store') == 'spike_store', '%s/%s.index.json is not a spike store.' % (path, label)
+
+        self.path = path
+        self.label = label
+        self.block_size = manifest['block_size']
+        self.n_spikes = manifest['n_spikes']
+        self.ids = columns['ids']                 ## sorted sender ids
+        self.__offsets = columns['offsets']       ## spikes of ids[i]: csr_times[offsets[i]:offsets[i+1]] (offsets[n_ids] = n_spikes implicit)
+
+        self.__csr_times = model.read_binary_data(path, '%s.csr.json' % label)[1]['times']
+        _, columns = model.read_binary_data(path, '%s.time_sorted.json' % label)
+        self.__senders = columns['senders']
+        self.__times = columns['times']
+        self.__block_times = model.read_binary_data(path, '%s.blocks.json' % label)[1]['times']
+
+    ##############################################
+    @staticmethod
+    def create(spikes, path, label, block_size = 65536):
+        '''
+        Build spike store from spike array and write it to directory "path".
+
+        Arguments
+        ---------
+        spikes:       numpy.ndarray
+                      Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (ms).
+
+        path:         str
+                      Directory of the store.
+
+        label:        str
+                      Store label (file name root).
+
+        block_size:   int (optional)
+                      Number of spikes per block of the time index. Default: 65536.
+
+        Returns
+        -------
+        store:        SpikeStore
+                      Opened spike store.
+
+        '''
+        print('Building spike store %s/%s...' % (path, label))
+
+        spikes = np.asarray(spikes)
+        senders = spikes[:,0].astype(np.int64)
+        times = spikes[:,1].astype(np.float64)
+
+        ## CSR layout (sorted by sender and time)
+        order = np.lexsort((times, senders))
+        csr_senders = senders[order]
+        csr_times = times[order]
+        starts = np.flatnonzero(np.r_[True, csr_senders[1:] != csr_senders[:-1]]) if len(csr_senders) > 0 else np.zeros(0, dtype = np.int64)
+        ids = csr_senders[starts]
+
+        ## time-sorted copy (stable: simultaneous spikes sorted by sender)
+        order = order[np.argsort(csr_times, kind = 'stable')]
+        time_senders = senders[order]
+        time_times = times[order]
+
+        attributes = {'store': 'spike_store', 'block_size': block_size, 'n_spikes': len(times)}
+        model.write_binary_data(path, '%s.csr' % label, 'spike_store_columns', {'times': (csr_times, '<f8')}, attributes)
+        model.write_binary_data(path, '%s.time_sorted' % label, 'spike_store_columns',
+                                {'senders': (time_senders, '<i8'), 'times': (time_times, '<f8')}, attributes)
+        model.write_binary_data(path, '%s.blocks' % label, 'spike_store_columns', {'times': (time_times[::block_size], '<f8')}, attributes)
+        ## index is written last (marks the store as complete)
+        model.write_binary_data(path, '%s.index' % label, 'spike_store_columns',
+                                {'ids': (ids, '<i8'), 'offsets': (starts, '<i8')}, dict(attributes, n_ids = len(ids)))
+
+        return SpikeStore(path, label)
+
+    ##############################################
+    @staticmethod
+    def from_recorder(data_path, spike_label, path = None, label = 'spike_store', block_size = 65536):
+        '''
+        Build spike store from spike-recorder files (ASCII or binary, see model.load_spike_data()).
+
+        The store is written to "path" (default: data_path).
+        '''
+        spikes = model.load_spike_data(data_path, spike_label)
+
+        return SpikeStore.create(spikes, data_path if path is None else path, label, block_size)
+
+    ##############################################
+    def __find_ids(self, node_ids):
+        '''Return positions of "node_ids" in the sorted array self.ids (binary search), and validity mask.'''
+
+        node_ids = np.asarray(node_ids)
+        ind = np.searchsorted(self.ids, node_ids)
+        ind[ind == len(self.ids)] = 0
+        valid = (np.asarray(self.ids[ind]) == node_ids) if len(self.ids) > 0 else np.zeros(len(node_ids), dtype = bool)
+
+        return ind, valid
+
+    ##############################################
+    def __get_offsets(self, ind):
+        '''Return start and stop offsets of the CSR segments of the senders with positions "ind" in self.ids.'''
+
+        ind = np.asarray(ind)
+        if len(self.ids) == 0:
+            return np.zeros_like(ind), np.zeros_like(ind)
+        start = self.__offsets[ind]
+        stop = np.where(ind + 1 < len(self.ids), self.__offsets[np.minimum(ind + 1, len(self.ids) - 1)], self.n_spikes)
+
+        return start, stop
+
+    ##############################################
+    def __search_segments(self, start, stop, t):
+        '''
+        Return, for each CSR segment [start, stop), the position of the first spike with time > t
+        (np.searchsorted(csr_times[start:stop], t, side = 'right') + start).
+
+        The binary searches of all segments are carried out simultaneously (vectorized), such that
+        only O(log(segment length)) elements of the (memory mapped) time array are accessed per segment.
+        '''
+        lower = np.array(start, dtype = np.int64)
+        upper = np.array(stop, dtype = np.int64)
+        active = lower < upper
+        while active.any():
+            middle = (lower + upper) // 2
+            right = np.zeros(len(lower), dtype = bool)
+            right[active] = self.__csr_times[middle[active]] <= t
+            lower = np.where(active & right, middle + 1, lower)
+            upper = np.where(active & ~right, middle, upper)
+            active = lower < upper
+
+        return lower
+
+    ##############################################
+    def __search_time(self, t):
+        '''
+        Return number of spikes with times <= t in the time-sorted arrays.
+
+        The coarse block index is searched first, such that only one block of the (memory mapped)
+        time array is accessed.
+        '''
+        k = np.searchsorted(self.__block_times, t, side = 'right')   ## number of blocks starting at times <= t
+        if k == 0:
+            return 0
+        start = (k - 1) * self.block_size
+        stop = min(k * self.block_size, self.n_spikes)
+
+        return start + np.searchsorted(self.__times[start:stop], t, side = 'right')
+
+    ##############################################
+    def __get_segments(self, pop, time_interval):
+        '''
+        Return sender ids and start and stop offsets of the CSR segments of the neurons in "pop"
+        (restricted to spike times in (start, stop] of time_interval, if given).
+        '''
+        ind, valid = self.__find_ids(pop)
+        ids = pop[valid]
+        start, stop = self.__get_offsets(ind[valid])
+        if time_interval is not None:
+            start, stop = self.__search_segments(start, stop, time_interval[0]), self.__search_segments(start, stop, time_interval[1])
+
+        return ids, start, stop
+
+    ##############################################
+    def get_neuron_spikes(self, node_id, time_interval = None):
+        '''
+        Return spike times (ms, sorted) of neuron "node_id" (optionally restricted to (start, stop] of time_interval).
+        '''
+        ind, valid = self.__find_ids(np.array([node_id]))
+        if not valid[0]:
+            return np.zeros(0)
+        start, stop = self.__get_offsets(ind[0])
+        times = np.array(self.__csr_times[start:stop])
+
+        if time_interval is not None:
+            times = times[np.searchsorted(times, time_interval[0], side = 'right'):np.searchsorted(times, time_interval[1], side = 'right')]
+
+        return times
+
+    ##############################################
+    def get_population_spikes(self, pop, time_interval = None):
+        '''
+        Return spikes of the neurons in "pop" in the time interval (start, stop].
+
+        The spikes are read from one of two layouts, depending on the estimated cost:
+
+        - time-sorted copy: the time window is located by binary search (see __search_time()), and
+          all spikes in the window are read and filtered by "pop"; cost O(log n) plus the number of
+          spikes in the window (of all neurons). Used for large populations, e.g., whole-population
+          queries, for which the spikes are returned without further sorting.
+        - CSR segments of the neurons in "pop" (see __search_segments()); cost O(len(pop) log(spikes
+          per neuron)) plus the number k of returned spikes, and O(k log k) for sorting them by time.
+          Used for small populations.
+
+        Arguments
+        ---------
+        pop:            numpy.ndarray, list, range or nest.NodeCollection
+                        Neuron population (node ids).
+
+        time_interval:  None (default) or tuple (optional)
+                        Start and stop of observation interval (ms). If None, all spikes are returned.
+
+        Returns
+        -------
+        spikes:         numpy.ndarray
+                        Lx2 array of spike senders spikes[:,0] and spike times spikes[:,1] (ms), sorted by
+                        time (simultaneous spikes sorted by sender).
+
+        '''
+        if hasattr(pop, 'tolist'):
+            pop = pop.tolist()
+        pop = np.unique(np.asarray(pop, dtype = np.int64))
+
+        if time_interval is None:
+            a, b = 0, self.n_spikes
+        else:
+            a, b = self.__search_time(time_interval[0]), self.__search_time(time_interval[1])
+
+        ## estimated number of spikes of "pop" in the window, and cost of the segment searches
+        n_ids = max(len(self.ids), 1)
+        k = (b - a) * min(len(pop) / n_ids, 1.)
+        cost_segments = len(pop) * np.log2(2. + self.n_spikes / n_ids) + k * np.log2(2. + k)
+        if b - a <= cost_segments:
+            senders = np.array(self.__senders[a:b])
+            times = np.array(self.__times[a:b])
+            valid = model.map_ids_to_indices(senders, pop)[1]
+
+            return np.column_stack([senders[valid], times[valid]]).astype(float)
+
+        ids, start, stop = self.__get_segments(pop, time_interval)
+
+        ## positions of all requested spikes in the CSR time array
+        lengths = stop - start
+        n = int(lengths.sum())
+        positions = np.arange(n) + np.repeat(start - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+        senders = np.repeat(ids, lengths)
+        times = np.array(self.__csr_times[positions]) if n > 0 else np.zeros(0)
+
+        order = np.lexsort((senders, times))
+
+        return np.column_stack([senders[order], times[order]]).astype(float)
+
+    ##############################################
+    def get_counts(self, pop, time_interval = None):
+        '''
+        Return spike counts of the neurons in "pop" (in the order of "pop"; optionally in the time interval (start, stop]).
+
+        The counts are obtained from the CSR offsets (and, with time interval, binary searches in the
+        segments of the neurons in "pop"), without reading the spike data.
+        '''
+        if hasattr(pop, 'tolist'):
+            pop = pop.tolist()
+        pop = np.asarray(pop, dtype = np.int64)
+
+        ind, valid = self.__find_ids(pop)
+        start, stop = self.__get_offsets(ind)
+        if time_interval is not None:
+            start, stop = self.__search_segments(start, stop, time_interval[0]), self.__search_segments(start, stop, time_interval[1])
+
+        return np.where(valid, stop - start, 0)
@@ -0,0 +1,13 @@
+'''
+Unit tests of the analysis functions of the TwoPopulationNetworkPlastic model (PyNEST implementation).
+
+The tests use numpy/scipy only (no NEST kernel). Run from the PyNEST directory with
+
+   python -m pytest -q tests
+
+'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
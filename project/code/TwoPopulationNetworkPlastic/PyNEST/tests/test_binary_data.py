@@ -0,0 +1,87 @@
+import numpy as np
+
+import model
+
+#################################################
+def test_write_read_binary_data(tmp_path):
+    senders = np.array([3, 1, 2], dtype = np.int64)
+    times = np.array([0.5, 1.25, 2.0])
+    model.write_binary_data(str(tmp_path), 'data', 'test_columns', {'senders': (senders, '<i4'), 'times': (times, '<f8')},
+                            attributes = {'unit': 'ms'})
+
+    manifest, columns = model.read_binary_data(str(tmp_path), 'data.json')
+
+    assert manifest['format'] == 'test_columns'
+    assert manifest['n_rows'] == 3
+    assert manifest['unit'] == 'ms'
+    assert columns['senders'].dtype == np.dtype('<i4')
+    assert np.array_equal(columns['senders'], senders)
+    assert np.array_equal(columns['times'], times)
+
+#################################################
+def test_append_binary_data(tmp_path):
+    for k in range(3):
+        model.write_binary_data(str(tmp_path), 'data', 'test_columns', {'x': (np.arange(k, k + 2), '<i8')}, append = k > 0)
+    ## empty chunk
+    model.write_binary_data(str(tmp_path), 'data', 'test_columns', {'x': (np.zeros(0), '<i8')}, append = True)
+
+    manifest, columns = model.read_binary_data(str(tmp_path), 'data.json')
+
+    assert manifest['n_rows'] == 6
+    assert np.array_equal(columns['x'], [0, 1, 1, 2, 2, 3])
+
+#################################################
+def test_overwrite_binary_data(tmp_path):
+    model.write_binary_data(str(tmp_path), 'data', 'test_columns', {'x': (np.arange(5), '<i8')})
+    model.write_binary_data(str(tmp_path), 'data', 'test_columns', {'x': (np.arange(2), '<i8')})
+
+    manifest, columns = model.read_binary_data(str(tmp_path), 'data.json')
+
+    assert manifest['n_rows'] == 2
+    assert np.array_equal(columns['x'], [0, 1])
+
+#################################################
+def test_binary_spike_data_steps(tmp_path):
+    dt = 0.125
+    senders = np.array([5, 6, 5])
+    steps = np.array([8, 9, 17])
+    model.write_binary_spike_data(str(tmp_path), 'spikes-1', senders, steps, time_unit = 'steps', dt = dt)
+
+    assert model.has_binary_spike_data(str(tmp_path), 'spikes-1')
+    assert not model.has_binary_spike_data(str(tmp_path), 'spikes-2')
+
+    spikes = model.load_spike_data(str(tmp_path), 'spikes-1')
+
+    assert np.array_equal(spikes, np.column_stack([senders, steps * dt]))
+
+#################################################
+def test_binary_connectivity_data(tmp_path):
+    rng = np.random.default_rng(2)
+    C = np.column_stack([rng.integers(1, 100, 50), rng.integers(1, 100, 50), rng.uniform(0., 50., 50), np.full(50, 1.5)])
+    keys = ['source', 'target', 'weight', 'delay']
+    model.write_binary_connectivity_data(str(tmp_path), 'connectivity', {key: C[:25,k] for k, key in enumerate(keys)})
+    model.write_binary_connectivity_data(str(tmp_path), 'connectivity', {key: C[25:,k] for k, key in enumerate(keys)}, append = True)
+
+    assert np.array_equal(model.load_connectivity_data(str(tmp_path), 'connectivity'), C)
+
+#################################################
+def test_merge_binary_data(tmp_path):
+    path = str(tmp_path)
+    parts = {rank: np.arange(3 * rank, 3 * rank + rank + 1) for rank in range(12)}   ## ranks >= 10 test numeric ordering
+    for rank, x in parts.items():
+        model.write_binary_data(path, 'spikes-5-%d' % rank, 'spikes_binary_columns', {'x': (x, '<i8')}, attributes = {'dt': 0.1})
+    ## files with other labels or formats are not merged
+    model.write_binary_data(path, 'spikes-5-extra', 'spikes_binary_columns', {'x': (np.arange(2), '<i8')})
+    model.write_binary_data(path, 'spikes-5-20', 'other_format', {'x': (np.arange(2), '<i8')})
+
+    model.merge_binary_data(path, 'spikes-5', 'spikes_binary_columns', chunk_size = 4)
+
+    manifest, columns = model.read_binary_data(path, 'spikes-5.json')
+
+    assert manifest['n_rows'] == sum(len(x) for x in parts.values())
+    assert manifest['dt'] == 0.1
+    assert np.array_equal(columns['x'], np.concatenate([parts[rank] for rank in range(12)]))
+    assert not (tmp_path / 'spikes-5-0.json').exists()
+    assert not (tmp_path / 'spikes-5-0.x.bin').exists()
+    assert (tmp_path / 'spikes-5-extra.json').exists()
+    assert (tmp_path / 'spikes-5-20.json').exists()
@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+import model
+
+#################################################
+@pytest.mark.parametrize('pop', [np.arange(5, 15), np.array([12, 3, 40, 7, 25])])
+def test_map_ids_to_indices(pop):
+    ids = np.array([3, 5, 7, 14, 40, 41, 0, 12, 25, 5])
+    ind, valid = model.map_ids_to_indices(ids, pop)
+
+    assert np.array_equal(valid, np.isin(ids, pop))
+    assert np.array_equal(pop[ind[valid]], ids[valid])
+
+#################################################
+def test_map_ids_to_indices_empty():
+    ind, valid = model.map_ids_to_indices(np.array([1, 2]), np.array([], dtype = int))
+
+    assert not valid.any()
+    assert len(ind) == 2
+
+#################################################
+def get_connectivity():
+    '''Connectivity with multapses (source, target, weight, delay).'''
+
+    return np.array([
+        [1, 10, 1.0, 1.5],
+        [2, 10, 2.0, 1.5],
+        [1, 10, 3.0, 1.5],    ## multapse 1->10
+        [2, 11, 4.0, 1.5],
+        [3, 11, 5.0, 1.5],    ## source 3 not in pop_pre below
+        [2, 11, 0.5, 1.5],    ## multapse 2->11
+    ])
+
+#################################################
+@pytest.mark.parametrize('multapse_rule, expected', [
+    ('sum',  [[4.0, 2.0], [0.0, 4.5]]),
+    ('last', [[3.0, 2.0], [0.0, 0.5]]),
+    ('max',  [[3.0, 2.0], [0.0, 4.0]]),
+])
+def test_get_connectivity_matrix(multapse_rule, expected):
+    W, pop_pre, pop_post = model.get_connectivity_matrix(get_connectivity(), [1, 2], [10, 11], multapse_rule = multapse_rule, dense = True)
+
+    assert np.array_equal(pop_pre, [1, 2])
+    assert np.array_equal(pop_post, [10, 11])
+    assert np.allclose(W, expected)
+
+#################################################
+def test_get_connectivity_matrix_sparse_default_populations():
+    C = get_connectivity()
+    W, pop_pre, pop_post = model.get_connectivity_matrix(C)
+
+    assert np.array_equal(pop_pre, [1, 2, 3])
+    assert np.array_equal(pop_post, [10, 11])
+    assert W.shape == (2, 3)
+    assert np.isclose(W.sum(), C[:,2].sum())
+
+#################################################
+def pool_dense(W, shape, reduction):
+    '''Reference implementation of model.pool_connectivity_matrix() (loop over blocks).'''
+
+    n_rows, n_cols = W.shape
+    rows = np.arange(n_rows) * shape[0] // n_rows
+    cols = np.arange(n_cols) * shape[1] // n_cols
+    W_pooled = np.zeros(shape)
+    for i in range(shape[0]):
+        for j in range(shape[1]):
+            block = W[rows == i][:, cols == j]
+            W_pooled[i, j] = block.mean() if reduction == 'mean' else block.max()
+
+    return W_pooled
+
+#################################################
+@pytest.mark.parametrize('reduction', ['mean', 'max'])
+def test_pool_connectivity_matrix(reduction):
+    import scipy.sparse
+
+    rng = np.random.default_rng(1)
+    W = rng.uniform(-1., 2., (23, 17)) * (rng.random((23, 17)) < 0.3)
+
+    W_pooled = model.pool_connectivity_matrix(scipy.sparse.csr_matrix(W), (5, 4), reduction)
+
+    assert W_pooled.shape == (5, 4)
+    assert np.allclose(W_pooled, pool_dense(W, (5, 4), reduction))
+    assert np.allclose(model.pool_connectivity_matrix(W, (5, 4), reduction), W_pooled)
+
+#################################################
+def test_pool_connectivity_matrix_small():
+    W = np.arange(6.).reshape(2, 3)
+
+    assert np.allclose(model.pool_connectivity_matrix(W, (10, 10)), W)
+
+#################################################
+@pytest.mark.parametrize('indegree', [5, 40, 59])      ## sparse (indegree <= n/2) and dense sampling
+@pytest.mark.parametrize('allow_autapses', [True, False])
+def test_get_fixed_indegree_sources_without_multapses(indegree, allow_autapses):
+    source_ids = np.arange(101, 161)
+    target_ids = np.r_[np.arange(101, 131), [500]]   ## incl. target outside the source population
+
+    sources = model.get_fixed_indegree_sources(np.random.default_rng(3), source_ids, target_ids, indegree,
+                                               allow_autapses = allow_autapses, allow_multapses = False)
+
+    assert sources.shape == (len(target_ids), indegree)
+    assert np.all(np.isin(sources, source_ids))
+    assert all(len(np.unique(row)) == indegree for row in sources)
+    assert np.all(np.diff(sources, axis = 1) > 0)    ## ascending positions in source_ids (sorted ids)
+    if not allow_autapses:
+        assert not np.any(sources == target_ids[:, np.newaxis])
+
+    ## reproducible for identical generator states
+    sources_repeated = model.get_fixed_indegree_sources(np.random.default_rng(3), source_ids, target_ids, indegree,
+                                                        allow_autapses = allow_autapses, allow_multapses = False)
+    assert np.array_equal(sources, sources_repeated)
+
+#################################################
+@pytest.mark.parametrize('indegree', [2, 4])             ## sparse and dense sampling
+def test_get_fixed_indegree_sources_uniform(indegree):
+    ## without autapses, each of the other 4 sources is drawn with probability indegree/4
+    sources = model.get_fixed_indegree_sources(np.random.default_rng(4), np.arange(5), np.zeros(20000, dtype = int), indegree,
+                                               allow_autapses = False, allow_multapses = False)
+    frequencies = np.bincount(sources.ravel(), minlength = 5) / len(sources)
+
+    assert frequencies[0] == 0.
+    assert np.allclose(frequencies[1:], indegree / 4., atol = 0.02)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import model
+import mean_field
+
+#################################################
+def siegert_rate_quad(parameters, mu, sigma):
+    '''
+    Siegert rate (spikes/s) with adaptive quadrature (scipy.integrate.quad) for scalar mu and sigma.
+
+    The integrand exp(u^2) (1 + erf(u)) is evaluated as erfcx(-u) (no cancellation for u << 0).
+    '''
+
+    import scipy.integrate
+    import scipy.special
+
+    shift = sigma * mean_field.alpha_fb / 2. * np.sqrt(parameters['tau_s'] / parameters['tau_m'])
+    y_th = (parameters['theta'] + shift - mu) / sigma
+    y_r = (parameters['V_reset'] + shift - mu) / sigma
+    integral = scipy.integrate.quad(lambda u: scipy.special.erfcx(-u), y_r, y_th)[0]
+
+    return 1000. / (parameters['t_ref'] + parameters['tau_m'] * np.sqrt(np.pi) * integral)
+
+#################################################
+def test_siegert_rate():
+    parameters = model.get_default_parameters()
+    mu = np.array([[5., 15., 18.], [20., 25., 10.]])
+    sigma = np.array([[5., 3., 8.], [2., 10., 1.]])
+
+    rates = mean_field.siegert_rate(parameters, mu, sigma, chunk_size = 4)
+    expected = np.vectorize(lambda m, s: siegert_rate_quad(parameters, m, s))(mu, sigma)
+
+    assert rates.shape == mu.shape
+    assert np.allclose(rates, expected, rtol = 1e-6, atol = 1e-12)
+
+#################################################
+def test_siegert_rate_silent_and_saturated():
+    parameters = model.get_default_parameters()
+    rates = mean_field.siegert_rate(parameters, [-200., 10000.], [1., 1.])
+
+    assert rates[0] == 0.
+    assert rates[1] == pytest.approx(1000. / parameters['t_ref'], rel = 0.05)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import model
+
+#################################################
+def get_online_statistics(spike_counts_E, spike_counts_I, weight_histograms):
+    '''Online statistics as accumulated by Model.simulate() (lists), for two intervals of 500 ms.'''
+
+    return {
+        'times': [1000., 1500., 2000.],
+        'spike_counts_E': spike_counts_E,
+        'spike_counts_I': spike_counts_I,
+        'weight_bins': np.array([0., 10., 20., 40.]),
+        'weight_histograms': weight_histograms,
+        'N_E': 8,
+        'N_I': 2,
+    }
+
+#################################################
+def test_load_online_statistics(tmp_path):
+    stats = get_online_statistics([40, 80], [10, 20], [[5, 3, 0], [2, 4, 2], [0, 4, 4]])
+    model.write_online_statistics(str(tmp_path), stats)
+
+    loaded = model.load_online_statistics(str(tmp_path))
+
+    for key in stats:
+        assert np.array_equal(loaded[key], stats[key])
+    assert np.allclose(loaded['rate_E'], [10., 20.])          ## 40 spikes / 0.5 s / 8 neurons
+    assert np.allclose(loaded['rate_I'], [10., 20.])
+    assert np.allclose(loaded['weight_distributions'][0], [5. / 8. / 10., 3. / 8. / 10., 0.])
+    assert np.allclose(np.sum(loaded['weight_distributions'] * np.diff(stats['weight_bins']), axis = 1), 1.)
+
+#################################################
+def test_load_online_statistics_mpi(tmp_path):
+    ## files of two MPI processes: spike counts and weight histograms of local neurons and synapses are summed
+    model.write_online_statistics(str(tmp_path), get_online_statistics([40, 0], [10, 0], [[5, 3, 0], [2, 4, 2], [0, 0, 0]]), rank = 0)
+    model.write_online_statistics(str(tmp_path), get_online_statistics([0, 80], [0, 20], [[0, 0, 0], [0, 0, 0], [0, 4, 4]]), rank = 1)
+
+    loaded = model.load_online_statistics(str(tmp_path))
+
+    assert np.array_equal(loaded['spike_counts_E'], [40, 80])
+    assert np.array_equal(loaded['weight_histograms'], [[5, 3, 0], [2, 4, 2], [0, 4, 4]])
+    assert np.allclose(loaded['rate_E'], [10., 20.])
+    assert np.allclose(loaded['rate_I'], [10., 20.])
+
+#################################################
+def test_load_online_statistics_missing(tmp_path):
+    with pytest.raises(AssertionError):
+        model.load_online_statistics(str(tmp_path))
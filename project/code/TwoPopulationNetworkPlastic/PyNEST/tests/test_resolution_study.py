@@ -0,0 +1,28 @@
+import numpy as np
+
+import resolution_study
+
+#################################################
+def test_quantile_wasserstein_distance():
+    ## distance of quantile representations approximates the distance of the samples
+    rng = np.random.default_rng(1)
+    x = rng.normal(20., 2., 100000)
+    y = rng.normal(21., 3., 100000)
+    levels = resolution_study.get_quantile_levels(1000)
+
+    distance = resolution_study.quantile_wasserstein_distance(np.quantile(x, levels), np.quantile(y, levels))
+
+    assert np.isclose(distance, resolution_study.wasserstein_distance(x, y), rtol = 1e-2)
+
+#################################################
+def test_get_deviations():
+    levels = resolution_study.get_quantile_levels(100)
+    result_ref = {'rates': np.full(10, 2., dtype = np.float32), 'weight_mean': 20., 'weight_quantiles': 20. + levels}
+    result = {'rates': np.full(10, 3., dtype = np.float32), 'weight_mean': 22., 'weight_quantiles': 22. + levels}
+
+    deviations = resolution_study.get_deviations(result, result_ref)
+
+    assert np.isclose(deviations['rate_distance'], 1.)
+    assert np.isclose(deviations['rate_relative_error'], 0.5)
+    assert np.isclose(deviations['weight_distance'], 2.)
+    assert np.isclose(deviations['weight_relative_error'], 0.1)
@@ -0,0 +1,62 @@
+import zlib
+
+import numpy as np
+import pytest
+
+import model
+
+#################################################
+def encode_decode(senders, steps, step_start):
+    '''Encode and decode a spike block (see model.write_spike_archive()).'''
+
+    arrays = model.encode_spike_block(senders, steps, step_start)
+    data = zlib.decompress(zlib.compress(b''.join([x.tobytes() for _, x in arrays])))
+    block = {'step_start': step_start, 'arrays': [[name, x.dtype.str, len(x)] for name, x in arrays]}
+
+    return model.decode_spike_block(data, block)
+
+#################################################
+@pytest.mark.parametrize('n_spikes', [0, 1, 1000])
+def test_encode_decode_spike_block(n_spikes):
+    rng = np.random.default_rng(n_spikes)
+    step_start = 80000
+    senders = rng.integers(1, 300, n_spikes)
+    steps = step_start + rng.integers(0, 8000, n_spikes)
+    order = np.lexsort((steps, senders))
+    senders, steps = senders[order], steps[order]
+
+    senders_decoded, steps_decoded = encode_decode(senders, steps, step_start)
+
+    assert np.array_equal(senders_decoded, senders)
+    assert np.array_equal(steps_decoded, steps)
+
+#################################################
+def test_encode_spike_block_dtypes():
+    senders = np.array([1, 1, 70000])
+    steps = np.array([3, 300, 5])
+    arrays = dict(model.encode_spike_block(senders, steps, 0))
+
+    assert arrays['sender_deltas'].dtype == np.dtype('<u4')
+    assert arrays['counts'].dtype == np.dtype('<u1')
+    assert arrays['step_deltas'].dtype == np.dtype('<u2')
+    assert np.array_equal(encode_decode(senders, steps, 0)[1], steps)
+
+#################################################
+@pytest.mark.parametrize('compression', ['zlib', 'lzma'])
+def test_spike_archive(tmp_path, compression):
+    rng = np.random.default_rng(3)
+    dt = 0.125
+    spikes = np.column_stack([rng.integers(1, 500, 20000), rng.integers(1, 40000, 20000) * dt])
+    model.write_spike_archive(str(tmp_path), 'archive', spikes, dt, block_duration = 1000., compression = compression)
+
+    loaded = model.load_spike_archive(str(tmp_path), 'archive')
+    order = np.lexsort((spikes[:,1], spikes[:,0]))
+    order_loaded = np.lexsort((loaded[:,1], loaded[:,0]))
+    assert np.array_equal(loaded[order_loaded], spikes[order])
+
+    ## time window: spikes in (start, stop], block boundaries inside the window
+    time_interval = (999.875, 2500.)
+    loaded = model.load_spike_archive(str(tmp_path), 'archive', time_interval)
+    valid = (spikes[:,1] > time_interval[0]) & (spikes[:,1] <= time_interval[1])
+    assert len(loaded) == valid.sum()
+    assert np.array_equal(np.unique(loaded, axis = 0), np.unique(spikes[valid], axis = 0))
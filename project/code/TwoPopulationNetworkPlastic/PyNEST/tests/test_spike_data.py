@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+import model
+
+#################################################
+ascii_header = '# NEST version: 3.6\n# RecordingBackendASCII version: 2\n# sender\ttime_ms\n'
+
+def write_ascii_spike_files(path, label, spikes, n_files):
+    '''Write spikes in NEST's ASCII format, split into n_files files (one per virtual process).'''
+
+    for vp, chunk in enumerate(np.array_split(spikes, n_files)):
+        with open('%s/%s-%d.dat' % (path, label, vp), 'w') as f:
+            f.write(ascii_header)
+            np.savetxt(f, chunk, fmt = ['%d', '%.3f'], delimiter = '\t')
+
+#################################################
+@pytest.fixture
+def spikes():
+    rng = np.random.default_rng(7)
+    n = 2000
+    return np.column_stack([rng.integers(1, 21, n), np.round(rng.uniform(0., 1000., n), 1)])
+
+#################################################
+@pytest.fixture(params = ['ascii', 'binary'])
+def spike_path(request, spikes, tmp_path):
+    if request.param == 'ascii':
+        write_ascii_spike_files(str(tmp_path), 'spikes-25', spikes, 3)
+    else:
+        model.write_binary_spike_data(str(tmp_path), 'spikes-25-0', spikes[:,0], spikes[:,1])
+    return str(tmp_path)
+
+#################################################
+def test_load_spike_data(spike_path, spikes):
+    loaded = model.load_spike_data(spike_path, 'spikes-25')
+
+    assert np.array_equal(loaded, spikes)
+
+#################################################
+@pytest.mark.parametrize('sort_by', ['sender', 'time'])
+def test_load_spike_data_pop(spike_path, spikes, sort_by):
+    pop = np.array([12, 3, 7, 30])        ## unsorted, incl. id without spikes
+    time_interval = (100., 800.)
+
+    loaded = model.load_spike_data(spike_path, 'spikes-25', time_interval = time_interval, pop = pop, sort_by = sort_by)
+
+    valid = np.isin(spikes[:,0], pop) & (spikes[:,1] >= time_interval[0]) & (spikes[:,1] <= time_interval[1])
+    expected = spikes[valid]
+    if sort_by == 'sender':
+        ## by position of the sender in pop, and by time for each sender
+        position = np.searchsorted(pop[np.argsort(pop)], expected[:,0])
+        expected = expected[np.lexsort((expected[:,1], np.argsort(pop)[position]))]
+        blocks = np.r_[True, loaded[1:,0] != loaded[:-1,0]]     ## first spike of each sender block
+        assert np.array_equal(loaded[blocks,0], [12, 3, 7])
+    else:
+        expected = expected[np.lexsort((expected[:,0], expected[:,1]))]
+        assert np.all(np.diff(loaded[:,1]) >= 0)
+
+    assert np.array_equal(loaded, expected)
+
+#################################################
+def test_load_spike_data_invalid_sort_by(spike_path):
+    with pytest.raises(ValueError):
+        model.load_spike_data(spike_path, 'spikes-25', pop = [1, 2], sort_by = 'id')
+
+#################################################
+@pytest.mark.parametrize('n_workers', [1, 3])
+def test_load_ascii_data_workers(spikes, tmp_path, n_workers):
+    write_ascii_spike_files(str(tmp_path), 'spikes-25', spikes, 4)
+    files = model.get_data_file_list(str(tmp_path), 'spikes-25')
+
+    data = model.load_ascii_data(str(tmp_path), files, n_columns = 2, skip_rows = 3, n_workers = n_workers)
+
+    assert np.array_equal(data, spikes)          ## rows in the order of the files
+
+#################################################
+@pytest.mark.parametrize('n_workers', [1, 3])
+def test_load_ascii_data_errors(spikes, tmp_path, n_workers):
+    write_ascii_spike_files(str(tmp_path), 'spikes-25', spikes, 2)
+    with open(str(tmp_path / 'spikes-25-2.dat'), 'w') as f:
+        f.write(ascii_header + '1\t10.0\n2\tnan_ms\n')          ## malformed row
+    files = ['spikes-25-0.dat', 'spikes-25-1.dat', 'spikes-25-2.dat', 'spikes-25-3.dat']   ## spikes-25-3.dat is missing
+
+    with pytest.raises(IOError) as error:
+        model.load_ascii_data(str(tmp_path), files, n_columns = 2, skip_rows = 3, n_workers = n_workers)
+
+    ## all failed files are reported together
+    message = str(error.value)
+    assert 'Failed to load 2 of 4 files' in message
+    assert 'spikes-25-2.dat' in message and 'spikes-25-3.dat' in message
+    assert 'spikes-25-0.dat' not in message
+
+#################################################
+def test_get_spike_count_image():
+    ## time bins of 25 ms: [0,25), [25,50), [50,75), [75,100] (stop time in last bin); id bins of 2 neurons
+    spikes = np.array([
+        [1, 0.], [2, 24.9],           ## bin (0, 0)
+        [3, 25.],                     ## bin (1, 1)
+        [6, 74.99],                   ## bin (2, 2)
+        [6, 75.], [5, 80.],           ## bin (2, 3)
+        [10, 100.],                   ## bin (4, 3)
+        [10, 100.1], [5, -0.1],       ## outside time range
+        [0, 5.], [11, 5.],            ## outside id range
+    ])
+    expected = np.zeros((5, 4), dtype = int)
+    expected[0, 0] = 2
+    expected[1, 1] = 1
+    expected[2, 2] = 1
+    expected[2, 3] = 2
+    expected[4, 3] = 1
+
+    counts = model.get_spike_count_image(spikes, (0., 100.), (1, 10), (5, 4))
+
+    assert np.array_equal(counts, expected)
+    ## iterable of chunks (e.g. from iter_spike_data())
+    assert np.array_equal(model.get_spike_count_image(iter(np.array_split(spikes, 3)), (0., 100.), (1, 10), (5, 4)), expected)
+
+#################################################
+def test_get_spike_count_image_id_bins():
+    ## at most one id bin per neuron
+    spikes = np.array([[1, 10.], [4, 10.], [4, 60.], [4, 60.]])
+
+    counts = model.get_spike_count_image(spikes, (0., 100.), (1, 4), (10, 2))
+
+    assert np.array_equal(counts, [[1, 0], [0, 0], [0, 0], [1, 2]])
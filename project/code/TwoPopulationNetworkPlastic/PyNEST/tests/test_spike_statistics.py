@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import spike_statistics
+
+#################################################
+def test_sort_spikes_exact():
+    ## large sender indices and times that are not separable with a combined float key
+    ind = np.array([10**9, 10**9 - 1, 10**9, 10**9 - 1])
+    times = np.array([1e6 + 0.125, 1e6 + 0.25, 1e6, 1e6 + 0.125])
+
+    ind_sorted, times_sorted = spike_statistics.sort_spikes(ind, times)
+
+    assert np.array_equal(ind_sorted, [10**9 - 1, 10**9 - 1, 10**9, 10**9])
+    assert np.array_equal(times_sorted, [1e6 + 0.125, 1e6 + 0.25, 1e6, 1e6 + 0.125])
+
+#################################################
+def test_count_bins_right_closed():
+    ## bins (0, 10], (10, 20], (20, 25]
+    times = np.array([0.1, 10., 10.1, 20., 25.])
+    bins = spike_statistics.get_count_bins(np.zeros(5, dtype = int), times, 3, (0., 25.), 10.)
+
+    assert np.array_equal(bins, [0, 0, 1, 1, 2])
+
+#################################################
+def reference_statistics(spikes, pop, time_interval, bin_size):
+    '''Per-neuron rates, ISI CVs and Fano factors (loop over neurons).'''
+
+    n_bins = int(np.ceil((time_interval[1] - time_interval[0]) / bin_size))
+    edges = time_interval[0] + np.arange(n_bins + 1) * bin_size
+    rates, cvs, fanos = [], [], []
+    for node_id in pop:
+        times = np.sort(spikes[(spikes[:,0] == node_id) & (spikes[:,1] > time_interval[0]) & (spikes[:,1] <= time_interval[1]), 1])
+        rates += [len(times) / (time_interval[1] - time_interval[0]) * 1000.]
+        isi = np.diff(times)
+        cvs += [isi.std() / isi.mean() if len(isi) >= 2 else np.nan]
+        counts = np.array([np.count_nonzero((times > a) & (times <= b)) for a, b in zip(edges[:-1], edges[1:])])
+        fanos += [counts.var() / counts.mean() if counts.mean() > 0 else np.nan]
+
+    return np.array(rates), np.array(cvs), np.array(fanos)
+
+#################################################
+@pytest.mark.parametrize('n_workers', [1, 3])
+def test_get_spike_train_statistics(n_workers):
+    rng = np.random.default_rng(5)
+    n = 20000
+    spikes = np.column_stack([rng.integers(1, 201, n), np.round(rng.uniform(0., 1000., n), 1)])
+    pop = np.arange(11, 191)
+    time_interval = (100., 900.)
+
+    stats = spike_statistics.get_spike_train_statistics(spikes, pop, time_interval, bin_size = 20., n_pairs = 50,
+                                                        seed = 1, n_workers = n_workers)
+    rates, cvs, fanos = reference_statistics(spikes, pop, time_interval, 20.)
+
+    assert np.allclose(stats['rates'], rates)
+    assert np.allclose(stats['cvs'], cvs, equal_nan = True)
+    assert np.allclose(stats['fano_factors'], fanos, equal_nan = True)
+    assert stats['pairs'].shape == (50, 2)
+    assert np.all(stats['pairs'][:,0] != stats['pairs'][:,1])
+    assert np.all(np.isin(stats['pairs'], pop))
+
+    ## count correlations of the sampled pairs (counts in bins (a, b])
+    edges = time_interval[0] + np.arange(41) * 20.
+    def get_counts(node_id):
+        times = spikes[spikes[:,0] == node_id, 1]
+        return np.array([np.count_nonzero((times > a) & (times <= b)) for a, b in zip(edges[:-1], edges[1:])])
+    for (i, j), cc in zip(stats['pairs'][:5], stats['correlations'][:5]):
+        assert np.isclose(cc, np.corrcoef(get_counts(i), get_counts(j))[0, 1])
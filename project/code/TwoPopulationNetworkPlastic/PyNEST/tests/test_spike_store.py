@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from spike_store import SpikeStore
+
+#################################################
+@pytest.fixture
+def spikes():
+    rng = np.random.default_rng(4)
+    n = 50000
+    return np.column_stack([rng.integers(1, 1001, n), np.round(rng.uniform(0., 5000., n), 1)])
+
+#################################################
+@pytest.fixture
+def store(spikes, tmp_path):
+    SpikeStore.create(spikes, str(tmp_path), 'store', block_size = 1000)
+    return SpikeStore(str(tmp_path), 'store')   ## reopened
+
+#################################################
+def select(spikes, pop, time_interval):
+    '''Reference selection of spikes of "pop" in (start, stop], sorted by time and sender.'''
+
+    valid = np.isin(spikes[:,0], pop) & (spikes[:,1] > time_interval[0]) & (spikes[:,1] <= time_interval[1])
+    selected = spikes[valid]
+
+    return selected[np.lexsort((selected[:,0], selected[:,1]))]
+
+#################################################
+def test_get_neuron_spikes(store, spikes):
+    times = spikes[spikes[:,0] == 17, 1]
+
+    assert np.array_equal(store.get_neuron_spikes(17), np.sort(times))
+    assert np.array_equal(store.get_neuron_spikes(17, (100., 2000.)), np.sort(times[(times > 100.) & (times <= 2000.)]))
+    assert len(store.get_neuron_spikes(5000)) == 0
+
+#################################################
+@pytest.mark.parametrize('time_interval', [(0., 5000.), (1000., 1000.5), (1234.5, 3000.), (6000., 7000.), (-10., 0.5)])
+@pytest.mark.parametrize('pop', [np.r_[np.arange(100, 400), [900, 2000]],    ## large population (time-sorted copy), incl. id without spikes
+                                 np.array([900, 17, 2000, 17, 5])])          ## small population (CSR segments), unsorted with duplicate
+def test_get_population_spikes(store, spikes, pop, time_interval):
+    assert np.array_equal(store.get_population_spikes(pop, time_interval), select(spikes, pop, time_interval))
+
+#################################################
+def test_get_population_spikes_all(store, spikes):
+    assert np.array_equal(store.get_population_spikes(np.arange(1, 1001)), select(spikes, np.arange(1, 1001), (-1., 5000.)))
+
+#################################################
+@pytest.mark.parametrize('time_interval', [None, (1234.5, 3000.)])
+def test_get_counts(store, spikes, time_interval):
+    pop = np.array([500, 3, 2000, 3])                   ## unsorted, duplicate, id without spikes
+    interval = (-1., np.inf) if time_interval is None else time_interval
+    valid = (spikes[:,1] > interval[0]) & (spikes[:,1] <= interval[1])
+    expected = [np.count_nonzero(valid & (spikes[:,0] == node_id)) for node_id in pop]
+
+    assert np.array_equal(store.get_counts(pop, time_interval), expected)
+
+#################################################
+def test_empty_store(tmp_path):
+    store = SpikeStore.create(np.zeros((0, 2)), str(tmp_path), 'empty')
+
+    assert store.get_population_spikes([1, 2], (0., 10.)).shape == (0, 2)
+    assert np.array_equal(store.get_counts([1, 2], (0., 10.)), [0, 0])
+    assert len(store.get_neuron_spikes(1)) == 0
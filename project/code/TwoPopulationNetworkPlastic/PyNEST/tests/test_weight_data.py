@@ -0,0 +1,64 @@
+import numpy as np
+
+import model
+
+#################################################
+def write_weight_file(path, label, events, time_bin = None, append = False):
+    '''Write weight-recorder events (rows: sender, target, time, weight) as written by Model.__write_weight_data().'''
+
+    events = np.asarray(events, dtype = float)
+    columns = {
+        'senders': (events[:,0], '<i4'),
+        'targets': (events[:,1], '<i4'),
+        'times': (events[:,2], '<f8'),
+        'weights': (events[:,3], '<f8'),
+    }
+    model.write_binary_data(path, label, 'weights_binary_columns', columns, attributes = {'time_bin': time_bin}, append = append)
+
+#################################################
+def test_get_last_update_indices():
+    ## sender, target, time: repeated updates of the same synapses within and across time bins of 10 ms
+    events = np.array([
+        [1, 2, 3.],     # 0
+        [2, 2, 4.],     # 1
+        [1, 2, 1.],     # 2
+        [1, 3, 5.],     # 3
+        [1, 2, 12.],    # 4
+        [2, 2, 4.5],    # 5
+        [1, 2, 7.],     # 6
+        [1, 2, 7.],     # 7  (same time as 6: the later update wins)
+        [1, 2, 19.],    # 8
+    ])
+
+    ind = model.get_last_update_indices(events[:,0], events[:,1], events[:,2], 10.)
+
+    assert sorted(ind) == [3, 5, 7, 8]
+    assert len(model.get_last_update_indices([], [], np.zeros(0), 10.)) == 0
+
+#################################################
+def test_load_weight_data(tmp_path):
+    path = str(tmp_path)
+    write_weight_file(path, 'weights-9-0', [[1, 2, 3., 10.], [2, 1, 1., 20.], [1, 2, 1., 11.]])
+    write_weight_file(path, 'weights-9-0', [[1, 2, 5., 12.]], append = True)
+    write_weight_file(path, 'weights-9-1', [[3, 1, 2., 30.], [2, 1, 4., 21.]])   ## second MPI process
+
+    weights = model.load_weight_data(path, 'weights-9')
+
+    assert np.array_equal(weights['synapses'], [[1, 2], [2, 1], [3, 1]])
+    assert np.array_equal(weights['offsets'], [0, 3, 5, 6])
+    assert np.array_equal(weights['times'], [1., 3., 5., 1., 4., 2.])
+    assert np.array_equal(weights['weights'], [11., 10., 12., 20., 21., 30.])
+
+#################################################
+def test_load_weight_data_time_bin(tmp_path):
+    ## time bin [0, 10) split across two calls of simulate(): the last update of each synapse and bin wins
+    path = str(tmp_path)
+    write_weight_file(path, 'weights-9-0', [[1, 2, 2., 10.], [1, 2, 4., 11.], [2, 1, 3., 20.]], time_bin = 10.)
+    write_weight_file(path, 'weights-9-0', [[1, 2, 6., 12.], [1, 2, 6., 13.], [1, 2, 15., 14.]], time_bin = 10., append = True)
+
+    weights = model.load_weight_data(path, 'weights-9')
+
+    assert np.array_equal(weights['synapses'], [[1, 2], [2, 1]])
+    assert np.array_equal(weights['offsets'], [0, 2, 3])
+    assert np.array_equal(weights['times'], [6., 15., 3.])
+    assert np.array_equal(weights['weights'], [13., 14., 20.])
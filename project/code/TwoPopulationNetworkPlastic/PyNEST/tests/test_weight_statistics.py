@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import model
+
+#################################################
+def get_connectivity(seed, n):
+    rng = np.random.default_rng(seed)
+    weights = np.maximum(rng.normal(20., 15., n), 0.)     ## incl. weights clipped at zero
+    return np.column_stack([rng.integers(1, 1000, n), rng.integers(1, 1000, n), weights, np.full(n, 1.5)])
+
+#################################################
+def write_ascii(path, label, parts):
+    for rank, C in enumerate(parts):
+        np.savetxt('%s/%s-%d.dat' % (path, label, rank), C, fmt = '%d\t%d\t%.6e\t%.6e', header = ' source \t target \t weight \tdelay (ms)')
+
+#################################################
+def write_binary(path, label, parts):
+    keys = ['source', 'target', 'weight', 'delay']
+    for rank, C in enumerate(parts):
+        model.write_binary_connectivity_data(path, '%s-%d' % (label, rank), {key: C[:,k] for k, key in enumerate(keys)})
+
+#################################################
+@pytest.mark.parametrize('file_format', ['ascii', 'binary'])
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_get_weight_distribution_from_files(tmp_path, file_format, n_workers):
+    parts = [get_connectivity(seed, n) for seed, n in enumerate([1000, 2500, 10])]
+    w = np.concatenate(parts)[:,2]
+    if file_format == 'ascii':
+        write_ascii(str(tmp_path), 'connectivity', parts)
+        w = np.array(['%.6e' % x for x in w], dtype = float)    ## precision of ASCII files
+    else:
+        write_binary(str(tmp_path), 'connectivity', parts)
+    bins = np.arange(0., 80.1, 2.)
+
+    whist, stats = model.get_weight_distribution_from_files(str(tmp_path), 'connectivity', bins, chunk_size = 300, n_workers = n_workers)
+
+    assert np.allclose(whist, np.histogram(w, bins, density = True)[0])
+    assert np.array_equal(stats['counts'], np.histogram(w, bins)[0])
+    assert stats['n'] == len(w)
+    assert np.isclose(stats['mean'], w.mean())
+    assert np.isclose(stats['variance'], w.var())
+    assert np.isclose(stats['fraction_zero'], np.mean(w <= 0.))
+
+#################################################
+def test_combine_weight_statistics():
+    rng = np.random.default_rng(7)
+    w = rng.normal(10., 3., 1001)
+    bins = np.linspace(0., 20., 11)
+
+    stats = model.combine_weight_statistics(model.get_weight_statistics(w[:17], bins), model.get_weight_statistics(w[17:], bins))
+    stats = model.combine_weight_statistics(stats, model.get_weight_statistics([], bins))
+
+    assert stats['n'] == len(w)
+    assert np.isclose(stats['mean'], w.mean())
+    assert np.isclose(stats['M2'], ((w - w.mean())**2).sum())